@@ -0,0 +1,104 @@
+"""
+Benchmark: reaction-entry throughput, connection-per-call vs. persistent GwyDB.
+
+    python benchmarks/bench_gwydb.py [reactions]
+
+Replays the on_raw_reaction_add path (get_giveaway, get_messages,
+get_invites, add_entry) against a scratch database file.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import aiosqlite
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.database.gwydb import GwyDB
+
+GUILD_ID = 1
+MESSAGE_ID = 1000
+
+
+class LegacyGwyDB:
+    # The per-call aiosqlite.connect pattern GwyDB used before
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    async def get_giveaway(self, message_id):
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute("SELECT * FROM giveaways WHERE message_id = ?", (message_id,))
+            row = await cursor.fetchone()
+            if row:
+                keys = [d[0] for d in cursor.description]
+                return dict(zip(keys, row))
+            return None
+
+    async def get_messages(self, guild_id, user_id):
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                "SELECT message_count FROM messages WHERE guild_id = ? AND user_id = ?", (guild_id, user_id)
+            )
+            row = await cursor.fetchone()
+            return row[0] if row else 0
+
+    async def get_invites(self, guild_id, user_id):
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                "SELECT invites FROM invites WHERE guild_id = ? AND user_id = ?", (guild_id, user_id)
+            )
+            row = await cursor.fetchone()
+            return row[0] if row else 0
+
+    async def add_entry(self, message_id, user_id):
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("INSERT OR IGNORE INTO entries (message_id, user_id) VALUES (?, ?)", (message_id, user_id))
+            await db.commit()
+
+
+async def seed(path, users):
+    db = GwyDB(path)
+    await db.setup()
+    await db.add_giveaway(MESSAGE_ID, 10, GUILD_ID, "Nitro", 1, int(time.time()) + 3600, 42, min_messages=5)
+    await db.add_message_counts([(GUILD_ID, uid, 10) for uid in range(users)])
+    await db.close()
+
+
+async def react(db, user_id):
+    g = await db.get_giveaway(MESSAGE_ID)
+    if await db.get_messages(GUILD_ID, user_id) < int(g["min_messages"] or 0):
+        return
+    await db.get_invites(GUILD_ID, user_id)
+    await db.add_entry(MESSAGE_ID, user_id)
+
+
+async def run(label, db, reactions, offset):
+    start = time.perf_counter()
+    for uid in range(offset, offset + reactions):
+        await react(db, uid)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:>10.1f} ms  {reactions / elapsed:>9,.0f} reactions/s")
+    return elapsed
+
+
+async def main():
+    reactions = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "giveaways.db")
+        await seed(path, reactions * 2)
+        print(f"{reactions:,} reactions per run\n")
+
+        t_legacy = await run("connection per call", LegacyGwyDB(path), reactions, 0)
+
+        db = GwyDB(path)
+        await db.connect()
+        t_pooled = await run("persistent WAL connection", db, reactions, reactions)
+        await db.close()
+
+    print(f"\nspeedup: x{t_legacy / t_pooled:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,51 @@
+"""
+Micro-benchmark: linear calculate_level loop vs. bot.utils.levels.
+
+    python benchmarks/bench_levels.py [rows]
+
+Simulates rendering levels for a 100k-row leaderboard.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.utils.levels import MAX_LEVEL, calculate_level, get_xp_for_level, levels_for
+
+
+def legacy_calculate_level(xp):
+    # The copy-pasted loop the cogs used before bot/utils/levels.py
+    level = 0
+    while get_xp_for_level(level + 1) <= xp:
+        level += 1
+    return level
+
+
+def timed(label, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:>10.1f} ms")
+    return result, elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(42)
+    # Skewed towards low levels like a real guild, with a long tail up to the cap
+    top = get_xp_for_level(MAX_LEVEL)
+    xps = sorted((int(top * rng.random() ** 4) for _ in range(rows)), reverse=True)
+    print(f"{rows:,} leaderboard rows, max level {MAX_LEVEL}\n")
+
+    legacy, t_legacy = timed("legacy linear loop", lambda: [legacy_calculate_level(x) for x in xps])
+    single, t_single = timed("calculate_level (bisect)", lambda: [calculate_level(x) for x in xps])
+    batch, t_batch = timed("levels_for (batched)", levels_for, xps)
+
+    assert legacy == single == batch, "level mismatch"
+    print(f"\nspeedup: bisect x{t_legacy / t_single:.0f}, batched x{t_legacy / t_batch:.0f}")
+
+
+if __name__ == "__main__":
+    main()
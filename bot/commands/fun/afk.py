@@ -1,7 +1,8 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from bot.database.afkdb import init_afk_db, set_afk, remove_afk, get_afk
+from bot.database.afkdb import afk_registry
+from bot.core.pipeline import message_pipeline
 from datetime import datetime, timedelta
 import re  # Import moved to top
 
@@ -11,6 +12,15 @@ class AFK(commands.Cog):
         self.processing_afk_users = set()
         self.afk_timestamps = {}  # { "guildid-userid": datetime }
 
+    async def cog_load(self):
+        await afk_registry.load()
+        message_pipeline.afk_provider = afk_registry.ids
+        message_pipeline.register("afk", self.on_message_stage, order=20)
+
+    def cog_unload(self):
+        message_pipeline.unregister("afk")
+        message_pipeline.afk_provider = None
+
     @app_commands.command(name="afk", description="Set your AFK status.")
     async def afk(self, interaction: discord.Interaction, reason: str = "AFK"):
         member = interaction.user
@@ -37,7 +47,7 @@ class AFK(commands.Cog):
 
         self.processing_afk_users.add(member.id)
 
-        prev_reason, prev_nick = await get_afk(guild.id, member.id)
+        prev_reason, prev_nick = afk_registry.get(guild.id, member.id)
         now = datetime.utcnow()
         last_afk_time = self.afk_timestamps.get(key)
 
@@ -63,9 +73,9 @@ class AFK(commands.Cog):
 
         # Save AFK info
         if not prev_reason:
-            await set_afk(guild.id, member.id, reason, original_nick)
+            await afk_registry.set(guild.id, member.id, reason, original_nick)
         else:
-            await set_afk(guild.id, member.id, reason, prev_nick)
+            await afk_registry.set(guild.id, member.id, reason, prev_nick)
 
         # Publicly announce AFK
         if member.guild_permissions.manage_messages or member.guild_permissions.administrator:
@@ -79,18 +89,19 @@ class AFK(commands.Cog):
 
         self.processing_afk_users.discard(member.id)
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot or not message.guild:
+    async def on_message_stage(self, ctx):
+        # ✅ Nobody in this guild is AFK → nothing to do
+        if not ctx.afk_ids:
             return
 
-        guild_id = message.guild.id
-        member = message.author
+        message = ctx.message
+        guild_id = ctx.guild.id
+        member = ctx.author
         key = f"{guild_id}-{member.id}"
 
         # Remove AFK status if the user sends a normal message
-        reason, original_nick = await get_afk(guild_id, member.id)
-        if reason:
+        if ctx.author_id in ctx.afk_ids:
+            reason, original_nick = afk_registry.get(guild_id, member.id)
             try:
                 if member.nick and member.nick.startswith("[AFK] "):
                     if original_nick and member.nick != original_nick:
@@ -98,22 +109,26 @@ class AFK(commands.Cog):
             except discord.Forbidden:
                 pass
 
-            await remove_afk(guild_id, member.id)
+            await afk_registry.remove(guild_id, member.id)
             self.afk_timestamps.pop(key, None)
             await message.channel.send(
                 f"Welcome back {member.mention}, your AFK was removed",
                 delete_after=9
             )
 
-        # Notify if any AFK user is mentioned
-        for mention in message.mentions:
-            afk_reason, _ = await get_afk(guild_id, mention.id)
-            if afk_reason:
-                await message.channel.send(
-                    f"💤 {mention.display_name} is AFK: **{afk_reason}**",
-                    delete_after=9
-                )
+        # Notify if any AFK users are mentioned (one lookup, one message)
+        if not message.mentions:
+            return
+        afk_mentions = afk_registry.lookup(guild_id, (m.id for m in message.mentions))
+        if afk_mentions:
+            lines = [
+                f"💤 {mention.display_name} is AFK: **{afk_mentions[str(mention.id)][0]}**"
+                for mention in message.mentions if str(mention.id) in afk_mentions
+            ]
+            await message.channel.send(
+                "\n".join(lines),
+                delete_after=9
+            )
 
 async def setup(bot):
-    await init_afk_db()
     await bot.add_cog(AFK(bot))
@@ -6,6 +6,7 @@ import random
 from openai import OpenAI
 import firebase_admin
 from firebase_admin import credentials, firestore
+from bot.utils.asyncfirestore import async_db
 
 
 class Motivate(commands.Cog):
@@ -36,10 +37,10 @@ class Motivate(commands.Cog):
                 ]
             )
             message = res.choices[0].message.content.strip()
-            self.collection.add({"message": message})
+            await async_db.run("add", self.collection.add, {"message": message})
             return message
         except Exception:
-            fallback = [doc.to_dict()["message"] for doc in self.collection.stream()]
+            fallback = [doc.to_dict()["message"] for doc in await async_db.stream(self.collection)]
             return random.choice(fallback) if fallback else "Keep going. Great things take time."
 
     @commands.command(name="motivateme")
@@ -1,18 +1,20 @@
 import re
+import time
 import datetime as dt
 from typing import Optional, Literal
-import random
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
-from bot.database.gwydb import GwyDB
+from bot.database.gwydb import gwy_db
+from bot.database.gwyentries import entry_buffer
 from bot.utils.gwymanager import GiveawayManager, JOIN_EMOJI, UTC
 
 # ---------------------- duration parsing ----------------------
 DUR_RE = re.compile(r"^(?:(\d+)d)?(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?$", re.I)
 DURATION_HINT = "Examples: 30m, 2h, 1d12h"
+REQUIREMENT_TTL = 15  # seconds a member's message/invite counts are reused on the entry path
 
 def parse_duration_to_seconds(s: str) -> Optional[int]:
     s = s.strip().lower()
@@ -31,18 +33,19 @@ class GiveawayCog(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db = GwyDB()
+        self.db = gwy_db
         self.manager = GiveawayManager(bot, self.db)
+        self._req_cache = {}  # (guild_id, user_id) -> (expires_at, messages, invites)
 
     # ---------------------- Cog lifecycle ----------------------
     async def cog_load(self):
         await self.db.setup()
+        entry_buffer.start(self.db)
         await self.manager.load_giveaways()
 
     async def cog_unload(self):
-        for task in list(self.manager._tasks.values()):
-            task.cancel()
-        self.manager._tasks.clear()
+        await self.manager.close()
+        await entry_buffer.flush()
 
     # ---------------------- Utilities ----------------------
     async def _require_manager_role(self, interaction: discord.Interaction) -> bool:
@@ -75,7 +78,7 @@ class GiveawayCog(commands.Cog):
         self,
         interaction: discord.Interaction,
         g: dict,
-        rtype: Literal["role", "min_messages", "min_invites"],
+        rtype: Literal["role", "min_messages", "min_invites", "weighted"],
         value: str,
     ):
         if rtype == "role":
@@ -104,6 +107,10 @@ class GiveawayCog(commands.Cog):
                     "Value must be a number.", ephemeral=True
                 )
             await self.db.update_requirements(int(g["message_id"]), min_invites=num)
+
+        elif rtype == "weighted":
+            enabled = value.strip().lower() in ("on", "yes", "true", "1")
+            await self.db.update_requirements(int(g["message_id"]), weight_by_messages=enabled)
         else:
             return await interaction.response.send_message(
                 "Unknown requirement type.", ephemeral=True
@@ -161,6 +168,7 @@ class GiveawayCog(commands.Cog):
                 except: pass
 
         await self.db.delete_giveaway(mid)
+        self.manager.unschedule(mid)
         await interaction.response.send_message("🗑️ Giveaway deleted.", ephemeral=True)
 
     @app_commands.command(name="gend", description="End a running giveaway now.")
@@ -173,6 +181,7 @@ class GiveawayCog(commands.Cog):
 
         g = await self.db.get_giveaway(mid)
         if not g: return await interaction.response.send_message("Giveaway not found.", ephemeral=True)
+        if g.get("status") != "running": return await interaction.response.send_message("Giveaway already ended.", ephemeral=True)
 
         await interaction.response.defer(ephemeral=True)
         try: await self.manager.end_giveaway(g)
@@ -190,11 +199,9 @@ class GiveawayCog(commands.Cog):
         g = await self.db.get_giveaway(mid)
         if not g: return await interaction.response.send_message("Giveaway not found.", ephemeral=True)
 
-        entries = await self.db.get_entries(mid)
-        if not entries: return await interaction.response.send_message("No entries to reroll.", ephemeral=True)
+        winners = await self.manager.reroll_winners(g)
+        if not winners: return await interaction.response.send_message("No entries to reroll.", ephemeral=True)
 
-        random.shuffle(entries)
-        winners = entries[: int(g["winners"])]
         guild = interaction.guild
         channel = guild.get_channel(int(g["channel_id"])) if guild else None
         if isinstance(channel, discord.TextChannel):
@@ -207,7 +214,7 @@ class GiveawayCog(commands.Cog):
     async def glist(self, interaction: discord.Interaction):
         if not await self._require_manager_role(interaction):
             return
-        running = await self.db.get_all_giveaways()
+        running = await self.db.get_active_giveaways()
         if not running: return await interaction.response.send_message("No running giveaways.", ephemeral=True)
         lines = [f"- **{g['prize']}** in <#{g['channel_id']}> — ends {self._fmt_time(int(g['end_time']))} — msgID `{g['message_id']}`" for g in running]
         await interaction.response.send_message("\n".join(lines), ephemeral=True)
@@ -220,11 +227,12 @@ class GiveawayCog(commands.Cog):
         g = await self.db.get_giveaway(mid)
         if not g: return await interaction.response.send_message("Giveaway not found.", ephemeral=True)
 
-        entries = await self.db.get_entries(mid)
+        entries = await self.db.count_entries(mid)
         reqs = []
         if g.get("required_role_id"): reqs.append(f"Role: <@&{int(g['required_role_id'])}>")
         if int(g.get("min_messages") or 0) > 0: reqs.append(f"Messages ≥ {int(g['min_messages'])}")
         if int(g.get("min_invites") or 0) > 0: reqs.append(f"Invites ≥ {int(g['min_invites'])}")
+        if g.get("weight_by_messages"): reqs.append("Entries weighted by messages")
         reqs_str = ", ".join(reqs) if reqs else "None"
 
         embed = discord.Embed(
@@ -234,20 +242,21 @@ class GiveawayCog(commands.Cog):
         )
         embed.add_field(name="Prize", value=str(g["prize"]), inline=False)
         embed.add_field(name="Winners", value=str(g["winners"]), inline=True)
-        embed.add_field(name="Status", value="Running", inline=True)
+        embed.add_field(name="Status", value=str(g.get("status") or "running").capitalize(), inline=True)
         embed.add_field(name="Ends", value=self._fmt_time(int(g["end_time"])), inline=False)
         embed.add_field(name="Channel", value=f"<#{g['channel_id']}>", inline=True)
         embed.add_field(name="Message ID", value=str(g["message_id"]), inline=True)
-        embed.add_field(name="Entries", value=str(len(entries)), inline=True)
+        embed.add_field(name="Entries", value=str(entries), inline=True)
         embed.add_field(name="Requirements", value=reqs_str, inline=False)
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @app_commands.command(name="gsetrequirement", description="Set a requirement for a running giveaway.")
-    @app_commands.describe(message_id="Giveaway message ID", type="Requirement type", value="Value (role mention/ID or number)")
+    @app_commands.describe(message_id="Giveaway message ID", type="Requirement type", value="Value (role mention/ID, number, or on/off)")
     @app_commands.choices(type=[
         app_commands.Choice(name="Role", value="role"),
         app_commands.Choice(name="Min Messages", value="min_messages"),
-        app_commands.Choice(name="Min Invites", value="min_invites")
+        app_commands.Choice(name="Min Invites", value="min_invites"),
+        app_commands.Choice(name="Weight by Messages (on/off)", value="weighted")
     ])
     async def gsetrequirement(self, interaction: discord.Interaction, message_id: str, type: app_commands.Choice[str], value: str):
         if not await self._require_manager_role(interaction):
@@ -271,7 +280,7 @@ class GiveawayCog(commands.Cog):
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
         if str(payload.emoji) != JOIN_EMOJI or payload.user_id == self.bot.user.id:
             return
-        g = await self.db.get_giveaway(payload.message_id)
+        g = await self.db.get_active_giveaway(payload.message_id)
         if not g: return
         guild = self.bot.get_guild(payload.guild_id)
         if not guild: return
@@ -282,22 +291,36 @@ class GiveawayCog(commands.Cog):
         if g.get("required_role_id") and not discord.utils.get(member.roles, id=int(g["required_role_id"])):
             await self._remove_reaction(payload)
             return
-        if await self.db.get_messages(guild.id, member.id) < int(g.get("min_messages") or 0):
-            await self._remove_reaction(payload)
-            return
-        if await self.db.get_invites(guild.id, member.id) < int(g.get("min_invites") or 0):
-            await self._remove_reaction(payload)
-            return
+        min_messages = int(g.get("min_messages") or 0)
+        min_invites = int(g.get("min_invites") or 0)
+        if min_messages or min_invites:
+            messages, invites = await self._requirement_counts(guild.id, member.id)
+            if messages < min_messages or invites < min_invites:
+                await self._remove_reaction(payload)
+                return
 
-        await self.db.add_entry(int(g["message_id"]), member.id)
+        entry_buffer.add(int(g["message_id"]), member.id)
 
     @commands.Cog.listener()
     async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
         if str(payload.emoji) != JOIN_EMOJI or payload.user_id == self.bot.user.id:
             return
-        g = await self.db.get_giveaway(payload.message_id)
+        g = await self.db.get_active_giveaway(payload.message_id)
         if not g: return
-        await self.db.remove_entry(int(g["message_id"]), int(payload.user_id))
+        entry_buffer.remove(int(g["message_id"]), int(payload.user_id))
+
+    async def _requirement_counts(self, guild_id: int, user_id: int):
+        """Message/invite counts for the entry path, reused for REQUIREMENT_TTL seconds."""
+        now = time.monotonic()
+        cached = self._req_cache.get((guild_id, user_id))
+        if cached and cached[0] > now:
+            return cached[1], cached[2]
+
+        if len(self._req_cache) > 10_000:
+            self._req_cache = {k: v for k, v in self._req_cache.items() if v[0] > now}
+        messages, invites = await self.db.get_requirement_counts(guild_id, user_id)
+        self._req_cache[(guild_id, user_id)] = (now + REQUIREMENT_TTL, messages, invites)
+        return messages, invites
 
     async def _remove_reaction(self, payload: discord.RawReactionActionEvent):
         guild = self.bot.get_guild(payload.guild_id)
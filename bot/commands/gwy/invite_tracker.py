@@ -1,75 +1,182 @@
 # invite_tracker.py
+import asyncio
+from collections import Counter
+from typing import Dict, Optional, Set, Tuple
+
 import discord
 from discord.ext import commands
-import aiosqlite
+from bot.database.gwydb import gwy_db
+
+WARMUP_CONCURRENCY = 4   # guild.invites() calls in flight at startup
+COALESCE_DELAY = 1.5     # seconds to let a burst of joins pile up before refreshing
+
+InviteState = Tuple[int, int, Optional[int]]  # (uses, max_uses, inviter_id)
+
 
 class InviteTracker(commands.Cog):
+    """
+    Attributes joins to inviters for the giveaway invite requirement.
+
+    Each guild's invites are cached as `{code: (uses, max_uses, inviter_id)}`
+    and kept current by `on_invite_create` / `on_invite_delete`. A join marks
+    the guild dirty; one refresh per guild runs after a short delay and
+    diffs the fresh listing against the cache in O(n), so a raid of joins
+    costs a handful of `guild.invites()` calls rather than one each.
+    An invite missing from the listing is only credited as used up when
+    the surviving invites don't account for every join since the last
+    refresh, so expired or revoked invites never earn phantom credit.
+    """
+
     def __init__(self, bot):
         self.bot = bot
-        self.invites = {}
+        self.invites: Dict[int, Dict[str, InviteState]] = {}
+        self._dirty: Set[int] = set()
+        self._joins: Counter = Counter()  # guild_id -> joins not yet diffed
+        self._refreshing: Dict[int, asyncio.Task] = {}
+        self._warmup: Optional[asyncio.Task] = None
 
     async def cog_load(self):
         # Load DB table
-        async with aiosqlite.connect("giveaways.db") as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS invites (
-                    guild_id INTEGER,
-                    user_id INTEGER,
-                    invites INTEGER,
-                    PRIMARY KEY (guild_id, user_id)
-                )
-            """)
-            await db.commit()
-
-        # Cache invites
-        for guild in self.bot.guilds:
-            self.invites[guild.id] = await guild.invites()
+        await gwy_db.setup()
+        self._warmup = asyncio.create_task(self._warm_all())
+
+    async def cog_unload(self):
+        for task in (self._warmup, *self._refreshing.values()):
+            if task:
+                task.cancel()
+
+    # ---------------- Cache ----------------
+    @staticmethod
+    def _snapshot(invites) -> Dict[str, InviteState]:
+        return {
+            invite.code: (invite.uses or 0, invite.max_uses or 0, invite.inviter.id if invite.inviter else None)
+            for invite in invites
+        }
+
+    async def _fetch(self, guild: discord.Guild) -> Optional[Dict[str, InviteState]]:
+        try:
+            return self._snapshot(await guild.invites())
+        except (discord.Forbidden, discord.HTTPException):
+            return None
+
+    async def _warm_all(self):
+        await self.bot.wait_until_ready()
+        limit = asyncio.Semaphore(WARMUP_CONCURRENCY)
+
+        async def warm(guild):
+            async with limit:
+                snapshot = await self._fetch(guild)
+                if snapshot is not None:
+                    self.invites[guild.id] = snapshot
+
+        await asyncio.gather(*(warm(guild) for guild in self.bot.guilds))
+        print(f"✅ Cached invites for {len(self.invites)} guild(s)")
+
+    def _request_refresh(self, guild: discord.Guild):
+        self._dirty.add(guild.id)
+        if guild.id not in self._refreshing:
+            self._refreshing[guild.id] = asyncio.create_task(self._refresh_loop(guild))
+
+    async def _refresh_loop(self, guild: discord.Guild):
+        try:
+            await asyncio.sleep(COALESCE_DELAY)
+            # Joins that land mid-refresh mark the guild dirty again
+            while guild.id in self._dirty:
+                self._dirty.discard(guild.id)
+                await self._refresh(guild)
+        finally:
+            self._refreshing.pop(guild.id, None)
 
+    async def _refresh(self, guild: discord.Guild):
+        joins = self._joins.pop(guild.id, 0)
+        fresh = await self._fetch(guild)
+        if fresh is None:
+            self._joins[guild.id] += joins
+            return
+
+        old = self.invites.get(guild.id)
+        self.invites[guild.id] = fresh
+        if old is None:
+            return  # nothing to diff against yet
+
+        credited = Counter()
+        vanished = []
+        attributed = 0
+        for code, (old_uses, max_uses, inviter_id) in old.items():
+            new = fresh.get(code)
+            if new is not None:
+                used = new[0] - old_uses
+                if used > 0:
+                    attributed += used
+                    if inviter_id:
+                        credited[inviter_id] += used
+            elif max_uses and old_uses + 1 >= max_uses:
+                vanished.append((max_uses - old_uses, inviter_id))
+
+        # A vanished invite may have had its last use consumed (Discord deletes
+        # it) or may simply have expired / been revoked; only the joins the
+        # live invites can't explain are handed out to it
+        unattributed = joins - attributed
+        for used, inviter_id in vanished:
+            if unattributed <= 0:
+                break
+            used = min(used, unattributed)
+            unattributed -= used
+            if inviter_id:
+                credited[inviter_id] += used
+
+        if credited:
+            await gwy_db.add_invite_counts([(guild.id, uid, n) for uid, n in credited.items()])
+
+    # ---------------- DB helpers ----------------
     async def add_invite(self, guild_id: int, user_id: int):
-        async with aiosqlite.connect("giveaways.db") as db:
-            await db.execute("""
-                INSERT INTO invites (guild_id, user_id, invites) 
-                VALUES (?, ?, 1)
-                ON CONFLICT(guild_id, user_id) 
-                DO UPDATE SET invites = invites + 1
-            """, (guild_id, user_id))
-            await db.commit()
+        await gwy_db.add_invite_counts([(guild_id, user_id, 1)])
 
     async def remove_invite(self, guild_id: int, user_id: int):
-        async with aiosqlite.connect("giveaways.db") as db:
-            await db.execute("""
-                UPDATE invites
-                SET invites = CASE 
-                    WHEN invites > 0 THEN invites - 1 
-                    ELSE 0 
-                END
-                WHERE guild_id = ? AND user_id = ?
-            """, (guild_id, user_id))
-            await db.commit()
+        await gwy_db.remove_invite(guild_id, user_id)
 
     async def get_invites(self, guild_id: int, user_id: int):
-        async with aiosqlite.connect("giveaways.db") as db:
-            cursor = await db.execute("SELECT invites FROM invites WHERE guild_id = ? AND user_id = ?", (guild_id, user_id))
-            row = await cursor.fetchone()
-            return row[0] if row else 0
+        return await gwy_db.get_invites(guild_id, user_id)
 
+    # ---------------- Listeners ----------------
     @commands.Cog.listener()
-    async def on_member_join(self, member: discord.Member):
-        guild = member.guild
-        new_invites = await guild.invites()
-        old_invites = self.invites[guild.id]
+    async def on_invite_create(self, invite: discord.Invite):
+        if invite.guild is None or invite.guild.id not in self.invites:
+            return
+        self.invites[invite.guild.id][invite.code] = (
+            invite.uses or 0, invite.max_uses or 0, invite.inviter.id if invite.inviter else None
+        )
 
-        inviter = None
-        for invite in new_invites:
-            for old in old_invites:
-                if invite.code == old.code and invite.uses > old.uses:
-                    inviter = invite.inviter
-                    break
+    @commands.Cog.listener()
+    async def on_invite_delete(self, invite: discord.Invite):
+        if invite.guild is None:
+            return
+        cached = self.invites.get(invite.guild.id)
+        if not cached or invite.code not in cached:
+            return
+        uses, max_uses, _ = cached[invite.code]
+        # An invite that just hit max_uses is deleted by Discord; leave it for
+        # the join's refresh to credit, which will also drop it from the cache
+        if max_uses and uses + 1 >= max_uses:
+            return
+        del cached[invite.code]
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        snapshot = await self._fetch(guild)
+        if snapshot is not None:
+            self.invites[guild.id] = snapshot
 
-        self.invites[guild.id] = new_invites
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.invites.pop(guild.id, None)
+        self._dirty.discard(guild.id)
+        self._joins.pop(guild.id, None)
 
-        if inviter:
-            await self.add_invite(guild.id, inviter.id)
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        self._joins[member.guild.id] += 1
+        self._request_refresh(member.guild)
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
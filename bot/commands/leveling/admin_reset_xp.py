@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from bot.database.database import database
+from bot.database.xpbuffer import xp_buffer
 
 
 class AdminResetXP(commands.Cog):
@@ -76,18 +77,22 @@ class AdminResetXP(commands.Cog):
 
     # 💾 Database Methods
     async def reset_user(self, guild_id, user_id):
+        await xp_buffer.flush()
         await database.db.execute(
             "DELETE FROM user_xp WHERE guild_id = ? AND user_id = ?",
             (str(guild_id), str(user_id))
         )
         await database.db.commit()
+        xp_buffer.invalidate(str(guild_id), str(user_id))
 
     async def reset_all(self, guild_id):
+        await xp_buffer.flush()
         await database.db.execute(
             "DELETE FROM user_xp WHERE guild_id = ?",
             (str(guild_id),)
         )
         await database.db.commit()
+        xp_buffer.invalidate(str(guild_id))
 
     # ✅ Embeds
     def success_embed(self, msg):
@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from bot.database.database import database
+from bot.database.levelpolicy import leveling_policies
 
 
 class ChannelXPMultiplier(commands.Cog):
@@ -121,12 +122,14 @@ class ChannelXPMultiplier(commands.Cog):
             ON CONFLICT(guild_id, target_id, type) DO UPDATE SET multiplier = excluded.multiplier
         """, (guild_id, channel_id, multiplier))
         await database.db.commit()
+        leveling_policies.invalidate(guild_id)
 
     async def remove(self, guild_id, channel_id):
         await database.db.execute("""
             DELETE FROM xp_multipliers WHERE guild_id = ? AND target_id = ? AND type = 'channel'
         """, (guild_id, channel_id))
         await database.db.commit()
+        leveling_policies.invalidate(guild_id)
 
     # ======================= ERRORS =======================
 
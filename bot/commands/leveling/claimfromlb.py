@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 import re
 from bot.database.database import database
+from bot.database.xpbuffer import xp_buffer
 from typing import List, Dict
 
 class LeaderboardProcessor(commands.Cog):
@@ -113,6 +114,7 @@ class LeaderboardProcessor(commands.Cog):
     async def store_leaderboard_data(self, guild: discord.Guild, entries: List[Dict]):
         await guild.chunk()
         guild_id_str = str(guild.id)
+        await xp_buffer.flush()
 
         for entry in entries:
             username = entry['username'].lower()
@@ -138,6 +140,7 @@ class LeaderboardProcessor(commands.Cog):
                 print(f"⚠️ Could not match username: {username}")
 
         await database.db.commit()
+        xp_buffer.invalidate(guild_id_str)
 
 async def setup(bot):
     await bot.add_cog(LeaderboardProcessor(bot))
@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from bot.database.database import database  # Make sure this path matches your project
+from bot.database.levelpolicy import leveling_policies
 
 class ToggleLeveling(commands.Cog):
     def __init__(self, bot):
@@ -44,6 +45,7 @@ class ToggleLeveling(commands.Cog):
             ON CONFLICT(guild_id) DO UPDATE SET leveling_enabled = excluded.leveling_enabled
         """, (str(guild_id), int(enabled)))
         await database.db.commit()
+        leveling_policies.invalidate(guild_id)
 
     def _success_embed(self, enabled: bool):
         return discord.Embed(
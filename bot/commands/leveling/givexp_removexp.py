@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from bot.database.database import database
+from bot.database.xpbuffer import xp_buffer
 
 
 class XPAdmin(commands.Cog):
@@ -108,6 +109,7 @@ class XPAdmin(commands.Cog):
     # ===================== DATABASE =====================
 
     async def modify_xp(self, guild_id: str, user_id: str, xp_change: int):
+        await xp_buffer.flush()
         async with database.db.execute("SELECT xp FROM user_xp WHERE guild_id = ? AND user_id = ?", (guild_id, user_id)) as cursor:
             row = await cursor.fetchone()
         current = row[0] if row else 0
@@ -119,6 +121,7 @@ class XPAdmin(commands.Cog):
             ON CONFLICT(guild_id, user_id) DO UPDATE SET xp = ?
         """, (guild_id, user_id, new_xp, new_xp))
         await database.db.commit()
+        xp_buffer.invalidate(guild_id, user_id)
 
     # ===================== ERROR HANDLERS =====================
 
@@ -2,6 +2,102 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from bot.database.database import database
+from bot.database.xpbuffer import xp_buffer
+from bot.utils.levels import levels_for
+from bot.utils.namecache import name_cache
+
+PAGE_SIZE = 10
+RANK_EMOJI = ["🥇", "🥈", "🥉"]
+
+
+def format_xp(xp: int):
+    if xp >= 1_000_000:
+        return f"{xp / 1_000_000:.1f}m"
+    elif xp >= 1_000:
+        return f"{xp / 1_000:.1f}k"
+    else:
+        return str(xp)
+
+
+class LeaderboardView(discord.ui.View):
+    """
+    Pager that only remembers the current page's rows and number.
+
+    Prev/next seek from the first/last (xp, user_id) on screen, so each
+    click is one indexed LIMIT query instead of holding the whole guild.
+    """
+
+    def __init__(self, cog, guild, total_pages, page_num, rows):
+        super().__init__(timeout=60)
+        self.cog = cog
+        self.guild = guild
+        self.guild_id = str(guild.id)
+        self.total_pages = total_pages
+        self.page_num = page_num
+        self.rows = rows
+
+    async def create_embed(self):
+        embed = discord.Embed(
+            title=f"Leaderboard for {self.guild.name} 🌍",
+            color=discord.Color.purple()
+        )
+
+        levels = levels_for(xp for _, xp in self.rows)
+        names = await name_cache.resolve(self.cog.bot, self.guild, [int(uid) for uid, _ in self.rows])
+
+        for index, (user_id, xp) in enumerate(self.rows):
+            global_rank = self.page_num * PAGE_SIZE + index + 1
+            rank = RANK_EMOJI[global_rank - 1] if global_rank <= 3 else str(global_rank)
+            embed.add_field(
+                name=f"{rank} {names.get(int(user_id), f'User {user_id}')}",
+                value=f"Level {levels[index]} ({format_xp(xp)} XP)",
+                inline=False
+            )
+
+        embed.set_footer(text=f"Page: {self.page_num + 1} / {self.total_pages}")
+        return embed
+
+    async def load_first(self):
+        self.page_num = 0
+        self.rows = await database.get_leaderboard_page(self.guild_id, limit=PAGE_SIZE)
+
+    async def load_last(self):
+        total_rows = await database.count_xp_users(self.guild_id)
+        self.total_pages = max(1, (total_rows + PAGE_SIZE - 1) // PAGE_SIZE)
+        self.page_num = self.total_pages - 1
+        remainder = total_rows - self.page_num * PAGE_SIZE
+        self.rows = await database.get_leaderboard_tail(self.guild_id, limit=remainder or PAGE_SIZE)
+
+    @discord.ui.button(label="◀️", style=discord.ButtonStyle.blurple)
+    async def prev(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.page_num == 0 or not self.rows:
+            await self.load_last()
+        else:
+            rows = await database.get_leaderboard_page(self.guild_id, before=self.rows[0], limit=PAGE_SIZE)
+            if rows:
+                self.page_num -= 1
+                self.rows = rows
+            else:
+                await self.load_last()
+        await interaction.response.edit_message(embed=await self.create_embed(), view=self)
+
+    @discord.ui.button(label="⏹️", style=discord.ButtonStyle.gray)
+    async def stop(self, interaction: discord.Interaction, button: discord.ui.Button):
+        for item in self.children:
+            item.disabled = True
+        await interaction.response.edit_message(view=self)
+
+    @discord.ui.button(label="▶️", style=discord.ButtonStyle.blurple)
+    async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
+        rows = []
+        if self.rows and self.page_num + 1 < self.total_pages:
+            rows = await database.get_leaderboard_page(self.guild_id, after=self.rows[-1], limit=PAGE_SIZE)
+        if rows:
+            self.page_num += 1
+            self.rows = rows
+        else:
+            await self.load_first()
+        await interaction.response.edit_message(embed=await self.create_embed(), view=self)
 
 
 class Leaderboard(commands.Cog):
@@ -30,12 +126,11 @@ class Leaderboard(commands.Cog):
 
     async def send_leaderboard(self, context):
         guild_id = str(context.guild.id)
-        async with database.db.execute(
-            "SELECT user_id, xp FROM user_xp WHERE guild_id = ? ORDER BY xp DESC", (guild_id,)
-        ) as cursor:
-            rows = await cursor.fetchall()
+        # Page queries read user_xp directly, so land any buffered chat XP first
+        await xp_buffer.flush()
 
-        if not rows:
+        total_rows = await database.count_xp_users(guild_id)
+        if not total_rows:
             embed = discord.Embed(
                 title="🏆 Leaderboard",
                 description="No XP data available yet.",
@@ -43,78 +138,10 @@ class Leaderboard(commands.Cog):
             )
             return await self.send(context, embed)
 
-        pages = [rows[i:i + 10] for i in range(0, len(rows), 10)]
-        total_pages = len(pages)
-
-        def format_xp(xp: int):
-            if xp >= 1_000_000:
-                return f"{xp / 1_000_000:.1f}m"
-            elif xp >= 1_000:
-                return f"{xp / 1_000:.1f}k"
-            else:
-                return str(xp)
-
-        async def create_embed(page_num):
-            page = pages[page_num]
-            embed = discord.Embed(
-                title=f"Leaderboard for {context.guild.name} 🌍",
-                color=discord.Color.purple()
-            )
-
-            rank_emoji = ["🥇", "🥈", "🥉"]
-
-            for index, row in enumerate(page):
-                user_id, xp = row
-                level = self.calculate_level(xp)
-                try:
-                    user = context.guild.get_member(int(user_id)) or await self.bot.fetch_user(int(user_id))
-                    name = user.name
-                except:
-                    name = f"User {user_id}"
-
-                formatted_xp = format_xp(xp)
-                global_rank = page_num * 10 + index + 1
-                rank = rank_emoji[global_rank - 1] if global_rank <= 3 else str(global_rank)
-                embed.add_field(
-                    name=f"{rank} {name}",
-                    value=f"Level {level} ({formatted_xp} XP)",
-                    inline=False
-                )
-
-            embed.set_footer(text=f"Page: {page_num + 1} / {total_pages}")
-            return embed
-
-        class LeaderboardView(discord.ui.View):
-            def __init__(self):
-                super().__init__(timeout=60)
-                self.page = 0
-
-            @discord.ui.button(label="◀️", style=discord.ButtonStyle.blurple)
-            async def prev(self, interaction: discord.Interaction, button: discord.ui.Button):
-                self.page = (self.page - 1) % total_pages
-                await interaction.response.edit_message(embed=await create_embed(self.page), view=self)
-
-            @discord.ui.button(label="⏹️", style=discord.ButtonStyle.gray)
-            async def stop(self, interaction: discord.Interaction, button: discord.ui.Button):
-                for item in self.children:
-                    item.disabled = True
-                await interaction.response.edit_message(view=self)
-
-            @discord.ui.button(label="▶️", style=discord.ButtonStyle.blurple)
-            async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
-                self.page = (self.page + 1) % total_pages
-                await interaction.response.edit_message(embed=await create_embed(self.page), view=self)
-
-        await self.send(context, await create_embed(0), view=LeaderboardView())
-
-    def calculate_level(self, xp):
-        level = 0
-        while self.get_xp_for_level(level + 1) <= xp:
-            level += 1
-        return level
-
-    def get_xp_for_level(self, level):
-        return int(5/6 * level * (2 * level**2 + 27 * level + 91))
+        total_pages = (total_rows + PAGE_SIZE - 1) // PAGE_SIZE
+        page = await database.get_leaderboard_page(guild_id, limit=PAGE_SIZE)
+        view = LeaderboardView(self, context.guild, total_pages, 0, page)
+        await self.send(context, await view.create_embed(), view=view)
 
     async def send(self, ctx_or_inter, embed, view=None):
         if isinstance(ctx_or_inter, commands.Context):
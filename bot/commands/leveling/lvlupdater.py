@@ -2,9 +2,8 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from bot.database.database import database
-
-def get_xp_for_level(level: int) -> int:
-    return int(5 / 6 * level * (2 * level**2 + 27 * level + 91))
+from bot.database.xpbuffer import xp_buffer
+from bot.utils.levels import MAX_LEVEL, calculate_level, get_xp_for_level
 
 class LevelAdmin(commands.Cog):
     def __init__(self, bot):
@@ -26,19 +25,19 @@ class LevelAdmin(commands.Cog):
         guild_id = str(ctx.guild.id)
         user_id = str(user.id)
 
+        await xp_buffer.flush()
         data = await database.get_xp(guild_id, user_id)
         current_xp = data["xp"] if data else 0
 
-        current_level = 0
-        while get_xp_for_level(current_level + 1) <= current_xp:
-            current_level += 1
+        current_level = calculate_level(current_xp)
 
-        new_level = min(current_level + level, 600)
+        new_level = min(current_level + level, MAX_LEVEL)
         target_xp = get_xp_for_level(new_level)
         additional_xp = target_xp - current_xp
 
         if additional_xp > 0:
             await database.set_user_custom_xp(guild_id, user_id, additional_xp)
+            xp_buffer.invalidate(guild_id, user_id)
 
         await self._send(
             ctx,
@@ -54,8 +53,11 @@ class LevelAdmin(commands.Cog):
         guild_id = str(ctx.guild.id)
         user_id = str(user.id)
 
+        await xp_buffer.flush()
+
         if levels is None:
             await database.reset_user(guild_id, user_id)
+            xp_buffer.invalidate(guild_id, user_id)
             return await self._send(ctx, f"🗑️ Fully reset XP data for {user.mention}.", ephemeral=True)
 
         if levels < 1 or levels > 600:
@@ -64,9 +66,7 @@ class LevelAdmin(commands.Cog):
         data = await database.get_xp(guild_id, user_id)
         current_xp = data["xp"] if data else 0
 
-        current_level = 0
-        while get_xp_for_level(current_level + 1) <= current_xp:
-            current_level += 1
+        current_level = calculate_level(current_xp)
 
         new_level = max(0, current_level - levels)
         new_target_xp = get_xp_for_level(new_level)
@@ -74,6 +74,7 @@ class LevelAdmin(commands.Cog):
 
         if xp_to_remove > 0:
             await database.remove_user_custom_xp(guild_id, user_id, xp_to_remove)
+            xp_buffer.invalidate(guild_id, user_id)
 
         await self._send(
             ctx,
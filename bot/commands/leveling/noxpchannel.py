@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from bot.database.database import database
+from bot.database.levelpolicy import leveling_policies
 
 class NoXPChannel(commands.Cog):
     def __init__(self, bot):
@@ -141,6 +142,7 @@ class NoXPChannel(commands.Cog):
             VALUES (?, ?)
         """, (str(guild_id), str(channel_id)))
         await database.db.commit()
+        leveling_policies.invalidate(guild_id)
 
     async def remove_block(self, guild_id, channel_id):
         await database.db.execute("""
@@ -148,6 +150,7 @@ class NoXPChannel(commands.Cog):
             WHERE guild_id = ? AND channel_id = ?
         """, (str(guild_id), str(channel_id)))
         await database.db.commit()
+        leveling_policies.invalidate(guild_id)
 
     async def fetch_blocked(self, guild):
         async with database.db.execute("""
@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from bot.database.database import database  # ✅ Points to your aiosqlite setup
+from bot.database.levelpolicy import leveling_policies
 
 
 class RoleXPMultiplier(commands.Cog):
@@ -96,6 +97,7 @@ class RoleXPMultiplier(commands.Cog):
             DO UPDATE SET multiplier = excluded.multiplier
         """, (str(guild_id), str(role_id), multiplier))
         await database.db.commit()
+        leveling_policies.invalidate(guild_id)
 
     async def remove(self, guild_id, role_id):
         await database.db.execute("""
@@ -103,6 +105,7 @@ class RoleXPMultiplier(commands.Cog):
             WHERE guild_id = ? AND target_id = ? AND type = 'role'
         """, (str(guild_id), str(role_id)))
         await database.db.commit()
+        leveling_policies.invalidate(guild_id)
 
 
 async def setup(bot):
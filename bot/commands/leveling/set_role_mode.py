@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from bot.database.database import database  # Make sure this is your aiosqlite manager
+from bot.database.levelpolicy import leveling_policies
 
 class SetRoleMode(commands.Cog):
     def __init__(self, bot):
@@ -46,6 +47,7 @@ class SetRoleMode(commands.Cog):
             ON CONFLICT(guild_id) DO UPDATE SET role_mode = excluded.role_mode
         """, (str(guild_id), mode))
         await database.db.commit()
+        leveling_policies.invalidate(guild_id)
 
 async def setup(bot):
     await bot.add_cog(SetRoleMode(bot))
@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from bot.database.database import database  # your aiosqlite wrapper
+from bot.database.levelpolicy import leveling_policies
 
 class SetXPCooldown(commands.Cog):
     def __init__(self, bot):
@@ -36,6 +37,7 @@ class SetXPCooldown(commands.Cog):
             ON CONFLICT(guild_id) DO UPDATE SET xp_cooldown_seconds = excluded.xp_cooldown_seconds
         """, (str(guild_id), seconds))
         await database.db.commit()
+        leveling_policies.invalidate(guild_id)
 
     def success_embed(self, seconds):
         return discord.Embed(
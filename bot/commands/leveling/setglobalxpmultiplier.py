@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from bot.database.database import database  # your aiosqlite-compatible wrapper
+from bot.database.levelpolicy import leveling_policies
 
 class SetGlobalXPMultiplier(commands.Cog):
     def __init__(self, bot):
@@ -46,6 +47,7 @@ class SetGlobalXPMultiplier(commands.Cog):
             ON CONFLICT(guild_id) DO UPDATE SET global_multiplier = excluded.global_multiplier
         """, (str(guild_id), multiplier))
         await database.db.commit()
+        leveling_policies.invalidate(guild_id)
 
     def success_embed(self, multiplier):
         return discord.Embed(
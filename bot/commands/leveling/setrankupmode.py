@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from bot.database.database import database  # SQLite wrapper module
+from bot.database.levelpolicy import leveling_policies
 
 class SetRankupMode(commands.Cog):
     def __init__(self, bot):
@@ -50,6 +51,7 @@ class SetRankupMode(commands.Cog):
             """, (str(guild_id), mode))
 
         await database.db.commit()
+        leveling_policies.invalidate(guild_id)
         return True
 
     def success_embed(self, mode, channel):
@@ -2,58 +2,44 @@ import discord
 from discord.ext import commands
 import time
 from bot.database.database import database
+from bot.database.xpbuffer import xp_buffer
+from bot.core.pipeline import message_pipeline
+from bot.utils.levels import calculate_level
 
 class XPAuto(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.cooldowns = {}  # {(guild_id, user_id): last_timestamp}
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot or not message.guild:
-            return
+    async def cog_load(self):
+        message_pipeline.register("xp", self.on_message_stage, order=30)
 
-        guild_id = str(message.guild.id)
-        user_id = str(message.author.id)
-        channel_id = str(message.channel.id)
-
-        # ✅ Load XP Config
-        async with database.db.execute("SELECT * FROM config WHERE guild_id = ?", (guild_id,)) as cursor:
-            row = await cursor.fetchone()
-
-        if not row:
-            await database.db.execute("""
-                INSERT INTO config (guild_id, leveling_enabled, rankup_mode, rankup_channel)
-                VALUES (?, ?, ?, ?)
-            """, (guild_id, 1, "channel", None))
-            await database.db.commit()
-            config = {
-                "leveling_enabled": 1,
-                "xp_cooldown_seconds": 60,
-                "rankup_mode": "channel",
-                "rankup_channel": None,
-            }
-        else:
-            config = dict(row)
+    def cog_unload(self):
+        message_pipeline.unregister("xp")
+
+    async def on_message_stage(self, ctx):
+        message = ctx.message
+        guild_id = ctx.guild_id
+        user_id = ctx.author_id
+        channel_id = ctx.channel_id
 
-        if config.get("leveling_enabled") != 1:
+        # ✅ Compiled leveling policy, resolved once by the pipeline
+        policy = ctx.policy
+        config = policy.config
+
+        if not policy.enabled:
             return
 
         # ✅ Cooldown per user per guild
-        cooldown = config.get("xp_cooldown_seconds", 60)
         now = time.time()
         last_time = self.cooldowns.get((guild_id, user_id), 0)
-        if now - last_time < cooldown:
+        if now - last_time < policy.cooldown:
             return
         self.cooldowns[(guild_id, user_id)] = now
 
         # ✅ Ignore XP in blocked channels
-        async with database.db.execute(
-            "SELECT 1 FROM no_xp_channels WHERE guild_id = ? AND channel_id = ?",
-            (guild_id, channel_id)
-        ) as cursor:
-            if await cursor.fetchone():
-                return
+        if policy.is_blocked(channel_id):
+            return
 
         # ✅ XP = based on message length (5 chars = 1 XP, capped at 25 XP)
                 # Determine if message contains something
@@ -82,53 +68,19 @@ class XPAuto(commands.Cog):
             base_xp = max(base_xp, 5)  # Minimum 5 XP for valid text
 
 
-        multiplier = 1.0
-
-        # ✅ Channel XP multiplier
-        async with database.db.execute(
-            "SELECT multiplier FROM xp_multipliers WHERE guild_id = ? AND target_id = ? AND type = 'channel'",
-            (guild_id, channel_id)
-        ) as cursor:
-            row = await cursor.fetchone()
-            if row:
-                multiplier *= float(row["multiplier"])
-
-        # ✅ Role XP multiplier (use highest)
-        user_roles = [str(role.id) for role in message.author.roles]
-        if user_roles:
-            placeholders = ",".join("?" * len(user_roles))
-            query = f"""
-                SELECT multiplier FROM xp_multipliers
-                WHERE guild_id = ? AND target_id IN ({placeholders}) AND type = 'role'
-            """
-            async with database.db.execute(query, (guild_id, *user_roles)) as cursor:
-                multipliers = [float(r["multiplier"]) async for r in cursor]
-                if multipliers:
-                    multiplier *= max(multipliers)
+        # ✅ Channel multiplier × highest role multiplier
+        multiplier = policy.multiplier_for(channel_id, ctx.role_ids)
 
         earned_xp = int(base_xp * multiplier)
 
-        # ✅ Update DB
-        await database.db.execute("""
-            INSERT INTO user_xp (guild_id, user_id, xp, last_message_ts)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(guild_id, user_id)
-            DO UPDATE SET xp = xp + excluded.xp, last_message_ts = excluded.last_message_ts
-        """, (guild_id, user_id, earned_xp, int(message.created_at.timestamp())))
-        await database.db.commit()
-
-        # ✅ Check level-up
-        async with database.db.execute(
-            "SELECT xp FROM user_xp WHERE guild_id = ? AND user_id = ?",
-            (guild_id, user_id)
-        ) as cursor:
-            xp_row = await cursor.fetchone()
-        if not xp_row:
-            return
+        # ✅ Queue XP (group-committed by the write-behind buffer)
+        old_xp, total_xp = await xp_buffer.add(
+            guild_id, user_id, earned_xp, int(message.created_at.timestamp())
+        )
 
-        total_xp = xp_row["xp"]
-        new_level = self.calculate_level(total_xp)
-        old_level = self.calculate_level(total_xp - earned_xp)
+        # ✅ Check level-up from the in-memory total
+        new_level = calculate_level(total_xp)
+        old_level = calculate_level(old_xp)
 
         if new_level > old_level:
             await self.send_rankup_notice(message, new_level, config)
@@ -179,14 +131,5 @@ class XPAuto(commands.Cog):
                 except discord.Forbidden:
                     pass
 
-    def get_xp_for_level(self, level):
-        return int(5 / 6 * level * (2 * level ** 2 + 27 * level + 91))
-
-    def calculate_level(self, xp):
-        level = 0
-        while self.get_xp_for_level(level + 1) <= xp:
-            level += 1
-        return level
-
 async def setup(bot):
     await bot.add_cog(XPAuto(bot))
@@ -6,6 +6,7 @@ from PIL import Image
 import aiohttp
 from io import BytesIO
 from bot.database.database import database
+from bot.database.xpbuffer import xp_buffer
 
 
 class XPClaim(commands.Cog):
@@ -74,7 +75,9 @@ class XPClaim(commands.Cog):
             return await ctx.send("❌ You’ve already claimed XP from Scrump.")
 
         # ✅ Store XP
+        await xp_buffer.flush()
         await database.update_xp(guild_id, user_id, xp, ts=0)
+        xp_buffer.invalidate(guild_id, user_id)
         await database.db.execute(
             "INSERT INTO claimed_xp (guild_id, user_id, claimed) VALUES (?, ?, 1)",
             (guild_id, user_id),
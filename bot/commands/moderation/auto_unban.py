@@ -1,71 +1,168 @@
 # bot/commands/moderation/auto_unban.py
 
+import asyncio
+import heapq
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from firebase_admin import firestore
-from datetime import datetime
+from bot.utils.asyncfirestore import async_db
+from datetime import datetime, timezone
+import time
 import traceback
 
+PER_GUILD_CONCURRENCY = 3  # Discord's ban/unban route is limited per guild
+GLOBAL_CONCURRENCY = 10
+RETRY_DELAY = 60
+
+def parse_unban_time(value):
+    # `unban_time` is a naive UTC ISO string (datetime.utcnow().isoformat())
+    try:
+        dt = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
 class AutoUnban(commands.Cog):
+    """
+    Timed bans from the Firestore `bans` collection, expired on a deadline.
+
+    A collection listener feeds a local min-heap; one task sleeps until the
+    earliest `unban_time` and then drains every overdue ban in one batch,
+    concurrently per guild. Firestore is only the durable copy: docs are
+    deleted once the unban lands. The listener's first snapshot doubles as
+    startup catch-up for bans that expired while the bot was offline.
+    """
+
     def __init__(self, bot):
         self.bot = bot
         self.db = firestore.client()
-        self.auto_unban.start()
+        self.heap = []      # (due_ts, doc_id)
+        self.pending = {}   # doc_id -> (due_ts, guild_id, user_id)
+        self.wakeup = asyncio.Event()
+        self.global_limit = asyncio.Semaphore(GLOBAL_CONCURRENCY)
+        self.guild_limits = {}
+        self.watch = None
+        self.runner = None
+
+    async def cog_load(self):
+        loop = asyncio.get_running_loop()
+
+        def on_snapshot(docs, changes, read_time):
+            payload = [(change.type.name, change.document.id, change.document.to_dict()) for change in changes]
+            loop.call_soon_threadsafe(self.apply_changes, payload)
+
+        self.watch = self.db.collection("bans").on_snapshot(on_snapshot)
+        self.runner = asyncio.create_task(self.run())
 
     def cog_unload(self):
-        self.auto_unban.cancel()
+        if self.watch:
+            self.watch.unsubscribe()
+        if self.runner:
+            self.runner.cancel()
 
-    @tasks.loop(seconds=30)
-    async def auto_unban(self):
-        try:
-            now = datetime.utcnow().isoformat()
-            query = self.db.collection("bans").where("unban_time", "<=", now)
-            docs = list(query.stream())  # ✅ Fix: Not async
+    def apply_changes(self, changes):
+        for kind, doc_id, data in changes:
+            if kind == "REMOVED":
+                self.pending.pop(doc_id, None)  # heap entry goes stale
+                continue
+            due = parse_unban_time((data or {}).get("unban_time"))
+            if due is None:
+                continue
+            try:
+                guild_id, user_id = int(data["guild_id"]), int(data["user_id"])
+            except (KeyError, TypeError, ValueError):
+                print(f"⚠️ Skipping malformed ban doc {doc_id}: {data}")
+                continue
+            self.pending[doc_id] = (due, guild_id, user_id)
+            heapq.heappush(self.heap, (due, doc_id))
+        self.wakeup.set()
 
-            for doc in docs:
-                data = doc.to_dict()
-                guild_id = int(data["guild_id"])
-                user_id = int(data["user_id"])
+    def pop_overdue(self):
+        now = time.time()
+        batch = []
+        while self.heap and self.heap[0][0] <= now:
+            due, doc_id = heapq.heappop(self.heap)
+            entry = self.pending.get(doc_id)
+            if entry and entry[0] == due:
+                del self.pending[doc_id]
+                batch.append((doc_id, entry[1], entry[2]))
+        return batch
+
+    async def run(self):
+        await self.bot.wait_until_ready()
+        while True:
+            # Drop heap entries superseded by a change or removal
+            while self.heap and self.pending.get(self.heap[0][1], (None,))[0] != self.heap[0][0]:
+                heapq.heappop(self.heap)
 
-                guild = self.bot.get_guild(guild_id)
-                if not guild:
-                    continue
+            self.wakeup.clear()
+            batch = self.pop_overdue()
+            if batch:
+                if len(batch) > 1:
+                    print(f"⏰ Auto-unban draining {len(batch)} overdue ban(s)")
+                await asyncio.gather(*(self.expire(*entry) for entry in batch))
+                continue
 
+            timeout = self.heap[0][0] - time.time() if self.heap else None
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def requeue(self, doc_id, guild_id, user_id):
+        due = time.time() + RETRY_DELAY
+        self.pending[doc_id] = (due, guild_id, user_id)
+        heapq.heappush(self.heap, (due, doc_id))
+        self.wakeup.set()
+
+    async def expire(self, doc_id, guild_id, user_id):
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            # Guild unavailable (outage / cache not ready) — try again later
+            self.requeue(doc_id, guild_id, user_id)
+            return
+
+        guild_limit = self.guild_limits.setdefault(guild_id, asyncio.Semaphore(PER_GUILD_CONCURRENCY))
+        async with self.global_limit, guild_limit:
+            try:
                 try:
                     await guild.unban(discord.Object(id=user_id), reason="Auto unban after timed ban expired")
+                except discord.HTTPException as e:
+                    if e.status != 429:
+                        raise
+                    # discord.py already retried; back off once more before giving up
+                    await asyncio.sleep(getattr(e, "retry_after", 5) or 5)
+                    await guild.unban(discord.Object(id=user_id), reason="Auto unban after timed ban expired")
 
-                    # Log auto-unban (optional Firestore modlog)
-                    logs_ref = self.db.collection("logs").document(str(guild_id)).collection("moderation")
-                    logs_ref.document().set({
-                        "case_id": f"AUTO-{datetime.utcnow().timestamp()}",
-                        "type": "Unban",
-                        "user_id": str(user_id),
-                        "moderator_id": "0",
-                        "moderator_tag": "AutoMod",
-                        "reason": "Temporary ban duration expired",
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "duration": None,
-                        "auto": True
-                    })
-
-                    # Delete the ban document
-                    doc.reference.delete()
-
-                    print(f"✅ Auto-unbanned user {user_id} in guild {guild_id}")
-
-                except discord.NotFound:
-                    # User already unbanned
-                    doc.reference.delete()
-                except Exception as e:
-                    print(f"⚠️ Error auto-unbanning {user_id} in guild {guild_id}:", e)
-
-        except Exception as e:
-            print("❌ AutoUnban Task Error:")
-            traceback.print_exc()
-
-    @auto_unban.before_loop
-    async def before_auto_unban(self):
-        await self.bot.wait_until_ready()
+                # Log auto-unban (optional Firestore modlog)
+                logs_ref = self.db.collection("logs").document(str(guild_id)).collection("moderation")
+                await async_db.set(logs_ref.document(), {
+                    "case_id": f"AUTO-{datetime.utcnow().timestamp()}",
+                    "type": "Unban",
+                    "user_id": str(user_id),
+                    "moderator_id": "0",
+                    "moderator_tag": "AutoMod",
+                    "reason": "Temporary ban duration expired",
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "duration": None,
+                    "auto": True
+                })
+
+                # Delete the ban document
+                await async_db.delete(self.db.collection("bans").document(doc_id))
+
+                print(f"✅ Auto-unbanned user {user_id} in guild {guild_id}")
+
+            except discord.NotFound:
+                # User already unbanned
+                await async_db.delete(self.db.collection("bans").document(doc_id))
+            except Exception as e:
+                print(f"⚠️ Error auto-unbanning {user_id} in guild {guild_id}:", e)
+                traceback.print_exc()
+                # Keep the doc and try again later
+                self.requeue(doc_id, guild_id, user_id)
 
 async def setup(bot):
     await bot.add_cog(AutoUnban(bot))
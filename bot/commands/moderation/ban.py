@@ -1,20 +1,48 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from firebase_admin import firestore
-from discord.utils import utcnow
 from bot.utils.taskmanager import task_manager
-from bot.utils.casecounter import get_next_case_number
-import asyncio
+from bot.utils.firestore_utils import log_moderation_action
+from bot.utils.guildsettings import settings_cache
 import traceback
 
 ERROR_LOG_CHANNEL_ID = 1398974738579198082
 
-db = firestore.client()
-
 class Ban(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        task_manager.register("unban", self.expire_ban)
+
+    async def expire_ban(self, guild, payload):
+        # ✅ Fired by the persistent scheduler when a temp-ban runs out
+        try:
+            user = await self.bot.fetch_user(payload["user_id"])
+            await guild.unban(user, reason="Temporary ban expired.")
+        except discord.NotFound:
+            return  # already unbanned
+        except Exception as e:
+            if not task_manager.is_transient(e):
+                log_channel = self.bot.get_channel(ERROR_LOG_CHANNEL_ID)
+                if log_channel:
+                    await log_channel.send(f":GhostError: Auto-unban failed\n```py\n{e}```")
+            raise  # ✅ Let the scheduler retry or drop the job
+
+        try:
+            invite = None
+            for channel in guild.text_channels:
+                if channel.permissions_for(guild.me).create_instant_invite:
+                    invite = await channel.create_invite(max_uses=1, unique=True)
+                    break
+            if invite:
+                try:
+                    await user.send(
+                        f"🔓 You have been unbanned from **{guild.name}**.\n"
+                        f"Here is your invite link to rejoin: {invite.url}"
+                    )
+                except:
+                    pass
+        except Exception as e:
+            print(f"[AutoUnban] Rejoin invite failed for case #{payload.get('case')} → {e}")
 
     def parse_duration(self, s):
         try:
@@ -40,9 +68,7 @@ class Ban(commands.Cog):
         if ctx.command.name.lower() in self.bot.disabled_commands.get(guild_id, []):
             return
 
-        config_ref = db.collection("server_config").document(guild_id)
-        config_data = config_ref.get().to_dict() or {}
-        allowed_roles = [r.lower() for r in config_data.get("ban_roles", ["admin", "moderator", "senior mod"])]
+        allowed_roles = settings_cache.get(guild_id).ban_roles
         has_allowed_role = any(role.name.lower() in allowed_roles for role in ctx.author.roles)
         perms = ctx.author.guild_permissions
         has_permission = perms.ban_members or perms.administrator
@@ -125,49 +151,16 @@ class Ban(commands.Cog):
         await ctx.send(embed=confirm)
 
         try:
-            logs_ref = db.collection("moderation") \
-                         .document(guild_id) \
-                         .collection("logs") \
-                         .document()
-
-            case_number = await get_next_case_number(ctx.guild.id)
-
-            logs_ref.set({
-                "case": case_number,
-                "user_id": user.id,
-                "user_tag": str(user),
-                "moderator_id": ctx.author.id,
-                "moderator_tag": str(ctx.author),
-                "reason": final_reason,
-                "action": "ban",
-                "duration": duration_label,
-                "timestamp": int(utcnow().timestamp())
-            })
+            case_number = await log_moderation_action(
+                guild_id, user, ctx.author, final_reason, "ban", duration=duration_label
+            )
+            await task_manager.cancel_user(ctx.guild.id, "unban", user.id)  # ✅ A new ban supersedes an older timer
 
             if duration_seconds:
-                async def unban_later():
-                    await asyncio.sleep(duration_seconds)
-                    try:
-                        await ctx.guild.unban(user, reason="Temporary ban expired.")
-                        invite = None
-                        for channel in ctx.guild.text_channels:
-                            if channel.permissions_for(ctx.guild.me).create_instant_invite:
-                                invite = await channel.create_invite(max_uses=1, unique=True)
-                                break
-                        if invite:
-                            try:
-                                await user.send(
-                                    f"🔓 You have been unbanned from **{ctx.guild.name}**.\n"
-                                    f"Here is your invite link to rejoin: {invite.url}"
-                                )
-                            except:
-                                pass
-                    except Exception as e:
-                        log_channel = self.bot.get_channel(ERROR_LOG_CHANNEL_ID)
-                        if log_channel:
-                            await log_channel.send(f":GhostError: Auto-unban failed\n```py\n{e}```")
-
-                task_manager.schedule(case_number, unban_later())
+                await task_manager.schedule(
+                    ctx.guild.id, case_number, "unban", delay=duration_seconds,
+                    payload={"case": case_number, "user_id": user.id}
+                )
 
         except Exception as e:
             log_channel = self.bot.get_channel(ERROR_LOG_CHANNEL_ID)
@@ -1,10 +1,9 @@
 import discord
 from discord.ext import commands
-from firebase_admin import firestore
+from bot.utils.firestore_utils import get_case
+from bot.database.modmirror import mod_mirror
 from datetime import datetime
 
-db = firestore.client()
-
 class Case(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -30,25 +29,25 @@ class Case(commands.Cog):
             )
             return await ctx.send(embed=embed)
 
-        logs_ref = db.collection("moderation").document(guild_id).collection("logs")
-
         try:
-            for doc in logs_ref.stream():
-                data = doc.to_dict()
-                if str(data.get("case")) == str(case_number) or str(data.get("case_number")) == str(case_number):
-                    timestamp = data.get("timestamp")
-                    time_str = datetime.utcfromtimestamp(timestamp).strftime("%d/%m/%Y %H:%M") if timestamp else "Unknown"
+            data = await mod_mirror.get_case(guild_id, case_number) if mod_mirror.is_ready(guild_id) else None
+            if data is None:
+                doc = await get_case(guild_id, case_number)
+                data = doc.to_dict() if doc else None
+            if data:
+                timestamp = data.get("timestamp")
+                time_str = datetime.utcfromtimestamp(timestamp).strftime("%d/%m/%Y %H:%M") if timestamp else "Unknown"
 
-                    embed = discord.Embed(
-                        title=f"Case #{case_number} | {data.get('action').capitalize()}",
-                        color=discord.Color.purple()
-                    )
-                    embed.add_field(name="User", value=f"{data.get('user_tag')} (`{data.get('user_id')}`)", inline=False)
-                    embed.add_field(name="Moderator", value=f"<@{data.get('moderator_id')}>", inline=False)
-                    embed.add_field(name="Reason", value=data.get("reason") or "No reason provided", inline=False)
-                    embed.set_footer(text=f"{time_str}")
+                embed = discord.Embed(
+                    title=f"Case #{case_number} | {data.get('action').capitalize()}",
+                    color=discord.Color.purple()
+                )
+                embed.add_field(name="User", value=f"{data.get('user_tag')} (`{data.get('user_id')}`)", inline=False)
+                embed.add_field(name="Moderator", value=f"<@{data.get('moderator_id')}>", inline=False)
+                embed.add_field(name="Reason", value=data.get("reason") or "No reason provided", inline=False)
+                embed.set_footer(text=f"{time_str}")
 
-                    return await ctx.send(embed=embed)
+                return await ctx.send(embed=embed)
 
             embed = discord.Embed(
                 description=f"No case with number `#{case_number}` found.",
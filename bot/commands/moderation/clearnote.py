@@ -1,6 +1,8 @@
 import discord
 from discord.ext import commands
 from firebase_admin import firestore
+from bot.utils.asyncfirestore import async_db
+from bot.database.modmirror import mod_mirror
 
 db = firestore.client()
 
@@ -35,7 +37,7 @@ class ClearNote(commands.Cog):
             .where("guild_id", "==", guild_id) \
             .where("user_id", "==", str(member.id))
 
-        docs = list(query.stream())
+        docs = await async_db.stream(query)
 
         if not docs:
             return await ctx.send(embed=discord.Embed(
@@ -45,7 +47,11 @@ class ClearNote(commands.Cog):
             ))
 
         for doc in docs:
-            doc.reference.delete()
+            await async_db.delete(doc.reference)
+        try:
+            await mod_mirror.delete_notes([doc.id for doc in docs])
+        except Exception as e:
+            print(f"[ModMirror] Failed to mirror notes for {member.id} → {e}")
 
         embed = discord.Embed(
             title=":GhostSuccess: All Notes Cleared",
@@ -1,6 +1,8 @@
 import discord
 from discord.ext import commands
 from firebase_admin import firestore
+from bot.utils.asyncfirestore import async_db
+from bot.database.modmirror import mod_mirror
 from datetime import datetime
 
 db = firestore.client()
@@ -37,7 +39,7 @@ class ClearWarn(commands.Cog):
         warnings_ref = db.collection("infractions").document(guild_id).collection("users").document(user_id)
 
         try:
-            doc = warnings_ref.get()
+            doc = await async_db.get(warnings_ref)
             if not doc.exists or not doc.to_dict().get("warnings"):
                 return await ctx.send(embed=discord.Embed(
                     description=f":GhostError: **{member.mention} has no warnings to clear.**",
@@ -45,7 +47,11 @@ class ClearWarn(commands.Cog):
                 ))
 
             # Clear all warnings
-            warnings_ref.set({"warnings": []}, merge=True)
+            await async_db.set(warnings_ref, {"warnings": []}, merge=True)
+            try:
+                await mod_mirror.replace_warnings(guild_id, user_id, [])
+            except Exception as e:
+                print(f"[ModMirror] Failed to mirror warnings for {user_id} → {e}")
 
             # Confirmation embed
             embed = discord.Embed(
@@ -56,7 +62,7 @@ class ClearWarn(commands.Cog):
 
             # Log the action
             logs_ref = db.collection("logs").document(guild_id).collection("moderation").document()
-            logs_ref.set({
+            await async_db.set(logs_ref, {
                 "user_id": member.id,
                 "user_tag": str(member),
                 "moderator_id": ctx.author.id,
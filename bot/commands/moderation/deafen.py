@@ -1,10 +1,6 @@
 import discord
 from discord.ext import commands
-from firebase_admin import firestore
-from discord.utils import utcnow
-from bot.utils.casecounter import get_next_case_number
-
-db = firestore.client()
+from bot.utils.firestore_utils import log_moderation_action
 
 class VoiceDeafen(commands.Cog):
     def __init__(self, bot):
@@ -64,18 +60,7 @@ class VoiceDeafen(commands.Cog):
             await ctx.send(embed=embed)
 
             # Firestore logging
-            case_number = await get_next_case_number(ctx.guild.id)
-            logs_ref = db.collection("moderation").document(guild_id).collection("logs").document()
-            logs_ref.set({
-                "case": case_number,
-                "user_id": member.id,
-                "user_tag": str(member),
-                "moderator_id": ctx.author.id,
-                "moderator_tag": str(ctx.author),
-                "reason": reason,
-                "action": "deafen",
-                "timestamp": int(utcnow().timestamp())
-            })
+            await log_moderation_action(guild_id, member, ctx.author, reason, "deafen")
 
         except discord.Forbidden:
             await ctx.send(embed=discord.Embed(
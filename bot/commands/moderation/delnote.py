@@ -1,6 +1,8 @@
 import discord
 from discord.ext import commands
 from firebase_admin import firestore
+from bot.utils.asyncfirestore import async_db
+from bot.database.modmirror import mod_mirror
 
 db = firestore.client()
 
@@ -24,7 +26,11 @@ class DeleteNoteDropdown(discord.ui.Select):
         if not note:
             return await interaction.response.send_message(":GhostError: Note not found.", ephemeral=True)
 
-        db.collection("notes").document(note_id).delete()
+        await async_db.delete(db.collection("notes").document(note_id))
+        try:
+            await mod_mirror.delete_notes([note_id])
+        except Exception as e:
+            print(f"[ModMirror] Failed to mirror note {note_id} → {e}")
 
         embed = discord.Embed(
             title=":GhostSuccess: Note Deleted",
@@ -69,7 +75,7 @@ class DeleteNoteCog(commands.Cog):
             .where("guild_id", "==", guild_id) \
             .where("user_id", "==", str(member.id))
 
-        docs = list(query.stream())
+        docs = await async_db.stream(query)
 
         if not docs:
             embed = discord.Embed(
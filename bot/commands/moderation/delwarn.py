@@ -1,6 +1,8 @@
 import discord
 from discord.ext import commands
 from firebase_admin import firestore
+from bot.utils.asyncfirestore import async_db
+from bot.database.modmirror import mod_mirror
 from datetime import datetime
 
 db = firestore.client()
@@ -35,7 +37,7 @@ class DelWarn(commands.Cog):
 
         user_id = str(member.id)
         warnings_ref = db.collection("infractions").document(guild_id).collection("users").document(user_id)
-        doc = warnings_ref.get()
+        doc = await async_db.get(warnings_ref)
 
         if not doc.exists:
             return await ctx.send(f":GhostError: {member.mention} has no warnings.")
@@ -48,7 +50,11 @@ class DelWarn(commands.Cog):
             )
 
         removed = warnings.pop(index - 1)
-        warnings_ref.set({"warnings": warnings}, merge=True)
+        await async_db.set(warnings_ref, {"warnings": warnings}, merge=True)
+        try:
+            await mod_mirror.replace_warnings(guild_id, user_id, warnings)
+        except Exception as e:
+            print(f"[ModMirror] Failed to mirror warnings for {user_id} → {e}")
 
         embed = discord.Embed(
             title=":GhostSuccess: Warning Removed",
@@ -71,7 +77,7 @@ class DelWarn(commands.Cog):
 
         # Audit log
         logs_ref = db.collection("logs").document(guild_id).collection("moderation").document()
-        logs_ref.set({
+        await async_db.set(logs_ref, {
             "user_id": member.id,
             "user_tag": str(member),
             "moderator_id": ctx.author.id,
@@ -1,13 +1,10 @@
 import discord
 from discord.ext import commands
-from firebase_admin import firestore
-from discord.utils import utcnow
-import asyncio
-
+from bot.utils.asyncfirestore import async_db
+from bot.utils.firestore_utils import get_case
+from bot.database.modmirror import mod_mirror
 from bot.utils.taskmanager import task_manager  # ✅ Task scheduler
 
-db = firestore.client()
-
 class Duration(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -36,14 +33,7 @@ class Duration(commands.Cog):
             return await ctx.send(embed=embed)
 
         try:
-            logs_ref = db.collection("moderation").document(guild_id).collection("logs")
-            matched_doc = None
-
-            for doc in logs_ref.stream():
-                data = doc.to_dict()
-                if data.get("case") == case_number:
-                    matched_doc = doc
-                    break
+            matched_doc = await get_case(guild_id, case_number)
 
             if not matched_doc:
                 embed = discord.Embed(
@@ -67,7 +57,11 @@ class Duration(commands.Cog):
 
             old_duration = data.get("duration", "Unknown")
             data["duration"] = new_duration
-            matched_doc.reference.set(data)
+            await async_db.update(matched_doc.reference, {"duration": new_duration})
+            try:
+                await mod_mirror.update_log(guild_id, case_number, duration=new_duration)
+            except Exception as e:
+                print(f"[ModMirror] Failed to mirror case #{case_number} → {e}")
 
             try:
                 unit = new_duration[-1].lower()
@@ -75,31 +69,20 @@ class Duration(commands.Cog):
                 seconds = {"s": value, "m": value * 60, "h": value * 3600, "d": value * 86400}.get(unit)
 
                 if seconds:
-                    timestamp = data.get("timestamp")
-                    elapsed = int(utcnow().timestamp()) - int(timestamp)
-                    remaining = seconds - elapsed
-
-                    if remaining > 0:
-                        async def delayed_unpunish():
-                            await asyncio.sleep(remaining)
-                            guild = ctx.guild
-                            if action == "ban":
-                                try:
-                                    user = await self.bot.fetch_user(data["user_id"])
-                                    await guild.unban(user, reason="Auto-unban (duration updated)")
-                                except Exception as e:
-                                    print(f"[AutoUnban Fail] Case #{case_number} → {e}")
-                            elif action == "mute":
-                                member = guild.get_member(data["user_id"])
-                                if member:
-                                    muted_role = discord.utils.get(guild.roles, name="Muted")
-                                    if muted_role and muted_role in member.roles:
-                                        try:
-                                            await member.remove_roles(muted_role, reason="Auto-unmute (duration updated)")
-                                        except Exception as e:
-                                            print(f"[AutoUnmute Fail] Case #{case_number} → {e}")
-
-                        task_manager.schedule(case_number, delayed_unpunish())
+                    # ✅ Same key as the original mute/ban timer, so this replaces it
+                    due_at = int(data.get("timestamp")) + seconds
+                    if action == "ban":
+                        await task_manager.schedule(
+                            ctx.guild.id, case_number, "unban", due_at=due_at,
+                            payload={"case": case_number, "user_id": data["user_id"]}
+                        )
+                    elif action == "mute":
+                        muted_role = discord.utils.get(ctx.guild.roles, name="Muted")
+                        if muted_role:
+                            await task_manager.schedule(
+                                ctx.guild.id, case_number, "unmute", due_at=due_at,
+                                payload={"case": case_number, "user_id": data["user_id"], "role_id": muted_role.id}
+                            )
 
             except Exception as e:
                 print(f"[Duration Update Error] Case #{case_number}: {e}")
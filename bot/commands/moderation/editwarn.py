@@ -1,6 +1,8 @@
 import discord
 from discord.ext import commands
 from firebase_admin import firestore
+from bot.utils.asyncfirestore import async_db
+from bot.database.modmirror import mod_mirror
 from datetime import datetime
 
 db = firestore.client()
@@ -34,7 +36,7 @@ class EditWarn(commands.Cog):
         warnings_ref = db.collection("infractions").document(guild_id).collection("users").document(user_id)
 
         try:
-            doc = warnings_ref.get()
+            doc = await async_db.get(warnings_ref)
             if not doc.exists or "warnings" not in doc.to_dict():
                 return await ctx.send(embed=discord.Embed(
                     description=f":GhostError: No warnings found for {member.mention}.",
@@ -54,7 +56,11 @@ class EditWarn(commands.Cog):
             warnings[index]["reason"] = new_reason
             warnings[index]["edited_at"] = datetime.utcnow().isoformat()
 
-            warnings_ref.set({"warnings": warnings}, merge=True)
+            await async_db.set(warnings_ref, {"warnings": warnings}, merge=True)
+            try:
+                await mod_mirror.replace_warnings(guild_id, user_id, warnings)
+            except Exception as e:
+                print(f"[ModMirror] Failed to mirror warnings for {user_id} → {e}")
 
             embed = discord.Embed(
                 title="⚠️ Warning Edited",
@@ -1,10 +1,6 @@
 import discord
 from discord.ext import commands
-from firebase_admin import firestore
-from discord.utils import utcnow
-from bot.utils.casecounter import get_next_case_number  # ✅ Added import
-
-db = firestore.client()
+from bot.utils.firestore_utils import log_moderation_action
 
 class Kickuser(commands.Cog):
     def __init__(self, bot):
@@ -88,24 +84,7 @@ class Kickuser(commands.Cog):
 
         # 📝 Log to Firestore
         try:
-            logs_ref = db.collection("moderation") \
-                         .document(str(ctx.guild.id)) \
-                         .collection("logs") \
-                         .document()
-            
-            case_number = await get_next_case_number(ctx.guild.id)
-
-            logs_ref.set({
-                "case": case_number,
-                "user_id": member.id,
-                "user_tag": str(member),
-                "moderator_id": ctx.author.id,
-                "moderator_tag": str(ctx.author),
-                "reason": reason,
-                "action": "kick",
-                "duration": "N/A",
-                "timestamp": int(utcnow().timestamp())
-            })
+            await log_moderation_action(ctx.guild.id, member, ctx.author, reason, "kick", duration="N/A")
 
         except Exception as e:
             await ctx.send(f":GhostError: Firestore error: {e}")
@@ -1,11 +1,29 @@
 import discord
 from discord.ext import commands
-import asyncio
 import re
+from bot.utils.taskmanager import task_manager
 
 class ChannelModeration(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        task_manager.register("unlock", self.expire_lock)
+
+    async def expire_lock(self, guild, payload):
+        # ✅ Fired by the persistent scheduler when a timed lock runs out
+        channel = guild.get_channel(payload["channel_id"])
+        if not channel:
+            return
+        overwrite = channel.overwrites_for(guild.default_role)
+        overwrite.send_messages = None  # Reset permission
+        await channel.set_permissions(guild.default_role, overwrite=overwrite, reason="Auto-unlock")
+
+        unlock_embed = discord.Embed(
+            title="🔓 Channel Unlocked",
+            description=f"{channel.mention} has been auto-unlocked after `{payload['time']}`.",
+            color=discord.Color.green()
+        )
+        notify = guild.get_channel(payload["notify_channel_id"]) or channel
+        await notify.send(embed=unlock_embed)
 
     def parse_time(self, text):
         match = re.fullmatch(r"(\d+)([smh])", text.lower())
@@ -74,18 +92,12 @@ class ChannelModeration(commands.Cog):
             embed.set_footer(text=f"Locked by {ctx.author}", icon_url=ctx.author.display_avatar.url)
             await ctx.send(embed=embed)
 
-            # 🕒 Schedule unlock
+            # 🕒 Schedule unlock (persisted, survives restarts)
             if duration_seconds:
-                await asyncio.sleep(duration_seconds)
-                overwrite.send_messages = None  # Reset permission
-                await channel.set_permissions(ctx.guild.default_role, overwrite=overwrite, reason="Auto-unlock")
-
-                unlock_embed = discord.Embed(
-                    title="🔓 Channel Unlocked",
-                    description=f"{channel.mention} has been auto-unlocked after `{time}`.",
-                    color=discord.Color.green()
+                await task_manager.schedule(
+                    ctx.guild.id, f"lock:{channel.id}", "unlock", delay=duration_seconds,
+                    payload={"channel_id": channel.id, "notify_channel_id": ctx.channel.id, "time": time}
                 )
-                await ctx.send(embed=unlock_embed)
 
         except discord.Forbidden:
             await ctx.send(embed=discord.Embed(
@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 from firebase_admin import firestore
+from bot.utils.asyncfirestore import async_db
 from datetime import datetime, timedelta, timezone
 
 db = firestore.client()
@@ -25,7 +26,7 @@ class Moderations(commands.Cog):
         guild_id = str(ctx.guild.id)
         logs_ref = db.collection("moderation").document(guild_id).collection("logs")
 
-        docs = logs_ref.stream()
+        docs = await async_db.stream(logs_ref)
         now = datetime.now(timezone.utc)
         active_moderations = []
 
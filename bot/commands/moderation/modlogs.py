@@ -1,14 +1,70 @@
 import discord
 from discord.ext import commands
 from firebase_admin import firestore
+from bot.utils.asyncfirestore import async_db
+from bot.database.database import database
+from bot.database.modmirror import mod_mirror
 from datetime import datetime
 
 db = firestore.client()
+LOGS_PER_PAGE = 10
 
 class ModLogs(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def fetch_page(self, logs_ref, user_logs, guild_id, user_id, page, total):
+        """
+        Read one page via `start_after` the previous page's last doc.
+
+        Page -> last-doc-ID cursors are persisted in SQLite, keyed on the
+        user's log count plus their newest log's ID (so a delete followed by
+        a new case still resets them). Page N is then one snapshot read plus
+        one 10-doc query. Unknown cursors are filled in with a single id-only
+        scan from the nearest known page.
+        """
+        newest = await async_db.stream(user_logs.select(["timestamp"]).limit(1))
+        head = newest[0].id if newest else ""
+        cursors = await database.get_modlog_cursors(guild_id, user_id, total, head)
+        new_cursors = {}
+
+        start_doc = None
+        if page > 1:
+            for _ in range(2):
+                known = max((p for p in cursors if p < page), default=0)
+                start_doc = None
+                if known:
+                    start_doc = await async_db.get(logs_ref.document(cursors[known]))
+                    if not start_doc.exists:
+                        await database.clear_modlog_cursors(guild_id, user_id)
+                        cursors, start_doc, known = {}, None, 0
+
+                gap = page - 1 - known
+                if not gap:
+                    break
+                walk = user_logs.select(["timestamp"])
+                if start_doc:
+                    walk = walk.start_after(start_doc)
+                skipped = await async_db.stream(walk.limit(gap * LOGS_PER_PAGE))
+                if len(skipped) == gap * LOGS_PER_PAGE:
+                    for n in range(1, gap + 1):
+                        new_cursors[known + n] = skipped[n * LOGS_PER_PAGE - 1].id
+                    start_doc = skipped[-1]
+                    break
+
+                # Fewer logs than COUNT reported (deleted meanwhile): rebuild from the top
+                await database.clear_modlog_cursors(guild_id, user_id)
+                cursors, new_cursors = {}, {}
+            else:
+                return []
+
+        query = user_logs.start_after(start_doc) if start_doc else user_logs
+        docs = await async_db.stream(query.limit(LOGS_PER_PAGE))
+        if docs:
+            new_cursors[page] = docs[-1].id
+        await database.save_modlog_cursors(guild_id, user_id, total, head, new_cursors)
+        return [doc.to_dict() for doc in docs]
+
     @commands.command(
         name="modlogs",
         help="View moderation logs for a user by mention, username, or ID.\n\n"
@@ -60,19 +116,9 @@ class ModLogs(commands.Cog):
         user_id = str(member.id)
 
         logs_ref = db.collection("moderation").document(guild_id).collection("logs")
-
-        try:
-            docs = logs_ref.stream()
-            logs = [doc.to_dict() for doc in docs if str(doc.to_dict().get("user_id")) == user_id]
-            logs.sort(key=lambda x: x.get("timestamp", 0), reverse=True)
-        except Exception as e:
-            return await ctx.send(f":GhostError: Failed to fetch logs: `{e}`")
-
-        if not logs:
-            return await ctx.send(f":GhostSuccess: No moderation logs found for {member.mention}.")
-
-        logs_per_page = 10
-        total_pages = (len(logs) + logs_per_page - 1) // logs_per_page
+        # ✅ Indexed query (user_id, timestamp desc); `in` also matches legacy string IDs
+        user_logs = logs_ref.where("user_id", "in", [member.id, user_id]) \
+                            .order_by("timestamp", direction=firestore.Query.DESCENDING)
 
         page = 1
         if len(ctx.message.content.split()) > 2:
@@ -80,14 +126,27 @@ class ModLogs(commands.Cog):
                 page = int(ctx.message.content.split()[2])
             except ValueError:
                 page = 1
-
-        if page > total_pages:
-            return await ctx.send(f":GhostError: Page {page} doesn't exist. {member.mention} has only {total_pages} page(s).")
-
         page = max(1, page)
-        start = (page - 1) * logs_per_page
-        end = start + logs_per_page
-        paginated_logs = logs[start:end]
+
+        try:
+            if mod_mirror.is_ready(guild_id):
+                # ✅ Served from the local mirror once this guild is backfilled
+                paginated_logs, total = await mod_mirror.user_logs(guild_id, user_id, page, LOGS_PER_PAGE)
+            else:
+                total = await async_db.count(user_logs)
+            if not total:
+                return await ctx.send(f":GhostSuccess: No moderation logs found for {member.mention}.")
+
+            total_pages = (total + LOGS_PER_PAGE - 1) // LOGS_PER_PAGE
+            if page > total_pages:
+                return await ctx.send(f":GhostError: Page {page} doesn't exist. {member.mention} has only {total_pages} page(s).")
+
+            if not mod_mirror.is_ready(guild_id):
+                paginated_logs = await self.fetch_page(logs_ref, user_logs, guild_id, user_id, page, total)
+                if not paginated_logs:
+                    return await ctx.send(f":GhostError: Page {page} doesn't exist. {member.mention}'s logs changed while loading; try again.")
+        except Exception as e:
+            return await ctx.send(f":GhostError: Failed to fetch logs: `{e}`")
 
         log_text = ""
         for entry in paginated_logs:
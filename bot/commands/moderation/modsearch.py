@@ -0,0 +1,66 @@
+import discord
+from discord.ext import commands
+from datetime import datetime
+from bot.database.modmirror import mod_mirror
+
+KIND_LABELS = {"log": "Case", "warning": "Warning", "note": "Note"}
+
+class ModSearch(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.command(
+        name="modsearch",
+        help="🔎 Search case reasons, warnings and notes.\n\n**Usage:** `?modsearch <text>`"
+    )
+    async def modsearch(self, ctx, *, text: str = None):
+        # ❌ Skip if command is disabled
+        if ctx.command.name.lower() in self.bot.disabled_commands.get(str(ctx.guild.id), []):
+            return
+
+        # ✅ Mods / admins / owner only
+        is_mod = ctx.author.guild_permissions.manage_messages
+        is_admin = ctx.author.guild_permissions.administrator
+        is_owner = await self.bot.is_owner(ctx.author)
+        if not (is_mod or is_admin or is_owner):
+            return await ctx.message.add_reaction("⛔")
+
+        if not text:
+            return await ctx.send(embed=discord.Embed(
+                title="Command: ?modsearch",
+                description=(
+                    "**Full-text search over moderation history.**\n\n"
+                    "**Usage:** `?modsearch <text>`\n"
+                    "**Example:** `?modsearch spam links`"
+                ),
+                color=discord.Color.orange()
+            ))
+
+        try:
+            results = await mod_mirror.search(ctx.guild.id, text, limit=10)
+        except Exception as e:
+            return await ctx.send(f":GhostError: Search failed: `{e}`")
+
+        if not results:
+            return await ctx.send(embed=discord.Embed(
+                description=f"No moderation records match `{text}`.",
+                color=discord.Color.gold()
+            ))
+
+        embed = discord.Embed(title=f"🔎 Results for \"{text}\"", color=discord.Color.blurple())
+        for hit in results:
+            label = KIND_LABELS.get(hit["kind"], hit["kind"])
+            ref = f" #{hit['ref']}" if hit["kind"] != "note" else ""
+            when = datetime.utcfromtimestamp(hit["timestamp"]).strftime("%b %d %Y") if hit["timestamp"] else "Unknown"
+            embed.add_field(
+                name=f"{label}{ref} • {(hit['action'] or 'unknown').capitalize()} • User {hit['user_id']}",
+                value=f"{(hit['text'] or 'No reason provided')[:200]}\n*{when}*",
+                inline=False
+            )
+
+        if not mod_mirror.is_ready(ctx.guild.id):
+            embed.set_footer(text="History is still being synced; older records may be missing.")
+        await ctx.send(embed=embed)
+
+async def setup(bot):
+    await bot.add_cog(ModSearch(bot))
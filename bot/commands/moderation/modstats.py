@@ -1,9 +1,9 @@
 import discord
 from discord.ext import commands
-from firebase_admin import firestore
-from datetime import datetime, timedelta
-
-db = firestore.client()
+from bot.utils.firestore_utils import get_mod_stats
+from bot.database.modmirror import mod_mirror
+from datetime import timedelta
+from discord.utils import utcnow
 
 class ModStats(commands.Cog):
     def __init__(self, bot):
@@ -29,48 +29,31 @@ class ModStats(commands.Cog):
 
         target = member or ctx.author
         guild_id = str(ctx.guild.id)
-        logs_ref = db.collection("moderation").document(guild_id).collection("logs")
-
-        try:
-            docs = logs_ref.stream()
-        except Exception as e:
-            return await ctx.send(f":GhostError: Firestore error: {e}")
-
-        now = datetime.utcnow()
-        last_7_days = now - timedelta(days=7)
-        last_30_days = now - timedelta(days=30)
-
-        # Action counters
-        counts = {
-            "warn": {"7d": 0, "30d": 0, "all": 0},
-            "mute": {"7d": 0, "30d": 0, "all": 0},
-            "ban": {"7d": 0, "30d": 0, "all": 0},
-            "kick": {"7d": 0, "30d": 0, "all": 0}
-        }
-
-        mod_id = str(target.id)
-
-        for doc in docs:
-            data = doc.to_dict()
-            action = data.get("action")
-            timestamp = data.get("timestamp")
-            moderator_id = str(data.get("moderator_id"))
-
-            if action not in counts or not timestamp:
-                continue
-            if moderator_id != mod_id:
-                continue
-
+        now = utcnow()
+        actions = ("warn", "mute", "ban", "kick")
+
+        if mod_mirror.is_ready(guild_id):
+            # ✅ One indexed GROUP BY on the local mirror (rolling 7d/30d windows)
+            epoch = int(now.timestamp())
+            mirrored = await mod_mirror.moderator_counts(guild_id, target.id, epoch - 7 * 86400, epoch - 30 * 86400)
+            counts = {action: mirrored.get(action, {"7d": 0, "30d": 0, "all": 0}) for action in actions}
+        else:
             try:
-                timestamp_dt = datetime.utcfromtimestamp(timestamp)
-            except Exception:
-                continue
-
-            counts[action]["all"] += 1
-            if timestamp_dt >= last_30_days:
-                counts[action]["30d"] += 1
-            if timestamp_dt >= last_7_days:
-                counts[action]["7d"] += 1
+                all_time, daily = await get_mod_stats(guild_id, target.id, days=30)
+            except Exception as e:
+                return await ctx.send(f":GhostError: Firestore error: {e}")
+
+            last_7_days = (now - timedelta(days=6)).strftime("%Y-%m-%d")
+
+            # Action counters, summed from at most 30 daily rollup buckets
+            counts = {action: {"7d": 0, "30d": 0, "all": all_time.get(action, 0)} for action in actions}
+
+            for day, bucket in daily.items():
+                for action in counts:
+                    n = bucket.get(action, 0)
+                    counts[action]["30d"] += n
+                    if day >= last_7_days:
+                        counts[action]["7d"] += n
 
         total_7d = sum(counts[a]["7d"] for a in counts)
         total_30d = sum(counts[a]["30d"] for a in counts)
@@ -1,18 +1,31 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from firebase_admin import firestore
-from discord.utils import utcnow
 from bot.utils.taskmanager import task_manager
-from bot.utils.casecounter import get_next_case_number
-import asyncio
+from bot.utils.firestore_utils import log_moderation_action
+from bot.utils.guildsettings import settings_cache
 import traceback
 
-db = firestore.client()
-
 class Mute(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        task_manager.register("unmute", self.expire_mute)
+
+    async def expire_mute(self, guild, payload):
+        # ✅ Fired by the persistent scheduler when a temp-mute runs out
+        member = guild.get_member(payload["user_id"])
+        muted_role = guild.get_role(payload["role_id"])
+        if not member or not muted_role or muted_role not in member.roles:
+            return
+        try:
+            await member.remove_roles(muted_role, reason="Temporary mute expired.")
+            try:
+                await member.send(f"🔊 You have been unmuted in **{guild.name}**.")
+            except:
+                pass
+        except Exception as e:
+            print(f"[AutoUnmute Fail] Case #{payload.get('case')} → {e}")
+            raise  # ✅ Let the scheduler retry or drop the job
 
     def parse_duration(self, s):
         try:
@@ -51,9 +64,7 @@ class Mute(commands.Cog):
         if ctx.command.name.lower() in self.bot.disabled_commands.get(guild_id, []):
             return
 
-        config_ref = db.collection("server_config").document(guild_id)
-        config_data = config_ref.get().to_dict() or {}
-        allowed_roles = [r.lower() for r in config_data.get("mute_roles", ["admin", "moderator", "senior mod"])]
+        allowed_roles = settings_cache.get(guild_id).mute_roles
         has_allowed_role = any(role.name.lower() in allowed_roles for role in ctx.author.roles)
         perms = ctx.author.guild_permissions
         has_permission = perms.manage_messages or perms.administrator
@@ -124,38 +135,16 @@ class Mute(commands.Cog):
         ))
 
         try:
-            logs_ref = db.collection("moderation") \
-                         .document(guild_id) \
-                         .collection("logs") \
-                         .document()
-
-            case_number = await get_next_case_number(ctx.guild.id)
-
-            logs_ref.set({
-                "case": case_number,
-                "user_id": member.id,
-                "user_tag": str(member),
-                "moderator_id": ctx.author.id,
-                "moderator_tag": str(ctx.author),
-                "reason": final_reason,
-                "action": "mute",
-                "duration": duration_label,
-                "timestamp": int(utcnow().timestamp())
-            })
+            case_number = await log_moderation_action(
+                guild_id, member, ctx.author, final_reason, "mute", duration=duration_label
+            )
+            await task_manager.cancel_user(ctx.guild.id, "unmute", member.id)  # ✅ A new mute supersedes an older timer
 
             if duration_seconds:
-                async def unmute_later():
-                    await asyncio.sleep(duration_seconds)
-                    try:
-                        await member.remove_roles(muted_role, reason="Temporary mute expired.")
-                        try:
-                            await member.send(f"🔊 You have been unmuted in **{ctx.guild.name}**.")
-                        except:
-                            pass
-                    except Exception as e:
-                        print(f"[AutoUnmute Fail] Case #{case_number} → {e}")
-
-                task_manager.schedule(case_number, unmute_later())
+                await task_manager.schedule(
+                    ctx.guild.id, case_number, "unmute", delay=duration_seconds,
+                    payload={"case": case_number, "user_id": member.id, "role_id": muted_role.id}
+                )
 
         except Exception as e:
             embed = discord.Embed(description=f":GhostError: Firestore error: `{e}`", color=discord.Color.red())
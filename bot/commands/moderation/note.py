@@ -3,6 +3,8 @@ from discord.ext import commands
 from datetime import datetime, timezone
 import uuid
 from firebase_admin import firestore
+from bot.utils.asyncfirestore import async_db
+from bot.database.modmirror import mod_mirror
 from discord.ui import View, Select, Modal, TextInput
 
 db = firestore.client()
@@ -36,7 +38,11 @@ class Notes(commands.Cog):
             "timestamp": datetime.utcnow().isoformat()
         }
 
-        db.collection("notes").document(note_id).set(note_data)
+        await async_db.set(db.collection("notes").document(note_id), note_data)
+        try:
+            await mod_mirror.upsert_note(note_data)
+        except Exception as e:
+            print(f"[ModMirror] Failed to mirror note {note_id} → {e}")
 
         embed = discord.Embed(
             title=":GhostSuccess: Note Added",
@@ -57,7 +63,7 @@ class Notes(commands.Cog):
             .where("guild_id", "==", str(ctx.guild.id)) \
             .where("user_id", "==", str(member.id))
 
-        docs = list(query.stream())
+        docs = await async_db.stream(query)
         if not docs:
             embed = discord.Embed(
                 title="📬 No Notes Found",
@@ -118,7 +124,7 @@ class Notes(commands.Cog):
         query = db.collection("notes") \
             .where("guild_id", "==", str(ctx.guild.id)) \
             .where("user_id", "==", str(member.id))
-        docs = list(query.stream())
+        docs = await async_db.stream(query)
 
         if not docs:
             return await ctx.send(embed=discord.Embed(
@@ -149,12 +155,17 @@ class EditNoteModal(discord.ui.Modal, title="Edit Note"):
         self.add_item(self.note_input)
 
     async def on_submit(self, interaction: discord.Interaction):
-        db.collection("notes").document(self.note_id).update({
+        changes = {
             "note": self.note_input.value,
             "mod_id": str(interaction.user.id),
             "mod_tag": str(interaction.user),
             "timestamp": datetime.utcnow().isoformat()
-        })
+        }
+        await async_db.update(db.collection("notes").document(self.note_id), changes)
+        try:
+            await mod_mirror.update_note(self.note_id, **changes)
+        except Exception as e:
+            print(f"[ModMirror] Failed to mirror note {self.note_id} → {e}")
 
         embed = discord.Embed(
             title=":GhostSuccess: Note Updated",
@@ -245,7 +256,11 @@ class NoteDropdownDelete(discord.ui.Select):
 
     async def callback(self, interaction: discord.Interaction):
         note_id = self.values[0]
-        db.collection("notes").document(note_id).delete()
+        await async_db.delete(db.collection("notes").document(note_id))
+        try:
+            await mod_mirror.delete_notes([note_id])
+        except Exception as e:
+            print(f"[ModMirror] Failed to mirror note {note_id} → {e}")
         embed = discord.Embed(
             title=":GhostSuccess: Note Deleted",
             description="The selected note has been removed successfully.",
@@ -1,8 +1,8 @@
 import discord
 from discord.ext import commands
-from firebase_admin import firestore
-
-db = firestore.client()
+from bot.utils.asyncfirestore import async_db
+from bot.utils.firestore_utils import get_case
+from bot.database.modmirror import mod_mirror
 
 class Reason(commands.Cog):
     def __init__(self, bot):
@@ -35,14 +35,7 @@ class Reason(commands.Cog):
 
         try:
             guild_id = str(ctx.guild.id)
-            logs_ref = db.collection("moderation").document(guild_id).collection("logs")
-            matched_doc = None
-
-            for doc in logs_ref.stream():
-                data = doc.to_dict()
-                if data.get("case") == case_number:
-                    matched_doc = doc
-                    break
+            matched_doc = await get_case(guild_id, case_number)
 
             if not matched_doc:
                 return await ctx.send(f":GhostError: Case #{case_number} not found.")
@@ -50,8 +43,11 @@ class Reason(commands.Cog):
             data = matched_doc.to_dict()
             old_reason = data.get("reason", "No previous reason")
 
-            data["reason"] = new_reason
-            matched_doc.reference.set(data)
+            await async_db.update(matched_doc.reference, {"reason": new_reason})
+            try:
+                await mod_mirror.update_log(guild_id, case_number, reason=new_reason)
+            except Exception as e:
+                print(f"[ModMirror] Failed to mirror case #{case_number} → {e}")
 
             embed = discord.Embed(
                 title=f":GhostSuccess: Reason Updated for Case #{case_number}",
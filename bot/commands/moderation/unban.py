@@ -1,10 +1,7 @@
 import discord 
 from discord.ext import commands
-from firebase_admin import firestore
-from discord.utils import utcnow
-from bot.utils.casecounter import get_next_case_number  # :GhostSuccess: Added import
-
-db = firestore.client()
+from bot.utils.firestore_utils import log_moderation_action
+from bot.utils.taskmanager import task_manager
 
 class Unban(commands.Cog):
     def __init__(self, bot):
@@ -42,6 +39,7 @@ class Unban(commands.Cog):
                 return await ctx.send(":GhostError: That user is not banned.")
 
             await ctx.guild.unban(user, reason=reason)
+            await task_manager.cancel_user(ctx.guild.id, "unban", user.id)  # ✅ Drop any pending auto-unban
 
             # 📩 Try to DM the user
             try:
@@ -59,23 +57,7 @@ class Unban(commands.Cog):
 
             # 🗃️ Firestore Logging (modlogs)
             guild_id = str(ctx.guild.id)
-            case_number = await get_next_case_number(guild_id)
-
-            db.collection("moderation") \
-              .document(guild_id) \
-              .collection("logs") \
-              .document(str(case_number)) \
-              .set({
-                  "case": case_number,  # :GhostSuccess: Changed from case_number to case for consistency
-                  "user_id": user.id,
-                  "user_tag": str(user),
-                  "moderator_id": ctx.author.id,
-                  "moderator_tag": str(ctx.author),
-                  "reason": reason,
-                  "action": "unban",
-                  "duration": "n/a",
-                  "timestamp": int(utcnow().timestamp())
-              })
+            await log_moderation_action(guild_id, user, ctx.author, reason, "unban", duration="n/a")
 
         except discord.NotFound:
             await ctx.send(":GhostError: User not found.")
@@ -1,5 +1,6 @@
 import discord
 from discord.ext import commands
+from bot.utils.taskmanager import task_manager
 
 class UnlockChannel(commands.Cog):
     def __init__(self, bot):
@@ -48,6 +49,7 @@ class UnlockChannel(commands.Cog):
             overwrite = channel.overwrites_for(ctx.guild.default_role)
             overwrite.send_messages = None  # Reset to default
             await channel.set_permissions(ctx.guild.default_role, overwrite=overwrite, reason=reason)
+            await task_manager.cancel(ctx.guild.id, f"lock:{channel.id}")  # ✅ Drop any pending auto-unlock
 
             embed = discord.Embed(
                 title=":GhostSuccess: Channel Unlocked",
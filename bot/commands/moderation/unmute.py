@@ -1,10 +1,8 @@
 import discord
 from discord.ext import commands
-from firebase_admin import firestore
-from discord.utils import utcnow
-from bot.utils.casecounter import get_next_case_number
-
-db = firestore.client()
+from bot.utils.firestore_utils import log_moderation_action
+from bot.utils.taskmanager import task_manager
+from bot.utils.guildsettings import settings_cache
 
 class Unmute(commands.Cog):
     def __init__(self, bot):
@@ -36,10 +34,8 @@ class Unmute(commands.Cog):
         guild_id = str(ctx.guild.id)
         reason = reason or "No reason provided"
 
-        # 🔧 Get mute role from Firestore
-        guild_doc = db.collection("settings").document(guild_id)
-        guild_data = guild_doc.get().to_dict() if guild_doc.get().exists else {}
-        mute_role_id = guild_data.get("mute_role_id")
+        # 🔧 Get mute role from the cached guild settings
+        mute_role_id = settings_cache.get(guild_id).mute_role_id
         mute_role = ctx.guild.get_role(int(mute_role_id)) if mute_role_id else None
 
         try:
@@ -57,6 +53,8 @@ class Unmute(commands.Cog):
                 except discord.Forbidden:
                     await ctx.send("⚠️ Could not remove mute role (missing permissions).")
 
+            await task_manager.cancel_user(ctx.guild.id, "unmute", member.id)  # ✅ Drop any pending auto-unmute
+
             # Step 3: DM user
             try:
                 dm_embed = discord.Embed(
@@ -77,18 +75,7 @@ class Unmute(commands.Cog):
             await ctx.send(embed=response_embed)
 
             # :GhostSuccess: Step 5: Log to Firestore with correct case field
-            case_number = await get_next_case_number(guild_id)
-            db.collection("moderation").document(guild_id).collection("logs").document().set({
-                "case": case_number,
-                "user_id": member.id,
-                "user_tag": str(member),
-                "moderator_id": ctx.author.id,
-                "moderator_tag": str(ctx.author),
-                "reason": reason,
-                "action": "unmute",
-                "duration": "n/a",
-                "timestamp": int(utcnow().timestamp())
-            })
+            await log_moderation_action(guild_id, member, ctx.author, reason, "unmute", duration="n/a")
 
         except Exception as e:
             await ctx.send(f":GhostError: Unmute failed: {e}")
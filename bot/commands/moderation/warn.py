@@ -1,8 +1,10 @@
 import discord
 from discord.ext import commands
 from firebase_admin import firestore
+from bot.utils.asyncfirestore import async_db
+from bot.database.modmirror import mod_mirror
 from datetime import datetime
-from bot.utils.casecounter import get_next_case_number
+from bot.utils.firestore_utils import log_moderation_action
 
 db = firestore.client()
 
@@ -59,7 +61,7 @@ class Warn(commands.Cog):
         warnings_ref = db.collection("infractions").document(guild_id).collection("users").document(user_id)
 
         try:
-            doc = warnings_ref.get()
+            doc = await async_db.get(warnings_ref)
             warnings = doc.to_dict().get("warnings", []) if doc.exists else []
 
             warning_data = {
@@ -69,7 +71,11 @@ class Warn(commands.Cog):
                 "timestamp": datetime.utcnow().isoformat()
             }
             warnings.append(warning_data)
-            warnings_ref.set({"warnings": warnings}, merge=True)
+            await async_db.set(warnings_ref, {"warnings": warnings}, merge=True)
+            try:
+                await mod_mirror.replace_warnings(guild_id, user_id, warnings)
+            except Exception as e:
+                print(f"[ModMirror] Failed to mirror warnings for {user_id} → {e}")
 
             try:
                 await member.send(
@@ -86,23 +92,7 @@ class Warn(commands.Cog):
             await ctx.send(embed=embed)
 
             # ✅ Log in mod logs
-            logs_ref = (
-                db.collection("moderation")
-                .document(guild_id)
-                .collection("logs")
-                .document()
-            )
-            case_number = await get_next_case_number(guild_id)
-            logs_ref.set({
-                "case": case_number,
-                "user_id": member.id,
-                "user_tag": str(member),
-                "moderator_id": ctx.author.id,
-                "moderator_tag": str(ctx.author),
-                "reason": reason,
-                "action": "warn",
-                "timestamp": int(datetime.utcnow().timestamp())
-            })
+            await log_moderation_action(guild_id, member, ctx.author, reason, "warn")
 
         except Exception as e:
             await ctx.send(embed=discord.Embed(
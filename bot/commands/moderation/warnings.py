@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 from firebase_admin import firestore
+from bot.utils.asyncfirestore import async_db
 from datetime import datetime
 import humanize
 
@@ -29,7 +30,7 @@ class Warnings(commands.Cog):
             guild_id = str(ctx.guild.id)
             user_id = str(member.id)
             warnings_ref = db.collection("infractions").document(guild_id).collection("users").document(user_id)
-            doc = warnings_ref.get()
+            doc = await async_db.get(warnings_ref)
 
             if not doc.exists or "warnings" not in doc.to_dict() or len(doc.to_dict()["warnings"]) == 0:
                 embed = discord.Embed(
@@ -3,6 +3,7 @@ from discord.ext import commands
 from discord import app_commands
 import os
 import sys
+from bot.utils.asyncfirestore import async_db
 
 # List of allowed user IDs (besides the guild owner)
 ALLOWED_USER_IDS = [1117037767831072891, 1130498969844334774]  # Replace with actual IDs
@@ -93,5 +94,36 @@ class CogManager(commands.Cog):
         await self.bot.close()
         os.execv(sys.executable, [sys.executable] + sys.argv)
 
+    @commands.hybrid_command(name="fsstats", description="Show Firestore call latency stats.")
+    @is_guild_owner_or_allowed()
+    async def fsstats(self, ctx: commands.Context):
+        stats = async_db.stats()
+        if not stats:
+            return await ctx.reply("ℹ️ No Firestore calls recorded yet.", ephemeral=False)
+
+        lines = [
+            f"`{op:<7}` calls **{m['calls']}** • avg **{m['avg_ms']}ms** • max **{m['max_ms']}ms**"
+            f" • errors {m['errors']} • timeouts {m['timeouts']}"
+            for op, m in sorted(stats.items())
+        ]
+        embed = discord.Embed(title="📊 Firestore Stats", description="\n".join(lines), color=discord.Color.blurple())
+        await ctx.reply(embed=embed, ephemeral=False)
+
+    @commands.hybrid_command(name="gwystats", description="Show giveaway finalizer queue and latency stats.")
+    @is_guild_owner_or_allowed()
+    async def gwystats(self, ctx: commands.Context):
+        cog = self.bot.get_cog("GiveawayCog")
+        if cog is None:
+            return await ctx.reply("ℹ️ The giveaway cog isn't loaded.", ephemeral=False)
+
+        m = cog.manager.finalizer.stats()
+        lines = [
+            f"Queued **{m['queued']}** • in flight **{m['in_flight']}** • backlog peak **{m['backlog_peak']}**",
+            f"Ended **{m['ended']}** • retried {m['retried']} • failed {m['failed']}",
+            f"End latency avg **{m['avg_latency_s']}s** • max **{m['max_latency_s']}s**",
+        ]
+        embed = discord.Embed(title="🎉 Giveaway Finalizer Stats", description="\n".join(lines), color=discord.Color.blurple())
+        await ctx.reply(embed=embed, ephemeral=False)
+
 async def setup(bot):
     await bot.add_cog(CogManager(bot))
@@ -3,9 +3,10 @@ from discord.ext import commands
 from PIL import Image, ImageDraw, ImageFont
 import random
 import io
-import aiohttp
+import asyncio
 import os
 import aiosqlite
+from bot.utils.avatarcache import avatar_cache
 
 DATABASE = "media.db"
 
@@ -61,12 +62,11 @@ class ShipCommand(commands.Cog):
         else:
             message = "Soulmates confirmed. "
 
-        # Fetch avatars
-        async with aiohttp.ClientSession() as session:
-            async with session.get(user1.display_avatar.url) as r1:
-                avatar1 = Image.open(io.BytesIO(await r1.read())).convert("RGBA").resize((256, 256))
-            async with session.get(user2.display_avatar.url) as r2:
-                avatar2 = Image.open(io.BytesIO(await r2.read())).convert("RGBA").resize((256, 256))
+        # Fetch avatars (shared cache, fetched concurrently on a miss)
+        (avatar1, _), (avatar2, _) = await asyncio.gather(
+            avatar_cache.get(user1, 256),
+            avatar_cache.get(user2, 256),
+        )
 
         # Create canvas
         canvas = Image.new("RGBA", (768, 256), (0, 0, 0, 0))
@@ -1,6 +1,8 @@
 import discord
 from discord.ext import commands
 from firebase_admin import firestore
+from bot.utils.asyncfirestore import async_db
+from bot.utils.guildsettings import settings_cache
 
 db = firestore.client()
 
@@ -46,8 +48,7 @@ class CommandToggle(commands.Cog):
 
         guild_id = str(ctx.guild.id)
         settings_ref = db.collection("settings").document(guild_id)
-        doc = settings_ref.get()
-        current = doc.to_dict().get("disabled_commands", []) if doc.exists else []
+        current = list(settings_cache.get(guild_id).disabled_commands)
 
         if command_name in current:
             current.remove(command_name)
@@ -59,10 +60,10 @@ class CommandToggle(commands.Cog):
             color = discord.Color.red()
 
         # 🔄 Update Firestore
-        settings_ref.set({"disabled_commands": current}, merge=True)
+        await async_db.set(settings_ref, {"disabled_commands": current}, merge=True)
 
         # 🔄 Update memory cache (case-insensitive)
-        self.bot.disabled_commands[guild_id] = [cmd.lower() for cmd in current]
+        settings_cache.update(guild_id, disabled_commands=current)
 
         embed = discord.Embed(
             title="⚙️ Command Toggled",
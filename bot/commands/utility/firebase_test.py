@@ -2,6 +2,7 @@
 import discord
 from discord.ext import commands
 from firebase_admin import firestore
+from bot.utils.asyncfirestore import async_db
 
 class FirebaseTest(commands.Cog):
     def __init__(self, bot):
@@ -13,7 +14,7 @@ class FirebaseTest(commands.Cog):
         print("🔥 testdb command triggered")  # DEBUG: Make sure this prints in terminal
         try:
             doc_ref = self.db.collection("test").document(str(ctx.author.id))
-            doc_ref.set({"name": ctx.author.name})
+            await async_db.set(doc_ref, {"name": ctx.author.name})
             await ctx.send(f"✅ Stored your name in Firestore, {ctx.author.mention}!")
         except Exception as e:
             await ctx.send(f"❌ Firestore error: {e}")
@@ -1,6 +1,8 @@
 import discord
 from discord.ext import commands
 from firebase_admin import firestore
+from bot.utils.asyncfirestore import async_db
+from bot.utils.guildsettings import settings_cache
 
 db = firestore.client()
 
@@ -23,7 +25,8 @@ class Prefix(commands.Cog):
                 )
                 return await ctx.send(embed=embed)
 
-            prefix_ref.set({"prefix": new_prefix}, merge=True)
+            await async_db.set(prefix_ref, {"prefix": new_prefix}, merge=True)
+            settings_cache.update(guild_id, prefix=new_prefix)
             embed = discord.Embed(
                 title="<:GhostSuccess:1387033552809492682> Prefix Updated",
                 description=f"The new prefix is now set to `{new_prefix}` for this server.",
@@ -32,8 +35,7 @@ class Prefix(commands.Cog):
             return await ctx.send(embed=embed)
 
         # Show current prefix
-        doc = prefix_ref.get()
-        current = doc.to_dict().get("prefix") if doc.exists else "?"
+        current = settings_cache.get(guild_id).prefix
         embed = discord.Embed(
             title="ℹ️ Current Prefix",
             description=f"The command prefix for this server is `{current}`.\n\nTo change it:\n`?prefix <new_prefix>`",
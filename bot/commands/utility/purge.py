@@ -2,6 +2,8 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from firebase_admin import firestore
+from bot.utils.asyncfirestore import async_db
+from bot.utils.guildsettings import settings_cache
 from typing import Optional
 import io
 
@@ -18,19 +20,14 @@ class Purge(commands.Cog):
         return db.collection("settings").document(str(guild_id))
 
     async def get_purge_limit(self, guild_id: int):
-        doc = self.get_limit_ref(guild_id).get()
-        if doc.exists:
-            return doc.to_dict().get("purge_limit", 100)
-        return 100
+        return settings_cache.get(guild_id).purge_limit
 
     async def set_purge_limit(self, guild_id: int, limit: int):
-        self.get_limit_ref(guild_id).set({"purge_limit": limit}, merge=True)
+        await async_db.set(self.get_limit_ref(guild_id), {"purge_limit": limit}, merge=True)
+        settings_cache.update(guild_id, purge_limit=limit)
 
     async def get_log_channel_id(self, guild_id: int):
-        doc = self.get_limit_ref(guild_id).get()
-        if doc.exists:
-            return doc.to_dict().get("purge_log_channel")
-        return None
+        return settings_cache.get(guild_id).purge_log_channel
 
     async def log_purge(self, guild: discord.Guild, messages: list[discord.Message]):
         if not messages:
@@ -111,7 +108,8 @@ class Purge(commands.Cog):
     @app_commands.checks.has_permissions(manage_messages=True)
     async def setup_purge_channel(self, interaction: discord.Interaction, channel: discord.TextChannel):
         ref = self.get_limit_ref(interaction.guild.id)
-        ref.set({"purge_log_channel": channel.id}, merge=True)
+        await async_db.set(ref, {"purge_log_channel": channel.id}, merge=True)
+        settings_cache.update(interaction.guild.id, purge_log_channel=channel.id)
         await interaction.response.send_message(f"{GHOST_SUCCESS} Set purge log channel to {channel.mention}.", ephemeral=True)
 
     # 🔒 Handle missing permissions
@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from firebase_admin import firestore
+from bot.utils.asyncfirestore import async_db
 from discord.utils import utcnow
 
 db = firestore.client()
@@ -19,16 +20,16 @@ class RoleInfo(commands.Cog):
                     creator_id = entry.user.id
                     guild_id = str(role.guild.id)
 
-                    db.collection("roles") \
-                      .document(guild_id) \
-                      .collection("role_creators") \
-                      .document(str(role.id)) \
-                      .set({
-                          "creator_id": creator_id,
-                          "created_at": role.created_at.isoformat(),
-                          "guild_id": guild_id,
-                          "role_name": role.name
-                      })
+                    creator_ref = db.collection("roles") \
+                                    .document(guild_id) \
+                                    .collection("role_creators") \
+                                    .document(str(role.id))
+                    await async_db.set(creator_ref, {
+                        "creator_id": creator_id,
+                        "created_at": role.created_at.isoformat(),
+                        "guild_id": guild_id,
+                        "role_name": role.name
+                    })
         except Exception as e:
             # 🔥 Log silently in console, or forward to your error channel if you want
             print(f"Error saving role creator: {e}")
@@ -43,11 +44,11 @@ class RoleInfo(commands.Cog):
         creator_text = "Unknown"
 
         # Fetch Firestore creator data
-        doc = db.collection("roles") \
-                .document(guild_id) \
-                .collection("role_creators") \
-                .document(str(role.id)) \
-                .get()
+        creator_ref = db.collection("roles") \
+                        .document(guild_id) \
+                        .collection("role_creators") \
+                        .document(str(role.id))
+        doc = await async_db.get(creator_ref)
 
         if doc.exists:
             data = doc.to_dict()
@@ -67,16 +68,12 @@ class RoleInfo(commands.Cog):
                         else:
                             creator_text = f"<@{entry.user.id}> (not in server)"
                         # Save it to Firestore for next time
-                        db.collection("roles") \
-                          .document(guild_id) \
-                          .collection("role_creators") \
-                          .document(str(role.id)) \
-                          .set({
-                              "creator_id": entry.user.id,
-                              "created_at": role.created_at.isoformat(),
-                              "guild_id": guild_id,
-                              "role_name": role.name
-                          })
+                        await async_db.set(creator_ref, {
+                            "creator_id": entry.user.id,
+                            "created_at": role.created_at.isoformat(),
+                            "guild_id": guild_id,
+                            "role_name": role.name
+                        })
                         break
             except Exception as e:
                 print(f"Error fetching audit logs in roleinfo: {e}")
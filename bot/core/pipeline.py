@@ -0,0 +1,127 @@
+# bot/core/pipeline.py
+
+import time
+import traceback
+from typing import AbstractSet, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import discord
+
+from bot.database.levelpolicy import leveling_policies
+from bot.utils.guildsettings import settings_cache
+
+
+class MessageContext:
+    """
+    Everything the message stages need, resolved once per message.
+
+    `settings` and `policy` come from the in-memory caches, `role_ids` is
+    computed once, and `afk_ids` is the guild's cached set of AFK user IDs,
+    so no stage has to repeat the bot/guild checks or hit a database just to
+    find out whether it has work to do.
+    """
+
+    __slots__ = (
+        "message", "guild", "author", "guild_id", "author_id", "channel_id",
+        "settings", "policy", "afk_ids", "stopped", "_role_ids",
+    )
+
+    def __init__(self, message: discord.Message, settings, policy, afk_ids: AbstractSet[str]):
+        self.message = message
+        self.guild = message.guild
+        self.author = message.author
+        self.guild_id = str(message.guild.id)
+        self.author_id = str(message.author.id)
+        self.channel_id = str(message.channel.id)
+        self.settings = settings
+        self.policy = policy
+        self.afk_ids = afk_ids
+        self.stopped = False
+        self._role_ids = None
+
+    @property
+    def role_ids(self) -> List[str]:
+        if self._role_ids is None:
+            self._role_ids = [str(role.id) for role in getattr(self.author, "roles", ())]
+        return self._role_ids
+
+    def stop(self):
+        """Skip every remaining stage for this message."""
+        self.stopped = True
+
+
+Stage = Callable[[MessageContext], Awaitable[None]]
+
+
+class MessagePipeline:
+    """
+    The bot's single `on_message` listener.
+
+    Cogs register stages (lowest `order` runs first) instead of their own
+    listeners. Each message is filtered and turned into one MessageContext,
+    then passed through the stages in order; a stage may call `ctx.stop()`
+    to short-circuit the rest. Per-stage timings are kept for `stats()`.
+    """
+
+    def __init__(self):
+        self.stages: List[Tuple[int, str, Stage]] = []
+        self.metrics: Dict[str, Dict[str, float]] = {}
+        self.afk_provider: Optional[Callable[[str], AbstractSet[str]]] = None
+
+    def register(self, name: str, stage: Stage, order: int = 100):
+        self.unregister(name)
+        self.stages.append((order, name, stage))
+        self.stages.sort(key=lambda s: s[0])
+
+    def unregister(self, name: str):
+        self.stages = [s for s in self.stages if s[1] != name]
+
+    async def build_context(self, message: discord.Message) -> MessageContext:
+        guild_id = str(message.guild.id)
+        afk_ids = self.afk_provider(guild_id) if self.afk_provider else set()
+        return MessageContext(
+            message,
+            settings_cache.get(guild_id),
+            await leveling_policies.get(guild_id),
+            afk_ids,
+        )
+
+    async def process(self, message: discord.Message):
+        if message.author.bot or not message.guild or not self.stages:
+            return
+
+        ctx = await self.build_context(message)
+        for _, name, stage in self.stages:
+            start = time.perf_counter()
+            try:
+                await stage(ctx)
+            except Exception:
+                print(f"[Pipeline] Stage '{name}' failed:")
+                traceback.print_exc()
+                self._record(name, time.perf_counter() - start, error=True)
+            else:
+                self._record(name, time.perf_counter() - start)
+            if ctx.stopped:
+                break
+
+    def _record(self, name: str, elapsed: float, error: bool = False):
+        m = self.metrics.setdefault(name, {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+        m["calls"] += 1
+        m["total_ms"] += elapsed * 1000
+        m["max_ms"] = max(m["max_ms"], elapsed * 1000)
+        if error:
+            m["errors"] += 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {
+                "calls": m["calls"],
+                "errors": m["errors"],
+                "avg_ms": round(m["total_ms"] / m["calls"], 3) if m["calls"] else 0.0,
+                "max_ms": round(m["max_ms"], 3),
+            }
+            for name, m in self.metrics.items()
+        }
+
+
+# ✅ Singleton instance
+message_pipeline = MessagePipeline()
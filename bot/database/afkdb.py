@@ -1,42 +1,90 @@
 # bot/database/afkdb.py
 
+from typing import Dict, Iterable, Optional, Tuple
+
 import aiosqlite
 
 AFK_DB = "data/afk_data.db"
 
-async def init_afk_db():
-    async with aiosqlite.connect(AFK_DB) as db:
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS afk (
-                guild_id TEXT,
-                user_id TEXT,
-                reason TEXT,
-                original_nick TEXT,
-                PRIMARY KEY (guild_id, user_id)
-            )
-        """)
-        await db.commit()
-
-async def set_afk(guild_id, user_id, reason, original_nick):
-    async with aiosqlite.connect(AFK_DB) as db:
-        await db.execute("""
+AFKEntry = Tuple[str, Optional[str]]  # (reason, original_nick)
+
+
+class AFKRegistry:
+    """
+    Every AFK status, held in memory as {guild_id: {user_id: (reason, nick)}}.
+
+    Loaded once at startup; `set` / `remove` write through to SQLite on one
+    long-lived connection before updating memory. Reads (`get`, `ids`,
+    `lookup`) never touch the database, so the per-message AFK checks are
+    dict lookups.
+    """
+
+    def __init__(self, db_path: str = AFK_DB):
+        self.db_path = db_path
+        self.db: Optional[aiosqlite.Connection] = None
+        self._by_guild: Dict[str, Dict[str, AFKEntry]] = {}
+
+    async def load(self):
+        if self.db is None:
+            self.db = await aiosqlite.connect(self.db_path)
+            await self.db.execute("""
+                CREATE TABLE IF NOT EXISTS afk (
+                    guild_id TEXT,
+                    user_id TEXT,
+                    reason TEXT,
+                    original_nick TEXT,
+                    PRIMARY KEY (guild_id, user_id)
+                )
+            """)
+            await self.db.commit()
+
+        self._by_guild.clear()
+        async with self.db.execute("SELECT guild_id, user_id, reason, original_nick FROM afk") as cursor:
+            async for guild_id, user_id, reason, original_nick in cursor:
+                self._by_guild.setdefault(guild_id, {})[user_id] = (reason, original_nick)
+
+    async def close(self):
+        if self.db is not None:
+            await self.db.close()
+            self.db = None
+
+    # ---------------- Reads (memory only) ----------------
+    def get(self, guild_id, user_id) -> AFKEntry:
+        return self._by_guild.get(str(guild_id), {}).get(str(user_id), (None, None))
+
+    def ids(self, guild_id):
+        """Live, set-like view of the AFK user IDs in a guild."""
+        return self._by_guild.get(str(guild_id), {}).keys()
+
+    def lookup(self, guild_id, user_ids: Iterable) -> Dict[str, AFKEntry]:
+        """AFK entries for whichever of `user_ids` are AFK, in one pass."""
+        guild = self._by_guild.get(str(guild_id))
+        if not guild:
+            return {}
+        return {uid: guild[uid] for uid in map(str, user_ids) if uid in guild}
+
+    # ---------------- Writes (write-through) ----------------
+    async def set(self, guild_id, user_id, reason, original_nick):
+        guild_id, user_id = str(guild_id), str(user_id)
+        await self.db.execute("""
             INSERT OR REPLACE INTO afk (guild_id, user_id, reason, original_nick)
             VALUES (?, ?, ?, ?)
-        """, (str(guild_id), str(user_id), reason, original_nick))
-        await db.commit()
-
-async def get_afk(guild_id, user_id):
-    async with aiosqlite.connect(AFK_DB) as db:
-        async with db.execute("""
-            SELECT reason, original_nick FROM afk
-            WHERE guild_id = ? AND user_id = ?
-        """, (str(guild_id), str(user_id))) as cursor:
-            row = await cursor.fetchone()
-            return row if row else (None, None)
-
-async def remove_afk(guild_id, user_id):
-    async with aiosqlite.connect(AFK_DB) as db:
-        await db.execute("""
+        """, (guild_id, user_id, reason, original_nick))
+        await self.db.commit()
+        self._by_guild.setdefault(guild_id, {})[user_id] = (reason, original_nick)
+
+    async def remove(self, guild_id, user_id):
+        guild_id, user_id = str(guild_id), str(user_id)
+        await self.db.execute("""
             DELETE FROM afk WHERE guild_id = ? AND user_id = ?
-        """, (str(guild_id), str(user_id)))
-        await db.commit()
+        """, (guild_id, user_id))
+        await self.db.commit()
+        guild = self._by_guild.get(guild_id)
+        if guild:
+            guild.pop(user_id, None)
+            if not guild:
+                del self._by_guild[guild_id]
+
+
+# ✅ Singleton instance
+afk_registry = AFKRegistry()
@@ -75,6 +75,31 @@ class Database:
             level INTEGER NOT NULL,
             xp INTEGER NOT NULL
         );
+
+        CREATE TABLE IF NOT EXISTS scheduled_jobs (
+            guild_id TEXT NOT NULL,
+            job_key TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            due_at REAL NOT NULL,
+            payload TEXT,
+            PRIMARY KEY (guild_id, job_key)
+        );
+
+        CREATE TABLE IF NOT EXISTS modlog_cursors (
+            guild_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            page INTEGER NOT NULL,
+            doc_id TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            head TEXT,
+            PRIMARY KEY (guild_id, user_id, page)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_due
+            ON scheduled_jobs (due_at);
+
+        CREATE INDEX IF NOT EXISTS idx_user_xp_guild_xp
+            ON user_xp (guild_id, xp DESC, user_id DESC);
         """)
         await self.db.commit()
 
@@ -93,6 +118,13 @@ class Database:
             await self.db.execute("ALTER TABLE xp_settings ADD COLUMN role_mode TEXT DEFAULT 'highest'")
             await self.db.commit()
 
+        # Ensure head column exists in modlog_cursors
+        async with self.db.execute("PRAGMA table_info(modlog_cursors)") as cursor:
+            columns = [row["name"] async for row in cursor]
+        if "head" not in columns:
+            await self.db.execute("ALTER TABLE modlog_cursors ADD COLUMN head TEXT")
+            await self.db.commit()
+
     async def update_xp(self, guild_id, user_id, xp, ts):
         existing = await self.get_xp(guild_id, user_id)
         if existing:
@@ -151,6 +183,94 @@ class Database:
         """, (guild_id, limit)) as cursor:
             return await cursor.fetchall()
 
+    async def get_user_rank(self, guild_id, user_id):
+        """1-based rank by XP (ties share a rank), or None if the user has no row."""
+        row = await self.get_xp(guild_id, user_id)
+        if not row:
+            return None
+        async with self.db.execute("""
+            SELECT COUNT(*) FROM user_xp
+            WHERE guild_id = ? AND xp > ?
+        """, (guild_id, row["xp"])) as cursor:
+            (higher,) = await cursor.fetchone()
+        return higher + 1
+
+    async def count_xp_users(self, guild_id):
+        async with self.db.execute("SELECT COUNT(*) FROM user_xp WHERE guild_id = ?", (guild_id,)) as cursor:
+            (count,) = await cursor.fetchone()
+        return count
+
+    async def get_leaderboard_page(self, guild_id, after=None, before=None, limit=10):
+        """
+        One leaderboard page ordered by (xp DESC, user_id DESC), seeked by key.
+
+        `after` / `before` are the last / first (user_id, xp) rows of the
+        current page. Rows come back in leaderboard order either way, and the
+        (guild_id, xp DESC, user_id DESC) index means no OFFSET scan.
+        """
+        if after is not None:
+            query = """
+                SELECT user_id, xp FROM user_xp
+                WHERE guild_id = ? AND (xp < ? OR (xp = ? AND user_id < ?))
+                ORDER BY xp DESC, user_id DESC LIMIT ?
+            """
+            params = (guild_id, after[1], after[1], after[0], limit)
+        elif before is not None:
+            query = """
+                SELECT user_id, xp FROM user_xp
+                WHERE guild_id = ? AND (xp > ? OR (xp = ? AND user_id > ?))
+                ORDER BY xp ASC, user_id ASC LIMIT ?
+            """
+            params = (guild_id, before[1], before[1], before[0], limit)
+        else:
+            query = """
+                SELECT user_id, xp FROM user_xp
+                WHERE guild_id = ?
+                ORDER BY xp DESC, user_id DESC LIMIT ?
+            """
+            params = (guild_id, limit)
+
+        async with self.db.execute(query, params) as cursor:
+            rows = [(row[0], row[1]) for row in await cursor.fetchall()]
+        if before is not None:
+            rows.reverse()
+        return rows
+
+    async def get_leaderboard_tail(self, guild_id, limit=10):
+        """The last `limit` rows of the leaderboard, in leaderboard order."""
+        async with self.db.execute("""
+            SELECT user_id, xp FROM user_xp
+            WHERE guild_id = ?
+            ORDER BY xp ASC, user_id ASC LIMIT ?
+        """, (guild_id, limit)) as cursor:
+            rows = [(row[0], row[1]) for row in await cursor.fetchall()]
+        rows.reverse()
+        return rows
+
+    async def get_modlog_cursors(self, guild_id, user_id, total, head):
+        """{page: last doc id on that page}, dropping the map if the log count or newest log changed."""
+        async with self.db.execute("""
+            SELECT page, doc_id, total, head FROM modlog_cursors WHERE guild_id = ? AND user_id = ?
+        """, (guild_id, user_id)) as cursor:
+            rows = await cursor.fetchall()
+        if any(row["total"] != total or row["head"] != head for row in rows):
+            await self.clear_modlog_cursors(guild_id, user_id)
+            return {}
+        return {row["page"]: row["doc_id"] for row in rows}
+
+    async def save_modlog_cursors(self, guild_id, user_id, total, head, cursors):
+        await self.db.executemany("""
+            INSERT OR REPLACE INTO modlog_cursors (guild_id, user_id, page, doc_id, total, head)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(guild_id, user_id, page, doc_id, total, head) for page, doc_id in cursors.items()])
+        await self.db.commit()
+
+    async def clear_modlog_cursors(self, guild_id, user_id):
+        await self.db.execute(
+            "DELETE FROM modlog_cursors WHERE guild_id = ? AND user_id = ?", (guild_id, user_id)
+        )
+        await self.db.commit()
+
     async def reset_user(self, guild_id, user_id):
         await self.db.execute("""
             DELETE FROM user_xp WHERE guild_id = ? AND user_id = ?
@@ -1,71 +1,157 @@
 # bot/database/gwydb.py
+import asyncio
 import aiosqlite
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from bot.database.msgcounter import message_counter
+from bot.database.gwyentries import entry_buffer
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+    "PRAGMA busy_timeout = 5000",
+)
 
 
 class GwyDB:
+    """
+    Giveaway storage on one long-lived aiosqlite connection.
+
+    The connection is opened on first use (or by `connect()`) in WAL mode,
+    so readers don't block on the writer and commits skip the full fsync.
+    The connection's statement cache means hot queries are parsed once.
+    Call `close()` on shutdown.
+
+    Running giveaways are also cached in memory (`get_active_giveaway`) and
+    kept current by the write methods here, so the reaction path doesn't
+    query for them. Entry writes go through `entry_buffer`; every query
+    that reads entries flushes it first.
+    """
+
     def __init__(self, db_path: str = "giveaways.db"):
         self.db_path = db_path
+        self.db: Optional[aiosqlite.Connection] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._active: Optional[Dict[int, Dict[str, Any]]] = None  # message_id -> running giveaway row
+
+    async def connect(self) -> aiosqlite.Connection:
+        if self.db is not None:
+            return self.db
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self.db is None:
+                db = await aiosqlite.connect(self.db_path)
+                for pragma in PRAGMAS:
+                    await db.execute(pragma)
+                self.db = db
+        return self.db
+
+    async def close(self):
+        if self.db is not None:
+            await self.db.close()
+            self.db = None
+
+    async def _write(self, query: str, params=()) -> None:
+        db = await self.connect()
+        await db.execute(query, params)
+        await db.commit()
+
+    async def _fetchone(self, query: str, params=()):
+        db = await self.connect()
+        async with db.execute(query, params) as cursor:
+            return await cursor.fetchone()
+
+    async def _fetch_dicts(self, query: str, params=()) -> List[Dict[str, Any]]:
+        db = await self.connect()
+        async with db.execute(query, params) as cursor:
+            rows = await cursor.fetchall()
+            keys = [d[0] for d in cursor.description]
+        return [dict(zip(keys, row)) for row in rows]
 
     async def setup(self):
         """Create necessary tables if they don't exist."""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Giveaways
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS giveaways (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    message_id INTEGER UNIQUE NOT NULL,
-                    channel_id INTEGER NOT NULL,
-                    guild_id INTEGER NOT NULL,
-                    prize TEXT NOT NULL,
-                    winners INTEGER NOT NULL,
-                    end_time INTEGER NOT NULL,
-                    host_id INTEGER NOT NULL,
-                    status TEXT DEFAULT 'running',
-                    required_role_id INTEGER DEFAULT NULL,
-                    min_messages INTEGER DEFAULT 0,
-                    min_invites INTEGER DEFAULT 0
-                )
-            """)
-
-            # Entries
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS entries (
-                    message_id INTEGER NOT NULL,
-                    user_id INTEGER NOT NULL,
-                    PRIMARY KEY (message_id, user_id)
-                )
-            """)
-
-            # Manager role
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS giveaway_manager_role (
-                    guild_id INTEGER PRIMARY KEY,
-                    role_id INTEGER NOT NULL
-                )
-            """)
-
-            # Invite tracker (for requirement)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS invites (
-                    guild_id INTEGER,
-                    user_id INTEGER,
-                    invites INTEGER DEFAULT 0,
-                    PRIMARY KEY (guild_id, user_id)
-                )
-            """)
-
-            # Message tracker (for requirement)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS messages (
-                    guild_id INTEGER,
-                    user_id INTEGER,
-                    message_count INTEGER DEFAULT 0,
-                    PRIMARY KEY (guild_id, user_id)
-                )
-            """)
+        db = await self.connect()
 
-            await db.commit()
+        # Giveaways
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS giveaways (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                message_id INTEGER UNIQUE NOT NULL,
+                channel_id INTEGER NOT NULL,
+                guild_id INTEGER NOT NULL,
+                prize TEXT NOT NULL,
+                winners INTEGER NOT NULL,
+                end_time INTEGER NOT NULL,
+                host_id INTEGER NOT NULL,
+                status TEXT DEFAULT 'running',
+                required_role_id INTEGER DEFAULT NULL,
+                min_messages INTEGER DEFAULT 0,
+                min_invites INTEGER DEFAULT 0
+            )
+        """)
+
+        # Scheduler reads (end_time, message_id) in deadline order
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_giveaways_end_time ON giveaways (end_time, message_id)"
+        )
+
+        # Entries
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                message_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                PRIMARY KEY (message_id, user_id)
+            )
+        """)
+
+        # Winners already drawn (excluded on reroll)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS giveaway_winners (
+                message_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                PRIMARY KEY (message_id, user_id)
+            )
+        """)
+
+        # Manager role
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS giveaway_manager_role (
+                guild_id INTEGER PRIMARY KEY,
+                role_id INTEGER NOT NULL
+            )
+        """)
+
+        # Invite tracker (for requirement)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS invites (
+                guild_id INTEGER,
+                user_id INTEGER,
+                invites INTEGER DEFAULT 0,
+                PRIMARY KEY (guild_id, user_id)
+            )
+        """)
+
+        # Message tracker (for requirement)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS messages (
+                guild_id INTEGER,
+                user_id INTEGER,
+                message_count INTEGER DEFAULT 0,
+                PRIMARY KEY (guild_id, user_id)
+            )
+        """)
+
+        await self._migrate(db)
+        await db.commit()
+
+    async def _migrate(self, db: aiosqlite.Connection):
+        async with db.execute("PRAGMA table_info(giveaways)") as cursor:
+            columns = {row[1] for row in await cursor.fetchall()}
+        if "weight_by_messages" not in columns:
+            await db.execute("ALTER TABLE giveaways ADD COLUMN weight_by_messages INTEGER DEFAULT 0")
 
     # ---------------- Giveaways ----------------
     async def add_giveaway(
@@ -75,128 +161,292 @@ class GwyDB:
         min_messages: int = 0,
         min_invites: int = 0
     ) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT INTO giveaways 
-                (message_id, channel_id, guild_id, prize, winners, end_time, host_id, required_role_id, min_messages, min_invites)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (message_id, channel_id, guild_id, prize, winners, end_time, host_id, required_role_id, min_messages, min_invites))
-            await db.commit()
+        await self._write("""
+            INSERT INTO giveaways
+            (message_id, channel_id, guild_id, prize, winners, end_time, host_id, required_role_id, min_messages, min_invites)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (message_id, channel_id, guild_id, prize, winners, end_time, host_id, required_role_id, min_messages, min_invites))
+        await self._refresh_active(message_id)
 
     async def get_giveaway(self, message_id: int) -> Optional[Dict[str, Any]]:
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute("SELECT * FROM giveaways WHERE message_id = ?", (message_id,))
-            row = await cursor.fetchone()
-            if row:
-                keys = [d[0] for d in cursor.description]
-                return dict(zip(keys, row))
-            return None
+        rows = await self._fetch_dicts("SELECT * FROM giveaways WHERE message_id = ?", (message_id,))
+        return rows[0] if rows else None
+
+    async def get_active_giveaway(self, message_id: int) -> Optional[Dict[str, Any]]:
+        """Running giveaway for `message_id` from memory (None for anything else)."""
+        if self._active is None:
+            rows = await self.get_active_giveaways()
+            if self._active is None:
+                self._active = {int(row["message_id"]): row for row in rows}
+        return self._active.get(message_id)
+
+    async def _refresh_active(self, message_id: int):
+        if self._active is None:
+            return
+        row = await self.get_giveaway(message_id)
+        if row and row.get("status") == "running":
+            self._active[message_id] = row
+        else:
+            self._active.pop(message_id, None)
 
     async def get_giveaway_by_message(self, message_id: int) -> Optional[Dict[str, Any]]:
         return await self.get_giveaway(message_id)
 
     async def delete_giveaway(self, message_id: int) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("DELETE FROM giveaways WHERE message_id = ?", (message_id,))
-            await db.execute("DELETE FROM entries WHERE message_id = ?", (message_id,))
+        entry_buffer.discard(message_id)
+        if self._active is not None:
+            self._active.pop(message_id, None)
+        db = await self.connect()
+        await db.execute("DELETE FROM giveaways WHERE message_id = ?", (message_id,))
+        await db.execute("DELETE FROM entries WHERE message_id = ?", (message_id,))
+        await db.execute("DELETE FROM giveaway_winners WHERE message_id = ?", (message_id,))
+        await db.commit()
+
+    async def mark_drawn(self, message_id: int, winners: List[int]) -> bool:
+        """
+        Move a giveaway from running to drawn and store its winners in one commit.
+
+        Returns False if it was no longer running, so exactly one caller
+        (scheduler or /gend) draws. A drawn giveaway still owes its
+        announcement; `mark_ended` closes it once that is sent.
+        """
+        if self._active is not None:
+            self._active.pop(message_id, None)
+        db = await self.connect()
+        cursor = await db.execute(
+            "UPDATE giveaways SET status = 'drawn' WHERE message_id = ? AND status = 'running'", (message_id,)
+        )
+        claimed = cursor.rowcount == 1
+        await cursor.close()
+        if claimed:
+            await db.executemany(
+                "INSERT OR IGNORE INTO giveaway_winners (message_id, user_id) VALUES (?, ?)",
+                [(message_id, uid) for uid in winners]
+            )
+        await db.commit()
+        return claimed
+
+    async def mark_ended(self, message_id: int) -> None:
+        """Drawn → ended once the result is announced; entries are kept for rerolls."""
+        await self._write(
+            "UPDATE giveaways SET status = 'ended' WHERE message_id = ? AND status = 'drawn'", (message_id,)
+        )
+
+    async def get_winners(self, message_id: int) -> List[int]:
+        db = await self.connect()
+        async with db.execute(
+            "SELECT user_id FROM giveaway_winners WHERE message_id = ?", (message_id,)
+        ) as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+
+    async def record_winners(self, message_id: int, winners: List[int]) -> None:
+        db = await self.connect()
+        await db.executemany(
+            "INSERT OR IGNORE INTO giveaway_winners (message_id, user_id) VALUES (?, ?)",
+            [(message_id, uid) for uid in winners]
+        )
+        await db.commit()
+
+    async def prune_ended(self, before_ts: int) -> int:
+        """Drop ended giveaways (and their entries/winners) that ended before `before_ts`."""
+        db = await self.connect()
+        async with db.execute(
+            "SELECT message_id FROM giveaways WHERE status = 'ended' AND end_time < ?", (before_ts,)
+        ) as cursor:
+            stale = [(row[0],) for row in await cursor.fetchall()]
+        if stale:
+            await db.executemany("DELETE FROM entries WHERE message_id = ?", stale)
+            await db.executemany("DELETE FROM giveaway_winners WHERE message_id = ?", stale)
+            await db.executemany("DELETE FROM giveaways WHERE message_id = ?", stale)
             await db.commit()
+        return len(stale)
 
     async def get_all_giveaways(self) -> List[Dict[str, Any]]:
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute("SELECT * FROM giveaways")
-            rows = await cursor.fetchall()
-            keys = [d[0] for d in cursor.description]
-            return [dict(zip(keys, row)) for row in rows]
+        return await self._fetch_dicts("SELECT * FROM giveaways")
 
     async def get_active_giveaways(self) -> List[Dict[str, Any]]:
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute("SELECT * FROM giveaways WHERE status = 'running'")
-            rows = await cursor.fetchall()
-            keys = [d[0] for d in cursor.description]
-            return [dict(zip(keys, row)) for row in rows]
+        return await self._fetch_dicts("SELECT * FROM giveaways WHERE status = 'running'")
+
+    async def get_schedule(self) -> List[tuple]:
+        """(end_time, message_id) for every giveaway still to be ended (running or drawn), earliest first."""
+        db = await self.connect()
+        async with db.execute(
+            "SELECT end_time, message_id FROM giveaways WHERE status IN ('running', 'drawn') ORDER BY end_time"
+        ) as cursor:
+            return [(int(end), int(mid)) for end, mid in await cursor.fetchall()]
 
     async def update_status(self, message_id: int, status: str) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("UPDATE giveaways SET status = ? WHERE message_id = ?", (status, message_id))
-            await db.commit()
+        await self._write("UPDATE giveaways SET status = ? WHERE message_id = ?", (status, message_id))
+        await self._refresh_active(message_id)
 
     async def update_requirements(
         self,
         message_id: int,
         required_role_id: Optional[int] = None,
         min_messages: Optional[int] = None,
-        min_invites: Optional[int] = None
+        min_invites: Optional[int] = None,
+        weight_by_messages: Optional[bool] = None
     ) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
-            query_parts = []
-            params = []
-            if required_role_id is not None:
-                query_parts.append("required_role_id = ?")
-                params.append(required_role_id)
-            if min_messages is not None:
-                query_parts.append("min_messages = ?")
-                params.append(min_messages)
-            if min_invites is not None:
-                query_parts.append("min_invites = ?")
-                params.append(min_invites)
-            params.append(message_id)
-            if query_parts:
-                await db.execute(f"UPDATE giveaways SET {', '.join(query_parts)} WHERE message_id = ?", params)
-                await db.commit()
+        query_parts = []
+        params = []
+        if weight_by_messages is not None:
+            query_parts.append("weight_by_messages = ?")
+            params.append(int(weight_by_messages))
+        if required_role_id is not None:
+            query_parts.append("required_role_id = ?")
+            params.append(required_role_id)
+        if min_messages is not None:
+            query_parts.append("min_messages = ?")
+            params.append(min_messages)
+        if min_invites is not None:
+            query_parts.append("min_invites = ?")
+            params.append(min_invites)
+        params.append(message_id)
+        if query_parts:
+            await self._write(f"UPDATE giveaways SET {', '.join(query_parts)} WHERE message_id = ?", params)
+            await self._refresh_active(message_id)
 
     # ---------------- Entries ----------------
     async def add_entry(self, message_id: int, user_id: int) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "INSERT OR IGNORE INTO entries (message_id, user_id) VALUES (?, ?)",
-                (message_id, user_id)
-            )
-            await db.commit()
+        await self._write(
+            "INSERT OR IGNORE INTO entries (message_id, user_id) VALUES (?, ?)",
+            (message_id, user_id)
+        )
 
     async def remove_entry(self, message_id: int, user_id: int) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("DELETE FROM entries WHERE message_id = ? AND user_id = ?", (message_id, user_id))
-            await db.commit()
+        await self._write("DELETE FROM entries WHERE message_id = ? AND user_id = ?", (message_id, user_id))
+
+    async def apply_entries(self, adds: List[tuple], removes: List[tuple]) -> None:
+        """Apply buffered `(message_id, user_id)` joins and leaves in one transaction."""
+        db = await self.connect()
+        if adds:
+            await db.executemany("INSERT OR IGNORE INTO entries (message_id, user_id) VALUES (?, ?)", adds)
+        if removes:
+            await db.executemany("DELETE FROM entries WHERE message_id = ? AND user_id = ?", removes)
+        await db.commit()
 
     async def get_entries(self, message_id: int) -> List[int]:
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute("SELECT user_id FROM entries WHERE message_id = ?", (message_id,))
+        await entry_buffer.flush()
+        db = await self.connect()
+        async with db.execute("SELECT user_id FROM entries WHERE message_id = ?", (message_id,)) as cursor:
             rows = await cursor.fetchall()
-            return [row[0] for row in rows]
+        return [row[0] for row in rows]
+
+    async def count_entries(self, message_id: int) -> int:
+        await entry_buffer.flush()
+        row = await self._fetchone("SELECT COUNT(*) FROM entries WHERE message_id = ?", (message_id,))
+        return row[0]
+
+    async def sample_entries(self, message_id: int, k: int, exclude_winners: bool = False) -> List[int]:
+        """Uniformly draw up to `k` entrants inside SQLite (bounded top-k sort, O(k) memory)."""
+        query = "SELECT user_id FROM entries WHERE message_id = ?"
+        params = [message_id]
+        if exclude_winners:
+            query += " AND user_id NOT IN (SELECT user_id FROM giveaway_winners WHERE message_id = ?)"
+            params.append(message_id)
+        query += " ORDER BY random() LIMIT ?"
+        params.append(k)
+        await entry_buffer.flush()
+        db = await self.connect()
+        async with db.execute(query, params) as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+
+    async def iter_weighted_entries(
+        self, message_id: int, guild_id: int, exclude_winners: bool = False, chunk_size: int = 1000
+    ):
+        """Yield `(user_id, message_count)` for every entrant, `chunk_size` rows at a time."""
+        query = """
+            SELECT e.user_id, COALESCE(m.message_count, 0)
+            FROM entries e
+            LEFT JOIN messages m ON m.guild_id = ? AND m.user_id = e.user_id
+            WHERE e.message_id = ?
+        """
+        params = [guild_id, message_id]
+        if exclude_winners:
+            query += " AND e.user_id NOT IN (SELECT user_id FROM giveaway_winners WHERE message_id = ?)"
+            params.append(message_id)
+        await entry_buffer.flush()
+        db = await self.connect()
+        async with db.execute(query, params) as cursor:
+            while True:
+                rows = await cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
 
     # ---------------- Manager Role ----------------
     async def set_manager_role(self, guild_id: int, role_id: int) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT INTO giveaway_manager_role (guild_id, role_id)
-                VALUES (?, ?)
-                ON CONFLICT(guild_id) DO UPDATE SET role_id = excluded.role_id
-            """, (guild_id, role_id))
-            await db.commit()
+        await self._write("""
+            INSERT INTO giveaway_manager_role (guild_id, role_id)
+            VALUES (?, ?)
+            ON CONFLICT(guild_id) DO UPDATE SET role_id = excluded.role_id
+        """, (guild_id, role_id))
 
     async def get_manager_role(self, guild_id: int) -> Optional[int]:
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute("SELECT role_id FROM giveaway_manager_role WHERE guild_id = ?", (guild_id,))
-            row = await cursor.fetchone()
-            return row[0] if row else None
+        row = await self._fetchone("SELECT role_id FROM giveaway_manager_role WHERE guild_id = ?", (guild_id,))
+        return row[0] if row else None
 
     # ---------------- Requirements helpers ----------------
     async def get_messages(self, guild_id: int, user_id: int) -> int:
-        """Fetch message count from messages table."""
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute(
-                "SELECT message_count FROM messages WHERE guild_id = ? AND user_id = ?",
-                (guild_id, user_id),
-            )
-            row = await cursor.fetchone()
-            return row[0] if row else 0
+        """Fetch message count from messages table, plus the unflushed delta."""
+        row = await self._fetchone(
+            "SELECT message_count FROM messages WHERE guild_id = ? AND user_id = ?",
+            (guild_id, user_id),
+        )
+        stored = row[0] if row else 0
+        return stored + message_counter.pending(guild_id, user_id)
+
+    async def add_message_counts(self, rows) -> None:
+        """Upsert `(guild_id, user_id, delta)` rows in one transaction."""
+        db = await self.connect()
+        await db.executemany("""
+            INSERT INTO messages (guild_id, user_id, message_count)
+            VALUES (?, ?, ?)
+            ON CONFLICT(guild_id, user_id)
+            DO UPDATE SET message_count = message_count + excluded.message_count
+        """, rows)
+        await db.commit()
+
+    async def add_invite_counts(self, rows) -> None:
+        """Credit `(guild_id, user_id, delta)` invite rows in one transaction."""
+        db = await self.connect()
+        await db.executemany("""
+            INSERT INTO invites (guild_id, user_id, invites)
+            VALUES (?, ?, ?)
+            ON CONFLICT(guild_id, user_id)
+            DO UPDATE SET invites = invites + excluded.invites
+        """, rows)
+        await db.commit()
+
+    async def remove_invite(self, guild_id: int, user_id: int) -> None:
+        await self._write("""
+            UPDATE invites
+            SET invites = CASE
+                WHEN invites > 0 THEN invites - 1
+                ELSE 0
+            END
+            WHERE guild_id = ? AND user_id = ?
+        """, (guild_id, user_id))
+
+    async def get_requirement_counts(self, guild_id: int, user_id: int) -> Tuple[int, int]:
+        """(message_count, invites) for a member in one round trip."""
+        row = await self._fetchone("""
+            SELECT
+                (SELECT message_count FROM messages WHERE guild_id = ? AND user_id = ?),
+                (SELECT invites FROM invites WHERE guild_id = ? AND user_id = ?)
+        """, (guild_id, user_id, guild_id, user_id))
+        messages = (row[0] or 0) + message_counter.pending(guild_id, user_id)
+        return messages, row[1] or 0
 
     async def get_invites(self, guild_id: int, user_id: int) -> int:
         """Fetch invite count from invites table."""
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute(
-                "SELECT invites FROM invites WHERE guild_id = ? AND user_id = ?",
-                (guild_id, user_id),
-            )
-            row = await cursor.fetchone()
-            return row[0] if row else 0
+        row = await self._fetchone(
+            "SELECT invites FROM invites WHERE guild_id = ? AND user_id = ?",
+            (guild_id, user_id),
+        )
+        return row[0] if row else 0
+
+
+# ✅ Shared instance (one connection for every giveaway cog)
+gwy_db = GwyDB()
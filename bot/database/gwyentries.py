@@ -0,0 +1,56 @@
+# bot/database/gwyentries.py
+
+from typing import Dict, Tuple
+
+from bot.database.writebehind import WriteBehindBuffer
+
+Key = Tuple[int, int]  # (message_id, user_id)
+
+
+class EntryBuffer(WriteBehindBuffer):
+    """
+    Write-behind giveaway entries.
+
+    Reaction adds/removes are recorded in memory (last action per
+    (message_id, user_id) wins) and applied by the giveaway database's
+    `apply_entries` as one `INSERT OR IGNORE` executemany plus one DELETE
+    executemany in a single commit, every `flush_interval` seconds or once
+    `max_pending` actions are queued. GwyDB flushes before any query that
+    reads entries, so draws and counts always see every reaction.
+    """
+
+    name = "EntryBuffer"
+
+    def __init__(self, flush_interval: float = 2.0, max_pending: int = 500):
+        super().__init__(flush_interval, max_pending)
+        self._pending: Dict[Key, bool] = {}  # True = enter, False = leave
+
+    # ---------------- Public API ----------------
+    def add(self, message_id: int, user_id: int):
+        self._queue((message_id, user_id), True)
+
+    def remove(self, message_id: int, user_id: int):
+        self._queue((message_id, user_id), False)
+
+    def _queue(self, key: Key, entered: bool):
+        self._pending[key] = entered
+        self._kick()
+
+    def discard(self, message_id: int):
+        """Forget queued actions for a giveaway that is being deleted."""
+        for key in [k for k in self._pending if k[0] == message_id]:
+            del self._pending[key]
+
+    async def _write(self, batch: Dict[Key, bool]):
+        adds = [key for key, entered in batch.items() if entered]
+        removes = [key for key, entered in batch.items() if not entered]
+        await self.store.apply_entries(adds, removes)
+
+    def _requeue(self, batch: Dict[Key, bool]):
+        # Newer actions queued meanwhile take precedence
+        for key, entered in batch.items():
+            self._pending.setdefault(key, entered)
+
+
+# ✅ Singleton instance
+entry_buffer = EntryBuffer()
@@ -0,0 +1,121 @@
+# bot/database/levelpolicy.py
+
+from typing import Dict, FrozenSet, Iterable, Optional
+
+from bot.database.database import database
+
+DEFAULT_COOLDOWN = 60
+
+
+class LevelingPolicy:
+    """
+    Compiled per-guild leveling rules.
+
+    Built once from `config`, `xp_settings`, `no_xp_channels` and
+    `xp_multipliers`; everything the XP listener needs per message is then
+    a set/dict lookup with no I/O.
+    """
+
+    __slots__ = (
+        "guild_id", "enabled", "cooldown", "no_xp_channels",
+        "channel_multipliers", "role_multipliers", "config",
+    )
+
+    def __init__(
+        self,
+        guild_id: str,
+        config: dict,
+        enabled: bool,
+        no_xp_channels: FrozenSet[str],
+        channel_multipliers: Dict[str, float],
+        role_multipliers: Dict[str, float],
+    ):
+        self.guild_id = guild_id
+        self.config = config  # rankup_mode, rankup_channel, role_mode, global_multiplier, ...
+        self.enabled = enabled
+        self.cooldown = config.get("xp_cooldown_seconds") or DEFAULT_COOLDOWN
+        self.no_xp_channels = no_xp_channels
+        self.channel_multipliers = channel_multipliers
+        self.role_multipliers = role_multipliers
+
+    def is_blocked(self, channel_id: str) -> bool:
+        return channel_id in self.no_xp_channels
+
+    def multiplier_for(self, channel_id: str, role_ids: Iterable[str]) -> float:
+        """Channel multiplier × the highest multiplier among the member's roles."""
+        multiplier = self.channel_multipliers.get(channel_id, 1.0)
+        if self.role_multipliers:
+            role_values = [self.role_multipliers[r] for r in role_ids if r in self.role_multipliers]
+            if role_values:
+                multiplier *= max(role_values)
+        return multiplier
+
+
+class LevelingPolicyCache:
+    """
+    Guild ID -> LevelingPolicy, loaded lazily and held in memory.
+
+    Admin cogs that write any of the source tables call `invalidate()`;
+    the next message in that guild recompiles the policy.
+    """
+
+    def __init__(self):
+        self._policies: Dict[str, LevelingPolicy] = {}
+
+    async def get(self, guild_id: str) -> LevelingPolicy:
+        policy = self._policies.get(guild_id)
+        if policy is None:
+            policy = await self._load(guild_id)
+            self._policies[guild_id] = policy
+        return policy
+
+    def peek(self, guild_id: str) -> Optional[LevelingPolicy]:
+        """Return the cached policy without loading it."""
+        return self._policies.get(guild_id)
+
+    def invalidate(self, guild_id):
+        self._policies.pop(str(guild_id), None)
+
+    async def _load(self, guild_id: str) -> LevelingPolicy:
+        db = database.db
+
+        async with db.execute("SELECT * FROM config WHERE guild_id = ?", (guild_id,)) as cursor:
+            row = await cursor.fetchone()
+
+        if row:
+            config = dict(row)
+        else:
+            await db.execute("""
+                INSERT OR IGNORE INTO config (guild_id, leveling_enabled, rankup_mode, rankup_channel)
+                VALUES (?, ?, ?, ?)
+            """, (guild_id, 1, "channel", None))
+            await db.commit()
+            config = {
+                "leveling_enabled": 1,
+                "xp_cooldown_seconds": DEFAULT_COOLDOWN,
+                "rankup_mode": "channel",
+                "rankup_channel": None,
+            }
+
+        # /enableleveling and /disableleveling write xp_settings
+        async with db.execute("SELECT leveling_enabled FROM xp_settings WHERE guild_id = ?", (guild_id,)) as cursor:
+            toggle = await cursor.fetchone()
+        enabled = config.get("leveling_enabled") == 1 and (toggle is None or bool(toggle[0]))
+
+        async with db.execute("SELECT channel_id FROM no_xp_channels WHERE guild_id = ?", (guild_id,)) as cursor:
+            no_xp_channels = frozenset([str(r["channel_id"]) async for r in cursor])
+
+        channel_multipliers: Dict[str, float] = {}
+        role_multipliers: Dict[str, float] = {}
+        async with db.execute(
+            "SELECT target_id, type, multiplier FROM xp_multipliers WHERE guild_id = ?", (guild_id,)
+        ) as cursor:
+            async for r in cursor:
+                target = role_multipliers if r["type"] == "role" else channel_multipliers
+                target[str(r["target_id"])] = float(r["multiplier"])
+
+        return LevelingPolicy(guild_id, config, enabled, no_xp_channels, channel_multipliers, role_multipliers)
+
+
+# ✅ Singleton instance
+leveling_policies = LevelingPolicyCache()
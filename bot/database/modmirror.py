@@ -0,0 +1,401 @@
+# bot/database/modmirror.py
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+
+from firebase_admin import firestore
+from bot.database.database import database
+from bot.utils.asyncfirestore import async_db
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mod_logs (
+    guild_id TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    case_no INTEGER,
+    user_id TEXT,
+    user_tag TEXT,
+    moderator_id TEXT,
+    moderator_tag TEXT,
+    action TEXT,
+    reason TEXT,
+    duration TEXT,
+    timestamp INTEGER,
+    PRIMARY KEY (guild_id, doc_id)
+);
+CREATE INDEX IF NOT EXISTS idx_mod_logs_user ON mod_logs (guild_id, user_id, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_mod_logs_case ON mod_logs (guild_id, case_no);
+CREATE INDEX IF NOT EXISTS idx_mod_logs_moderator ON mod_logs (guild_id, moderator_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS mod_warnings (
+    guild_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    moderator_id TEXT,
+    moderator_name TEXT,
+    reason TEXT,
+    timestamp INTEGER,
+    PRIMARY KEY (guild_id, user_id, idx)
+);
+
+CREATE TABLE IF NOT EXISTS mod_notes (
+    note_id TEXT PRIMARY KEY,
+    guild_id TEXT NOT NULL,
+    user_id TEXT,
+    mod_id TEXT,
+    mod_tag TEXT,
+    note TEXT,
+    timestamp INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_mod_notes_user ON mod_notes (guild_id, user_id, timestamp DESC);
+
+CREATE TABLE IF NOT EXISTS mod_mirror_state (
+    guild_id TEXT PRIMARY KEY,
+    backfilled_at INTEGER,
+    version INTEGER DEFAULT 1
+);
+"""
+
+# Bump to re-backfill every guild (2: ISO timestamps are read as UTC)
+MIRROR_VERSION = 2
+
+# External-content FTS5 indexes kept in sync by triggers (rowid = source rowid)
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS mod_logs_fts USING fts5(reason, content='mod_logs', content_rowid='rowid');
+CREATE TRIGGER IF NOT EXISTS mod_logs_ai AFTER INSERT ON mod_logs BEGIN
+    INSERT INTO mod_logs_fts(rowid, reason) VALUES (new.rowid, new.reason);
+END;
+CREATE TRIGGER IF NOT EXISTS mod_logs_ad AFTER DELETE ON mod_logs BEGIN
+    INSERT INTO mod_logs_fts(mod_logs_fts, rowid, reason) VALUES ('delete', old.rowid, old.reason);
+END;
+CREATE TRIGGER IF NOT EXISTS mod_logs_au AFTER UPDATE OF reason ON mod_logs BEGIN
+    INSERT INTO mod_logs_fts(mod_logs_fts, rowid, reason) VALUES ('delete', old.rowid, old.reason);
+    INSERT INTO mod_logs_fts(rowid, reason) VALUES (new.rowid, new.reason);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS mod_warnings_fts USING fts5(reason, content='mod_warnings', content_rowid='rowid');
+CREATE TRIGGER IF NOT EXISTS mod_warnings_ai AFTER INSERT ON mod_warnings BEGIN
+    INSERT INTO mod_warnings_fts(rowid, reason) VALUES (new.rowid, new.reason);
+END;
+CREATE TRIGGER IF NOT EXISTS mod_warnings_ad AFTER DELETE ON mod_warnings BEGIN
+    INSERT INTO mod_warnings_fts(mod_warnings_fts, rowid, reason) VALUES ('delete', old.rowid, old.reason);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS mod_notes_fts USING fts5(note, content='mod_notes', content_rowid='rowid');
+CREATE TRIGGER IF NOT EXISTS mod_notes_ai AFTER INSERT ON mod_notes BEGIN
+    INSERT INTO mod_notes_fts(rowid, note) VALUES (new.rowid, new.note);
+END;
+CREATE TRIGGER IF NOT EXISTS mod_notes_ad AFTER DELETE ON mod_notes BEGIN
+    INSERT INTO mod_notes_fts(mod_notes_fts, rowid, note) VALUES ('delete', old.rowid, old.note);
+END;
+CREATE TRIGGER IF NOT EXISTS mod_notes_au AFTER UPDATE OF note ON mod_notes BEGIN
+    INSERT INTO mod_notes_fts(mod_notes_fts, rowid, note) VALUES ('delete', old.rowid, old.note);
+    INSERT INTO mod_notes_fts(rowid, note) VALUES (new.rowid, new.note);
+END;
+"""
+
+# replace_warnings stages rows in per-connection temp tables, then swaps them
+# in with one executescript: a single call on the aiosqlite thread, so no
+# other coroutine's commit can land between the DELETE and the INSERT
+WARN_STAGE_SCHEMA = """
+CREATE TEMP TABLE IF NOT EXISTS warn_stage_keys (guild_id TEXT, user_id TEXT);
+CREATE TEMP TABLE IF NOT EXISTS warn_stage (
+    guild_id TEXT, user_id TEXT, idx INTEGER, moderator_id TEXT,
+    moderator_name TEXT, reason TEXT, timestamp INTEGER
+);
+"""
+
+WARN_SWAP = """
+BEGIN;
+DELETE FROM mod_warnings WHERE EXISTS (
+    SELECT 1 FROM temp.warn_stage_keys k
+    WHERE k.guild_id = mod_warnings.guild_id AND k.user_id = mod_warnings.user_id
+);
+INSERT INTO mod_warnings (guild_id, user_id, idx, moderator_id, moderator_name, reason, timestamp)
+    SELECT guild_id, user_id, idx, moderator_id, moderator_name, reason, timestamp FROM temp.warn_stage;
+DELETE FROM temp.warn_stage;
+DELETE FROM temp.warn_stage_keys;
+COMMIT;
+"""
+
+LOG_UPSERT = """
+    INSERT INTO mod_logs (guild_id, doc_id, case_no, user_id, user_tag, moderator_id,
+                          moderator_tag, action, reason, duration, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(guild_id, doc_id) DO UPDATE SET
+        case_no = excluded.case_no, user_id = excluded.user_id, user_tag = excluded.user_tag,
+        moderator_id = excluded.moderator_id, moderator_tag = excluded.moderator_tag,
+        action = excluded.action, reason = excluded.reason, duration = excluded.duration,
+        timestamp = excluded.timestamp
+"""
+
+NOTE_UPSERT = """
+    INSERT INTO mod_notes (note_id, guild_id, user_id, mod_id, mod_tag, note, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(note_id) DO UPDATE SET
+        mod_id = excluded.mod_id, mod_tag = excluded.mod_tag,
+        note = excluded.note, timestamp = excluded.timestamp
+"""
+
+
+def _epoch(value) -> Optional[int]:
+    # Logs store unix seconds; warnings and notes store ISO strings
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        dt = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)  # stored via datetime.utcnow().isoformat()
+    return int(dt.timestamp())
+
+
+def _str(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _log_row(guild_id, doc_id, data):
+    return (
+        str(guild_id), str(doc_id), data.get("case", data.get("case_number")),
+        _str(data.get("user_id")), data.get("user_tag"),
+        _str(data.get("moderator_id")), data.get("moderator_tag"),
+        data.get("action"), data.get("reason"), _str(data.get("duration")),
+        _epoch(data.get("timestamp")),
+    )
+
+
+def _note_row(data):
+    return (
+        data["note_id"], str(data.get("guild_id")), _str(data.get("user_id")),
+        _str(data.get("mod_id")), data.get("mod_tag"), data.get("note"), _epoch(data.get("timestamp")),
+    )
+
+
+def _fts_query(text: str) -> str:
+    # Quote each term so user input can't inject FTS5 syntax; last term is a prefix match
+    terms = ['"' + t.replace('"', '""') + '"' for t in text.split()]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+class ModMirror:
+    """
+    Write-through SQLite copy of moderation logs, warnings and notes.
+
+    Firestore stays the source of truth; every cog that writes there also
+    calls into this mirror, and a background backfill copies each guild's
+    history once. Reads that used to scan Firestore (modlogs, case,
+    modstats, search) are served locally once a guild is backfilled.
+    """
+
+    def __init__(self):
+        self.fts = True
+        self._ready: Set[str] = set()
+        self._backfill_task = None
+        self._warn_lock: Optional[asyncio.Lock] = None
+
+    async def start(self, bot):
+        db = database.db
+        await db.executescript(SCHEMA)
+        try:
+            await db.executescript(FTS_SCHEMA)
+        except Exception as e:
+            # SQLite built without FTS5: ?modsearch falls back to LIKE
+            self.fts = False
+            print(f"⚠️ FTS5 unavailable, mod search will use LIKE → {e}")
+        await db.executescript(WARN_STAGE_SCHEMA)
+        async with db.execute("PRAGMA table_info(mod_mirror_state)") as cursor:
+            columns = {row[1] async for row in cursor}
+        if "version" not in columns:
+            await db.execute("ALTER TABLE mod_mirror_state ADD COLUMN version INTEGER DEFAULT 1")
+        await db.commit()
+
+        async with db.execute(
+            "SELECT guild_id FROM mod_mirror_state WHERE version >= ?", (MIRROR_VERSION,)
+        ) as cursor:
+            self._ready = {row[0] async for row in cursor}
+        self._backfill_task = asyncio.create_task(self._backfill_all(bot))
+
+    def is_ready(self, guild_id) -> bool:
+        return str(guild_id) in self._ready
+
+    # ---------------- Write-through ----------------
+    async def upsert_log(self, guild_id, doc_id, data: dict):
+        await database.db.execute(LOG_UPSERT, _log_row(guild_id, doc_id, data))
+        await database.db.commit()
+
+    async def update_log(self, guild_id, case, **fields):
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        await database.db.execute(
+            f"UPDATE mod_logs SET {assignments} WHERE guild_id = ? AND case_no = ?",
+            (*[_str(v) for v in fields.values()], str(guild_id), case)
+        )
+        await database.db.commit()
+
+    async def replace_warnings(self, guild_id, user_id, warnings: List[dict]):
+        """Swap in a user's full warning list atomically (see WARN_SWAP)."""
+        guild_id, user_id = str(guild_id), str(user_id)
+        if self._warn_lock is None:
+            self._warn_lock = asyncio.Lock()
+        db = database.db
+        async with self._warn_lock:
+            try:
+                await db.execute("INSERT INTO temp.warn_stage_keys VALUES (?, ?)", (guild_id, user_id))
+                await db.executemany("INSERT INTO temp.warn_stage VALUES (?, ?, ?, ?, ?, ?, ?)", [
+                    (guild_id, user_id, i, _str(w.get("moderator_id")), w.get("moderator_name"),
+                     w.get("reason"), _epoch(w.get("timestamp")))
+                    for i, w in enumerate(warnings, start=1)
+                ])
+                await db.executescript(WARN_SWAP)
+            except Exception:
+                if db.in_transaction:
+                    await db.rollback()
+                await db.executescript("DELETE FROM temp.warn_stage; DELETE FROM temp.warn_stage_keys;")
+                raise
+
+    async def upsert_note(self, data: dict):
+        await database.db.execute(NOTE_UPSERT, _note_row(data))
+        await database.db.commit()
+
+    async def update_note(self, note_id, **fields):
+        if "timestamp" in fields:
+            fields["timestamp"] = _epoch(fields["timestamp"])
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        await database.db.execute(
+            f"UPDATE mod_notes SET {assignments} WHERE note_id = ?", (*fields.values(), note_id)
+        )
+        await database.db.commit()
+
+    async def delete_notes(self, note_ids: List[str]):
+        await database.db.executemany("DELETE FROM mod_notes WHERE note_id = ?", [(n,) for n in note_ids])
+        await database.db.commit()
+
+    # ---------------- Backfill ----------------
+    async def backfill(self, guild_id):
+        """Copy one guild's logs, warnings and notes from Firestore into the mirror."""
+        guild_id = str(guild_id)
+        fs = firestore.client()
+        db = database.db
+
+        logs = await async_db.stream(fs.collection("moderation").document(guild_id).collection("logs"), timeout=120)
+        await db.executemany(LOG_UPSERT, [_log_row(guild_id, doc.id, doc.to_dict()) for doc in logs])
+
+        users = await async_db.stream(fs.collection("infractions").document(guild_id).collection("users"), timeout=120)
+        for doc in users:
+            await self.replace_warnings(guild_id, doc.id, (doc.to_dict() or {}).get("warnings", []))
+
+        notes = await async_db.stream(fs.collection("notes").where("guild_id", "==", guild_id), timeout=120)
+        await db.executemany(NOTE_UPSERT, [_note_row(doc.to_dict()) for doc in notes if doc.to_dict().get("note_id")])
+
+        await db.execute(
+            "INSERT OR REPLACE INTO mod_mirror_state (guild_id, backfilled_at, version) VALUES (?, strftime('%s','now'), ?)",
+            (guild_id, MIRROR_VERSION)
+        )
+        await db.commit()
+        self._ready.add(guild_id)
+        return len(logs), len(users), len(notes)
+
+    async def _backfill_all(self, bot):
+        await bot.wait_until_ready()
+        for guild in list(bot.guilds):
+            if self.is_ready(guild.id):
+                continue
+            try:
+                counts = await self.backfill(guild.id)
+                print(f"🪞 Mirrored {guild.name}: {counts[0]} logs, {counts[1]} warned users, {counts[2]} notes")
+            except Exception as e:
+                print(f"⚠️ Mod mirror backfill failed for {guild.id} → {e}")
+            await asyncio.sleep(1)  # spread Firestore reads out
+
+    # ---------------- Reads ----------------
+    async def user_logs(self, guild_id, user_id, page: int, per_page: int = 10):
+        """Return (page of log dicts newest first, total count) for one user."""
+        args = (str(guild_id), str(user_id))
+        async with database.db.execute(
+            "SELECT COUNT(*) FROM mod_logs WHERE guild_id = ? AND user_id = ?", args
+        ) as cursor:
+            (total,) = await cursor.fetchone()
+        async with database.db.execute("""
+            SELECT case_no AS "case", user_id, user_tag, moderator_id, moderator_tag,
+                   action, reason, duration, timestamp
+            FROM mod_logs WHERE guild_id = ? AND user_id = ?
+            ORDER BY timestamp DESC LIMIT ? OFFSET ?
+        """, (*args, per_page, (page - 1) * per_page)) as cursor:
+            rows = [dict(row) for row in await cursor.fetchall()]
+        return rows, total
+
+    async def get_case(self, guild_id, case) -> Optional[dict]:
+        async with database.db.execute("""
+            SELECT case_no AS "case", user_id, user_tag, moderator_id, moderator_tag,
+                   action, reason, duration, timestamp
+            FROM mod_logs WHERE guild_id = ? AND case_no = ? LIMIT 1
+        """, (str(guild_id), case)) as cursor:
+            row = await cursor.fetchone()
+        return dict(row) if row else None
+
+    async def moderator_counts(self, guild_id, moderator_id, since_7d: int, since_30d: int) -> Dict[str, Dict[str, int]]:
+        """{action: {"7d", "30d", "all"}} for one moderator, via the moderator index."""
+        async with database.db.execute("""
+            SELECT action,
+                   SUM(timestamp >= ?) AS d7,
+                   SUM(timestamp >= ?) AS d30,
+                   COUNT(*) AS total
+            FROM mod_logs WHERE guild_id = ? AND moderator_id = ?
+            GROUP BY action
+        """, (since_7d, since_30d, str(guild_id), str(moderator_id))) as cursor:
+            return {
+                row["action"]: {"7d": row["d7"] or 0, "30d": row["d30"] or 0, "all": row["total"]}
+                async for row in cursor
+            }
+
+    async def search(self, guild_id, text: str, limit: int = 10) -> List[dict]:
+        """Full-text search over log reasons, warning reasons and notes, newest first."""
+        guild_id = str(guild_id)
+        if self.fts:
+            match = _fts_query(text)
+            query = """
+                SELECT 'log' AS kind, l.case_no AS ref, l.user_id, l.action, l.reason AS text, l.timestamp
+                FROM mod_logs_fts f JOIN mod_logs l ON l.rowid = f.rowid
+                WHERE mod_logs_fts MATCH ? AND l.guild_id = ?
+                UNION ALL
+                SELECT 'warning', w.idx, w.user_id, 'warn', w.reason, w.timestamp
+                FROM mod_warnings_fts f JOIN mod_warnings w ON w.rowid = f.rowid
+                WHERE mod_warnings_fts MATCH ? AND w.guild_id = ?
+                UNION ALL
+                SELECT 'note', n.note_id, n.user_id, 'note', n.note, n.timestamp
+                FROM mod_notes_fts f JOIN mod_notes n ON n.rowid = f.rowid
+                WHERE mod_notes_fts MATCH ? AND n.guild_id = ?
+                ORDER BY timestamp DESC LIMIT ?
+            """
+            params = (match, guild_id, match, guild_id, match, guild_id, limit)
+        else:
+            like = f"%{text}%"
+            query = """
+                SELECT 'log' AS kind, case_no AS ref, user_id, action, reason AS text, timestamp
+                FROM mod_logs WHERE guild_id = ? AND reason LIKE ?
+                UNION ALL
+                SELECT 'warning', idx, user_id, 'warn', reason, timestamp
+                FROM mod_warnings WHERE guild_id = ? AND reason LIKE ?
+                UNION ALL
+                SELECT 'note', note_id, user_id, 'note', note, timestamp
+                FROM mod_notes WHERE guild_id = ? AND note LIKE ?
+                ORDER BY timestamp DESC LIMIT ?
+            """
+            params = (guild_id, like, guild_id, like, guild_id, like, limit)
+
+        async with database.db.execute(query, params) as cursor:
+            return [dict(row) for row in await cursor.fetchall()]
+
+    async def close(self):
+        if self._backfill_task:
+            self._backfill_task.cancel()
+            self._backfill_task = None
+        self._warn_lock: Optional[asyncio.Lock] = None
+
+
+# ✅ Singleton instance
+mod_mirror = ModMirror()
@@ -0,0 +1,53 @@
+# bot/database/msgcounter.py
+
+from typing import Dict, Tuple
+
+from bot.database.writebehind import WriteBehindBuffer
+
+Key = Tuple[int, int]  # (guild_id, user_id)
+
+
+class MessageCounter(WriteBehindBuffer):
+    """
+    Write-behind message counts for giveaway requirements.
+
+    Each message bumps an in-memory delta per (guild_id, user_id); a
+    background loop writes every pending delta through the giveaway
+    database's `add_message_counts` (one `executemany` upsert, one commit)
+    every `flush_interval` seconds, or sooner once `max_pending` users are
+    dirty. Readers add `pending()` to the stored count so requirement checks
+    never lag behind the buffer.
+    """
+
+    name = "MessageCounter"
+
+    def __init__(self, flush_interval: float = 5.0, max_pending: int = 1000):
+        super().__init__(flush_interval, max_pending)
+        self._pending: Dict[Key, int] = {}
+        self._inflight: Dict[Key, int] = {}  # batch being written right now
+
+    # ---------------- Public API ----------------
+    def add(self, guild_id: int, user_id: int, count: int = 1):
+        key = (guild_id, user_id)
+        self._pending[key] = self._pending.get(key, 0) + count
+        self._kick()
+
+    def pending(self, guild_id: int, user_id: int) -> int:
+        """Messages counted in memory but not yet written."""
+        key = (guild_id, user_id)
+        return self._pending.get(key, 0) + self._inflight.get(key, 0)
+
+    async def _write(self, batch: Dict[Key, int]):
+        self._inflight = batch
+        try:
+            await self.store.add_message_counts([(gid, uid, delta) for (gid, uid), delta in batch.items()])
+        finally:
+            self._inflight = {}
+
+    def _requeue(self, batch: Dict[Key, int]):
+        for key, delta in batch.items():
+            self._pending[key] = self._pending.get(key, 0) + delta
+
+
+# ✅ Singleton instance
+message_counter = MessageCounter()
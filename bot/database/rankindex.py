@@ -0,0 +1,149 @@
+# bot/database/rankindex.py
+
+import asyncio
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from bot.database.database import database
+
+try:
+    from sortedcontainers import SortedList
+except ImportError:  # optional speedup, listed in requirements.txt
+    class SortedList(list):
+        """Plain-list fallback with SortedList's interface (O(n) add/remove)."""
+
+        def __init__(self, values=()):
+            super().__init__(sorted(values))
+
+        def add(self, value):
+            insort(self, value)
+
+        def remove(self, value):
+            del self[bisect_left(self, value)]
+
+        def bisect_right(self, value):
+            return bisect_right(self, value)
+
+
+class GuildRankIndex:
+    """
+    Order-statistic view of one guild's XP.
+
+    `sorted_xp` is a SortedList of every member's XP, so a member's rank is
+    one bisect: 1 + number of members with strictly more XP (ties share a
+    rank, same as the COUNT(*) query). Updates are a remove plus an add,
+    both O(log n) on sortedcontainers' B-tree-like list.
+    """
+
+    __slots__ = ("xp_by_user", "sorted_xp")
+
+    def __init__(self, rows: Iterable[Tuple[str, int]] = ()):
+        self.xp_by_user: Dict[str, int] = {str(uid): int(xp or 0) for uid, xp in rows}
+        self.sorted_xp = SortedList(self.xp_by_user.values())
+
+    def set(self, user_id: str, xp: int):
+        old = self.xp_by_user.get(user_id)
+        if old == xp:
+            return
+        if old is not None:
+            self.sorted_xp.remove(old)
+        self.xp_by_user[user_id] = xp
+        self.sorted_xp.add(xp)
+
+    def rank_of(self, user_id: str) -> Optional[int]:
+        xp = self.xp_by_user.get(user_id)
+        if xp is None:
+            return None
+        return len(self.sorted_xp) - self.sorted_xp.bisect_right(xp) + 1
+
+    def __len__(self):
+        return len(self.sorted_xp)
+
+
+class RankIndex:
+    """
+    Optional in-memory rank lookups, kept current by the XP write buffer.
+
+    Guilds are indexed lazily on their first rank lookup and evicted LRU once
+    `max_guilds` are held. Set `enabled = False` to fall back to the indexed
+    COUNT(*) query in `Database.get_user_rank`.
+    """
+
+    def __init__(self, max_guilds: int = 100, enabled: bool = True):
+        self.max_guilds = max_guilds
+        self.enabled = enabled
+        self._guilds: "OrderedDict[str, GuildRankIndex]" = OrderedDict()
+        self._loading: Dict[str, Dict[str, int]] = {}  # updates seen while a load is in flight
+        self._inflight: Dict[str, asyncio.Event] = {}  # set when a guild's load finishes
+
+    def is_loaded(self, guild_id: str) -> bool:
+        return guild_id in self._guilds
+
+    async def load(self, guild_id: str):
+        """
+        Build the index for a guild from `user_xp` (caller flushes pending XP first).
+
+        Concurrent callers for the same guild wait on the load already in
+        flight instead of returning before the index exists.
+        """
+        if guild_id in self._guilds:
+            return
+        done = self._inflight.get(guild_id)
+        if done is not None:
+            await done.wait()
+            return
+
+        done = self._inflight[guild_id] = asyncio.Event()
+        try:
+            await self._build(guild_id)
+        finally:
+            del self._inflight[guild_id]
+            done.set()
+
+    async def _build(self, guild_id: str):
+        self._loading[guild_id] = {}
+        try:
+            async with database.db.execute(
+                "SELECT user_id, xp FROM user_xp WHERE guild_id = ?", (guild_id,)
+            ) as cursor:
+                rows = await cursor.fetchall()
+        except Exception:
+            self._loading.pop(guild_id, None)
+            raise
+
+        updates = self._loading.pop(guild_id, None)
+        if updates is None:
+            return  # invalidated mid-load; the next lookup reloads
+
+        index = GuildRankIndex((row[0], row[1]) for row in rows)
+        for user_id, xp in updates.items():
+            index.set(user_id, xp)
+
+        self._guilds[guild_id] = index
+        while len(self._guilds) > self.max_guilds:
+            self._guilds.popitem(last=False)
+
+    def update(self, guild_id: str, user_id: str, xp: int):
+        """Record a user's new total. No-op for guilds that aren't indexed."""
+        index = self._guilds.get(guild_id)
+        if index is not None:
+            index.set(user_id, xp)
+        elif guild_id in self._loading:
+            self._loading[guild_id][user_id] = xp
+
+    def rank_of(self, guild_id: str, user_id: str) -> Optional[int]:
+        index = self._guilds.get(guild_id)
+        if index is None:
+            return None
+        self._guilds.move_to_end(guild_id)
+        return index.rank_of(user_id)
+
+    def invalidate(self, guild_id: str):
+        """Drop a guild's index after an out-of-band XP write; it reloads on demand."""
+        self._guilds.pop(guild_id, None)
+        self._loading.pop(guild_id, None)
+
+
+# ✅ Singleton instance
+rank_index = RankIndex()
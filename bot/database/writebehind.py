@@ -0,0 +1,96 @@
+# bot/database/writebehind.py
+
+import asyncio
+from typing import Dict, Hashable, Optional
+
+
+class WriteBehindBuffer:
+    """
+    Shared skeleton for the write-behind buffers (XP, message counts, entries).
+
+    Subclasses accumulate changes in `_pending` and implement `_write(batch)`
+    (persist one swapped-out batch) and `_requeue(batch)` (merge a failed
+    batch back into `_pending`). A background loop flushes every
+    `flush_interval` seconds; `_kick()` starts an early flush once
+    `max_pending` keys are dirty, keeping at most one such task in flight.
+    """
+
+    name = "WriteBehind"  # log prefix
+
+    def __init__(self, flush_interval: float, max_pending: int):
+        self.store = None  # backing database, set by start() where needed
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[Hashable, object] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._kicked: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def start(self, store=None):
+        if store is not None:
+            self.store = store
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Stop the flush loop and write out everything still pending."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._kicked:
+            await asyncio.gather(self._kicked, return_exceptions=True)
+            self._kicked = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self._safe_flush()
+
+    async def _safe_flush(self):
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"[{self.name}] Flush failed: {e}")
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _kick(self):
+        """Flush early from sync code once the buffer is full; one task at a time."""
+        if len(self._pending) >= self.max_pending and (self._kicked is None or self._kicked.done()):
+            self._kicked = asyncio.create_task(self._safe_flush())
+
+    # ---------------- Flush ----------------
+    def _ready(self) -> bool:
+        return self.store is not None
+
+    async def flush(self):
+        """Write everything pending as one batch."""
+        async with self._get_lock():
+            if not self._pending or not self._ready():
+                return
+
+            batch, self._pending = self._pending, {}
+            try:
+                await self._write(batch)
+            except Exception:
+                # Put the batch back so the next flush retries it
+                self._requeue(batch)
+                raise
+
+    async def _write(self, batch: dict):
+        raise NotImplementedError
+
+    def _requeue(self, batch: dict):
+        raise NotImplementedError
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
@@ -0,0 +1,105 @@
+# bot/database/xpbuffer.py
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from bot.database.database import database
+from bot.database.rankindex import rank_index
+from bot.database.writebehind import WriteBehindBuffer
+
+Key = Tuple[str, str]  # (guild_id, user_id)
+
+UPSERT_XP = """
+    INSERT INTO user_xp (guild_id, user_id, xp, last_message_ts)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(guild_id, user_id)
+    DO UPDATE SET xp = xp + excluded.xp,
+                  last_message_ts = MAX(COALESCE(last_message_ts, 0), excluded.last_message_ts)
+"""
+
+
+class XPWriteBuffer(WriteBehindBuffer):
+    """
+    Write-behind accumulator for chat XP.
+
+    Messages add to an in-memory delta per (guild_id, user_id); a background
+    loop group-commits all pending deltas with one `executemany` + one commit
+    every `flush_interval` seconds, or sooner once `max_pending` users are
+    dirty. Running totals for the `max_totals` most recently active users
+    are kept in an LRU so level-ups are computed without a read-back; a miss
+    reads the stored XP under the flush lock, so it sees each delta once.
+
+    Anything that writes `user_xp` directly (admin XP commands, resets,
+    imports) should `await flush()` before reading and `invalidate()` after
+    writing, so the cached totals are reloaded from the database.
+    """
+
+    name = "XPBuffer"
+
+    def __init__(self, flush_interval: float = 2.0, max_pending: int = 500, max_totals: int = 50_000):
+        super().__init__(flush_interval, max_pending)
+        self.max_totals = max_totals
+        self._pending: Dict[Key, list] = {}  # key -> [xp_delta, last_message_ts]
+        self._totals: "OrderedDict[Key, int]" = OrderedDict()  # key -> DB xp + pending delta (LRU)
+
+    # ---------------- Public API ----------------
+    async def add(self, guild_id: str, user_id: str, xp: int, ts: int) -> Tuple[int, int]:
+        """Queue `xp` for a user and return (old_total, new_total)."""
+        key = (guild_id, user_id)
+
+        old_total = self._totals.get(key)
+        if old_total is None:
+            # Holding the flush lock: no batch moves from _pending to the
+            # table between reading the row and reading the pending delta
+            async with self._get_lock():
+                old_total = self._totals.get(key)  # another message may have loaded it
+                if old_total is None:
+                    row = await database.get_xp(guild_id, user_id)
+                    pending = self._pending.get(key)
+                    old_total = (row["xp"] if row else 0) + (pending[0] if pending else 0)
+
+        entry = self._pending.get(key)
+        if entry:
+            entry[0] += xp
+            entry[1] = max(entry[1], ts)
+        else:
+            self._pending[key] = [xp, ts]
+
+        new_total = old_total + xp
+        self._totals[key] = new_total
+        self._totals.move_to_end(key)
+        while len(self._totals) > self.max_totals:
+            self._totals.popitem(last=False)  # evicted users reload on their next message
+        rank_index.update(guild_id, user_id, new_total)
+
+        if len(self._pending) >= self.max_pending:
+            await self.flush()
+
+        return old_total, new_total
+
+    def _ready(self) -> bool:
+        return database.db is not None
+
+    async def _write(self, batch: Dict[Key, list]):
+        rows = [(gid, uid, delta, ts) for (gid, uid), (delta, ts) in batch.items()]
+        await database.db.executemany(UPSERT_XP, rows)
+        await database.db.commit()
+
+    def _requeue(self, batch: Dict[Key, list]):
+        for key, (delta, ts) in batch.items():
+            entry = self._pending.setdefault(key, [0, 0])
+            entry[0] += delta
+            entry[1] = max(entry[1], ts)
+
+    def invalidate(self, guild_id: str, user_id: Optional[str] = None):
+        """Forget cached totals after an out-of-band write to `user_xp`."""
+        rank_index.invalidate(guild_id)
+        if user_id is not None:
+            self._totals.pop((guild_id, user_id), None)
+            return
+        for key in [k for k in self._totals if k[0] == guild_id]:
+            del self._totals[key]
+
+
+# ✅ Singleton instance
+xp_buffer = XPWriteBuffer()
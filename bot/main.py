@@ -5,8 +5,21 @@ import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 from bot.core.loader import load_cogs
+from bot.core.pipeline import message_pipeline
 from firebase.config import init_firebase
 from bot.database.database import database  # ✅ Added for SQLite
+from bot.database.xpbuffer import xp_buffer
+from bot.database.msgcounter import message_counter
+from bot.database.gwydb import gwy_db
+from bot.database.gwyentries import entry_buffer
+from bot.database.afkdb import afk_registry
+from bot.database.modmirror import mod_mirror
+from bot.utils.guildsettings import settings_cache
+from bot.utils.asyncfirestore import async_db
+from bot.utils.rankcard import rank_cards
+from bot.utils.avatarcache import avatar_cache
+from bot.utils.taskmanager import task_manager
+from bot.utils.casecounter import case_allocator
 import asyncio
 
 # ✅ Load environment variables from config/.env
@@ -14,17 +27,11 @@ load_dotenv(dotenv_path="config/.env")
 
 intents = discord.Intents.all()
 
-# ✅ Dynamic prefix from Firestore
+# ✅ Dynamic prefix from the in-memory settings cache (no network on the hot path)
 async def get_prefix(bot, message):
     if not message.guild:
         return "?"
-    try:
-        doc = bot.db.collection("settings").document(str(message.guild.id)).get()
-        if doc.exists:
-            return doc.to_dict().get("prefix", "?")
-    except:
-        pass
-    return "?"
+    return settings_cache.get(message.guild.id).prefix
 
 # ✅ Create bot instance
 bot = commands.Bot(
@@ -33,8 +40,8 @@ bot = commands.Bot(
     intents=intents
 )
 
-# ✅ Store disabled commands in memory per guild
-bot.disabled_commands = {}  # {guild_id: [command names]}
+# ✅ Disabled commands per guild, maintained by the settings cache
+bot.disabled_commands = settings_cache.disabled_commands  # {guild_id: [command names]}
 
 # ✅ Global check to block disabled commands per server
 @bot.check
@@ -64,22 +71,15 @@ async def on_command_error(ctx, error):
     )
     await ctx.send(embed=embed)
 
-# ✅ Load disabled commands when bot starts
+# ✅ Disabled commands are already cached by the settings snapshot listener
 @bot.event
 async def on_ready():
     print(f"✅ Logged in as {bot.user} (ID: {bot.user.id})")
 
     for guild in bot.guilds:
-        guild_id = str(guild.id)
-        doc = bot.db.collection("settings").document(guild_id).get()
-        if doc.exists:
-            data = doc.to_dict()
-            disabled = data.get("disabled_commands", [])
-            bot.disabled_commands[guild_id] = [cmd.lower() for cmd in disabled]
+        disabled = bot.disabled_commands.get(str(guild.id), [])
+        if disabled:
             print(f"🔧 {guild.name} disabled: {disabled}")
-        else:
-            bot.disabled_commands[guild_id] = []
-            print(f"ℹ️ No disabled_commands found for {guild.name}")
 
     synced = await bot.tree.sync()
     print(f"🔄 Synced {len(synced)} global slash commands.")
@@ -88,15 +88,32 @@ async def on_ready():
 async def main():
     db = init_firebase()
     bot.db = db
+    await settings_cache.start(db)  # ✅ Prefix / toggles / role config served from memory
 
     await database.connect()  # ✅ SQLite database connection here
     print("✅ Connected to ghost.db")
+    xp_buffer.start()  # ✅ Write-behind XP group commits
+    await mod_mirror.start(bot)  # ✅ Local modlog/warning/note mirror (backfills after ready)
 
     await load_cogs(bot)
+    bot.add_listener(message_pipeline.process, "on_message")  # ✅ One listener runs every message stage
+    await task_manager.start(bot)  # ✅ Rehydrate persisted mute/ban/lock timers
 
     try:
         await bot.start(os.getenv("DISCORD_TOKEN"))
     finally:
+        settings_cache.stop()
+        await task_manager.close()
+        await mod_mirror.close()
+        await case_allocator.release_all()  # ✅ Hand back unused case numbers
+        async_db.shutdown()
+        await rank_cards.close()
+        await avatar_cache.close()
+        await xp_buffer.close()  # ✅ Flush pending XP before the DB closes
+        await message_counter.close()  # ✅ Flush buffered giveaway message counts
+        await entry_buffer.close()  # ✅ Write queued giveaway entries
+        await gwy_db.close()
+        await afk_registry.close()
         await database.close()  # ✅ Clean shutdown
         await bot.close()
 
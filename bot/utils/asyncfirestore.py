@@ -0,0 +1,129 @@
+# bot/utils/asyncfirestore.py
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+
+class FirestoreTimeout(Exception):
+    """
+    Raised when a Firestore call does not finish within its deadline.
+
+    The call itself keeps running on its worker thread; `pending` is its
+    future, for callers that need to know whether it still took effect.
+    """
+
+    def __init__(self, message: str, pending: Optional[asyncio.Future] = None):
+        super().__init__(message)
+        self.pending = pending
+
+
+class AsyncFirestore:
+    """
+    Non-blocking facade over the synchronous firebase_admin client.
+
+    Every call runs on a bounded thread pool behind a semaphore, with a
+    deadline and per-operation latency counters, so a slow Firestore
+    round-trip only stalls the coroutine that asked for it — never the loop.
+    Refs/queries are still built with the normal client (that part is local);
+    only the network calls go through here.
+    """
+
+    def __init__(self, max_workers: int = 8, max_concurrency: int = 32, timeout: float = 10.0):
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="firestore")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.metrics: Dict[str, Dict[str, float]] = {}
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _record(self, op: str, elapsed_ms: float, error: bool = False, timed_out: bool = False):
+        m = self.metrics.setdefault(op, {"calls": 0, "errors": 0, "timeouts": 0, "total_ms": 0.0, "max_ms": 0.0})
+        m["calls"] += 1
+        m["total_ms"] += elapsed_ms
+        m["max_ms"] = max(m["max_ms"], elapsed_ms)
+        if error:
+            m["errors"] += 1
+        if timed_out:
+            m["timeouts"] += 1
+
+    async def run(self, op: str, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run a blocking Firestore callable off-loop, bounded and timed."""
+        loop = asyncio.get_running_loop()
+        deadline = self.timeout if timeout is None else timeout
+
+        async with self._get_semaphore():
+            start = time.perf_counter()
+            future = loop.run_in_executor(self._executor, lambda: fn(*args, **kwargs))
+            try:
+                # Shielded: a timeout stops our wait, the worker thread can't be stopped
+                result = await asyncio.wait_for(asyncio.shield(future), deadline)
+            except asyncio.TimeoutError:
+                self._record(op, (time.perf_counter() - start) * 1000, error=True, timed_out=True)
+                raise FirestoreTimeout(f"Firestore {op} timed out after {deadline:.0f}s", pending=future)
+            except Exception:
+                self._record(op, (time.perf_counter() - start) * 1000, error=True)
+                raise
+            self._record(op, (time.perf_counter() - start) * 1000)
+            return result
+
+    # ---------------- Document helpers ----------------
+    async def get(self, ref, **kwargs):
+        return await self.run("get", ref.get, **kwargs)
+
+    async def get_dict(self, ref, **kwargs) -> dict:
+        """Fetch a document and return its data, or {} if it doesn't exist."""
+        doc = await self.get(ref, **kwargs)
+        return (doc.to_dict() or {}) if doc.exists else {}
+
+    async def set(self, ref, data: dict, merge: bool = False, **kwargs):
+        return await self.run("set", ref.set, data, merge=merge, **kwargs)
+
+    async def create(self, ref, data: dict, **kwargs):
+        """Write a new document; raises google.api_core AlreadyExists if it's taken."""
+        return await self.run("create", ref.create, data, **kwargs)
+
+    async def update(self, ref, data: dict, **kwargs):
+        return await self.run("update", ref.update, data, **kwargs)
+
+    async def delete(self, ref, **kwargs):
+        return await self.run("delete", ref.delete, **kwargs)
+
+    # ---------------- Query helpers ----------------
+    async def stream(self, query, **kwargs) -> List[Any]:
+        """Materialize a query/collection stream on the worker thread."""
+        return await self.run("stream", lambda: list(query.stream()), **kwargs)
+
+    async def count(self, query, **kwargs) -> int:
+        """Server-side COUNT aggregation; billed per 1000 index entries, not per doc."""
+        def _count():
+            return query.count().get()[0][0].value
+        return await self.run("count", _count, **kwargs)
+
+    # ---------------- Introspection ----------------
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-op summary: calls, errors, timeouts, avg/max latency in ms."""
+        summary = {}
+        for op, m in self.metrics.items():
+            summary[op] = {
+                "calls": m["calls"],
+                "errors": m["errors"],
+                "timeouts": m["timeouts"],
+                "avg_ms": round(m["total_ms"] / m["calls"], 2) if m["calls"] else 0.0,
+                "max_ms": round(m["max_ms"], 2),
+            }
+        return summary
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+# ✅ Singleton instance
+async_db = AsyncFirestore()
@@ -0,0 +1,122 @@
+# bot/utils/avatarcache.py
+
+import asyncio
+from collections import OrderedDict
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+
+
+def _decode(avatar_bytes: bytes, size: int):
+    from PIL import Image
+    return Image.open(BytesIO(avatar_bytes)).convert("RGBA").resize((size, size))
+
+
+def _dominant_color(avatar_bytes: bytes) -> Optional[Tuple[int, int, int]]:
+    try:
+        from colorthief import ColorThief
+        return ColorThief(BytesIO(avatar_bytes)).get_color(quality=1)
+    except Exception:
+        return None
+
+
+class AvatarCache:
+    """
+    Decoded avatars keyed by `display_avatar.key`, shared across cogs.
+
+    Discord gives every avatar upload a new key, so an entry never goes stale;
+    it only falls out of the LRU once the decoded images exceed `max_bytes`.
+    Dominant colours (the ColorThief quantization) are kept per key as well.
+    Decoding and quantization run in a worker thread, never on the loop.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._images: "OrderedDict[Tuple[str, int], object]" = OrderedDict()
+        self._colors: Dict[str, Optional[Tuple[int, int, int]]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.hits = 0
+        self.misses = 0
+
+    async def _download(self, user) -> bytes:
+        key = user.display_avatar.key
+        # Concurrent misses for the same avatar share one CDN request
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            if self._session is None or self._session.closed:
+                self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+            async with self._session.get(user.display_avatar.replace(size=256).url) as resp:
+                resp.raise_for_status()
+                data = await resp.read()
+            future.set_result(data)
+            return data
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def get(self, user, size: int = 256, with_color: bool = False):
+        """
+        Return `(image, dominant_color)` for a user's current avatar.
+
+        `image` is an RGBA PIL image resized to `size`x`size`; callers must
+        `.copy()` it before drawing on it. `dominant_color` is only computed
+        when `with_color` is set, and may be None if quantization failed.
+        """
+        avatar_key = user.display_avatar.key
+        image = self._images.get((avatar_key, size))
+        need_color = with_color and avatar_key not in self._colors
+
+        if image is not None and not need_color:
+            self._images.move_to_end((avatar_key, size))
+            self.hits += 1
+            return image, self._colors.get(avatar_key)
+
+        self.misses += 1
+        avatar_bytes = await self._download(user)
+        if image is None:
+            image = await asyncio.to_thread(_decode, avatar_bytes, size)
+            self._store((avatar_key, size), image)
+        if need_color:
+            self._colors[avatar_key] = await asyncio.to_thread(_dominant_color, avatar_bytes)
+        return image, self._colors.get(avatar_key)
+
+    def _store(self, key, image):
+        if key in self._images:
+            return
+        self._images[key] = image
+        self.used_bytes += image.width * image.height * 4
+        while self.used_bytes > self.max_bytes and len(self._images) > 1:
+            (old_key, _), old = self._images.popitem(last=False)
+            self.used_bytes -= old.width * old.height * 4
+            if not any(k[0] == old_key for k in self._images):
+                self._colors.pop(old_key, None)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._images),
+            "used_mb": round(self.used_bytes / 1024 / 1024, 2),
+            "max_mb": round(self.max_bytes / 1024 / 1024, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+
+# ✅ Singleton instance
+avatar_cache = AvatarCache()
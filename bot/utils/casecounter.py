@@ -1,19 +1,92 @@
 import asyncio
 from firebase_admin import firestore
+from bot.utils.asyncfirestore import FirestoreTimeout, async_db
 
 db = firestore.client()
-lock = asyncio.Lock()  # Prevent race conditions between simultaneous calls
+
+BLOCK_SIZE = 10  # Case numbers reserved per Firestore round-trip
+
+
+def _counter_ref(guild_id):
+    return db.collection("metadata").document(f"case_counter_{guild_id}")
+
+
+@firestore.transactional
+def _reserve_block(transaction, counter_ref, size):
+    # Runs in a Firestore transaction: retried automatically if another
+    # process bumps the counter between our read and write.
+    snapshot = counter_ref.get(transaction=transaction)
+    current = (snapshot.to_dict() or {}).get("count", 0) if snapshot.exists else 0
+    transaction.set(counter_ref, {"count": current + size}, merge=True)
+    return current + 1, current + size
+
+
+@firestore.transactional
+def _return_block(transaction, counter_ref, next_case, hi):
+    # Hand back the unused tail, but only if nobody reserved past us
+    snapshot = counter_ref.get(transaction=transaction)
+    current = (snapshot.to_dict() or {}).get("count", 0) if snapshot.exists else 0
+    if current == hi:
+        transaction.set(counter_ref, {"count": next_case - 1}, merge=True)
+
+
+class CaseAllocator:
+    """
+    Hi/lo case-number allocator, one counter per guild.
+
+    Each guild's `metadata/case_counter_<guild>` doc is the "hi" value. A
+    transaction bumps it by `block_size` and this process then hands out the
+    reserved numbers locally ("lo") with no I/O. Two bot processes never get
+    overlapping blocks; the cost is that a crash leaves a small gap.
+    Guilds only wait on their own lock, never on each other.
+    """
+
+    def __init__(self, block_size: int = BLOCK_SIZE):
+        self.block_size = block_size
+        self._blocks = {}  # guild_id -> [next_case, hi]
+        self._locks = {}   # guild_id -> asyncio.Lock (refills only)
+
+    async def next(self, guild_id) -> int:
+        guild_id = str(guild_id)
+        block = self._blocks.get(guild_id)
+        if block and block[0] <= block[1]:
+            case = block[0]
+            block[0] += 1
+            return case
+
+        lock = self._locks.setdefault(guild_id, asyncio.Lock())
+        async with lock:
+            block = self._blocks.get(guild_id)
+            if not block or block[0] > block[1]:
+                try:
+                    lo, hi = await async_db.run(
+                        "txn", _reserve_block, db.transaction(), _counter_ref(guild_id), self.block_size
+                    )
+                except FirestoreTimeout as e:
+                    # The transaction can still commit on its worker thread; wait
+                    # for it and use that block rather than leaving a 10-case gap
+                    print(f"[CaseCounter] Block reservation for {guild_id} is slow, waiting for it → {e}")
+                    lo, hi = await e.pending
+                block = self._blocks[guild_id] = [lo, hi]
+            case = block[0]
+            block[0] += 1
+            return case
+
+    async def release_all(self):
+        """Return unused reserved numbers on clean shutdown so cases stay contiguous."""
+        for guild_id, (next_case, hi) in list(self._blocks.items()):
+            if next_case > hi:
+                continue
+            try:
+                await async_db.run("txn", _return_block, db.transaction(), _counter_ref(guild_id), next_case, hi)
+            except Exception as e:
+                print(f"[CaseCounter] Could not release block for {guild_id} → {e}")
+        self._blocks.clear()
+
+
+# ✅ Singleton allocator
+case_allocator = CaseAllocator()
+
 
 async def get_next_case_number(guild_id: str) -> int:
-    async with lock:
-        counter_ref = db.collection("metadata").document(f"case_counter_{guild_id}")
-        snapshot = counter_ref.get()
-
-        if snapshot.exists:
-            current = snapshot.to_dict().get("count", 0)
-        else:
-            current = 0
-
-        next_case = current + 1
-        counter_ref.set({"count": next_case})
-        return next_case
+    return await case_allocator.next(guild_id)
@@ -1,23 +1,183 @@
 # bot/utils/log_moderation_action.py
 
+from datetime import datetime, timedelta
 from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists
 from discord.utils import utcnow
 from bot.utils.casecounter import get_next_case_number
+from bot.utils.asyncfirestore import async_db
+from bot.database.modmirror import mod_mirror
 
 db = firestore.client()
 
-async def log_moderation_action(guild_id, user, moderator, reason, action, duration="n/a"):
-    case = await get_next_case_number(guild_id)
+CASE_WRITE_ATTEMPTS = 5  # fresh case numbers tried before a collision is raised
+
+
+def logs_collection(guild_id):
+    return db.collection("moderation").document(str(guild_id)).collection("logs")
+
+
+async def log_moderation_action(guild_id, user, moderator, reason, action, duration=None):
+    """
+    Write a modlog entry under its case number (`logs/<case>`) and return the case.
+
+    The document is created, never overwritten: if the number is already
+    taken (e.g. the counter fell behind existing logs) the collision is
+    logged and a fresh number is drawn.
+    """
     log_data = {
-        "case": case,
         "user_id": user.id,
         "user_tag": str(user),
         "moderator_id": moderator.id,
         "moderator_tag": str(moderator),
         "reason": reason,
         "action": action,
-        "duration": duration,
         "timestamp": int(utcnow().timestamp())
     }
-    db.collection("moderation").document(guild_id).collection("logs").document().set(log_data)
+    if duration is not None:
+        log_data["duration"] = duration
+
+    for attempt in range(1, CASE_WRITE_ATTEMPTS + 1):
+        case = await get_next_case_number(guild_id)
+        log_data["case"] = case
+        try:
+            await async_db.create(logs_collection(guild_id).document(str(case)), log_data)
+            break
+        except AlreadyExists:
+            print(f"[ModLog] Case #{case} already exists in {guild_id} (attempt {attempt}/{CASE_WRITE_ATTEMPTS})")
+            if attempt == CASE_WRITE_ATTEMPTS:
+                raise
+    try:
+        await mod_mirror.upsert_log(guild_id, str(case), log_data)
+    except Exception as e:
+        print(f"[ModMirror] Failed to mirror case #{case} → {e}")
+    try:
+        await record_mod_action(guild_id, moderator.id, action, log_data["timestamp"])
+    except Exception as e:
+        print(f"[ModStats] Rollup update failed for case #{case} → {e}")
     return case
+
+
+# ---------------- Moderator stats rollups ----------------
+# moderation/<guild>/modstats/<moderator>            {"all": {action: n}, "backfilled": bool}
+# moderation/<guild>/modstats/<moderator>/days/<day> {"date": "YYYY-MM-DD", action: n}
+
+def _day(timestamp):
+    return datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d")
+
+
+def modstats_ref(guild_id, moderator_id):
+    return db.collection("moderation").document(str(guild_id)).collection("modstats").document(str(moderator_id))
+
+
+async def record_mod_action(guild_id, moderator_id, action, timestamp):
+    """Bump the all-time and daily counters for one logged action (one batched write)."""
+    total_ref = modstats_ref(guild_id, moderator_id)
+    day = _day(timestamp)
+    batch = db.batch()
+    batch.set(total_ref, {"all": {action: firestore.Increment(1)}}, merge=True)
+    batch.set(total_ref.collection("days").document(day), {"date": day, action: firestore.Increment(1)}, merge=True)
+    await async_db.run("batch", batch.commit)
+
+
+RECENT_DAYS = 31    # day buckets written with the totals; older ones never race record_mod_action
+TALLY_PAGE = 500    # logs read per page when rebuilding
+
+
+@firestore.transactional
+def _finish_backfill(transaction, total_ref, totals, recent):
+    # Only the first rebuild to get here writes; a concurrent one sees the flag
+    snapshot = total_ref.get(transaction=transaction)
+    if snapshot.exists and (snapshot.to_dict() or {}).get("backfilled"):
+        return False
+    for day, counts in recent.items():
+        transaction.set(total_ref.collection("days").document(day), {"date": day, **counts})
+    transaction.set(total_ref, {"all": totals, "backfilled": True})
+    return True
+
+
+async def _tally_mod_actions(guild_id, moderator_id):
+    # Paged so no single read grows with the moderator's history
+    query = logs_collection(guild_id) \
+        .where("moderator_id", "in", [int(moderator_id), str(moderator_id)]) \
+        .select(["action", "timestamp"]) \
+        .order_by(firestore.FieldPath.document_id()) \
+        .limit(TALLY_PAGE)
+    totals, days, last = {}, {}, None
+    while True:
+        page = await async_db.stream(query.start_after(last) if last else query)
+        for doc in page:
+            data = doc.to_dict()
+            action, timestamp = data.get("action"), data.get("timestamp")
+            if not action or not isinstance(timestamp, (int, float)):
+                continue
+            totals[action] = totals.get(action, 0) + 1
+            bucket = days.setdefault(_day(timestamp), {})
+            bucket[action] = bucket.get(action, 0) + 1
+        if len(page) < TALLY_PAGE:
+            return totals, days
+        last = page[-1]
+
+
+async def _backfill_mod_stats(guild_id, moderator_id):
+    # One-off rebuild from the logs for moderators whose history predates the rollups
+    totals, days = await _tally_mod_actions(guild_id, moderator_id)
+    total_ref = modstats_ref(guild_id, moderator_id)
+    since = (utcnow() - timedelta(days=RECENT_DAYS)).strftime("%Y-%m-%d")
+    recent = {day: counts for day, counts in days.items() if day >= since}
+
+    # Older buckets are only ever written here, so plain idempotent batches do
+    batch, pending = db.batch(), 0
+    for day, counts in days.items():
+        if day in recent:
+            continue
+        batch.set(total_ref.collection("days").document(day), {"date": day, **counts})
+        pending += 1
+        if pending == 450:  # stay under the 500-write batch limit
+            await async_db.run("batch", batch.commit)
+            batch, pending = db.batch(), 0
+    if pending:
+        await async_db.run("batch", batch.commit)
+
+    await async_db.run("txn", _finish_backfill, db.transaction(), total_ref, totals, recent)
+    return totals
+
+
+async def get_mod_stats(guild_id, moderator_id, days=30):
+    """
+    Return ({action: all-time count}, {"YYYY-MM-DD": {action: count}}) for the
+    last `days` UTC days: one document read plus at most `days` bucket reads.
+    """
+    total_ref = modstats_ref(guild_id, moderator_id)
+    data = await async_db.get_dict(total_ref)
+    if not data.get("backfilled"):
+        await _backfill_mod_stats(guild_id, moderator_id)
+        data = await async_db.get_dict(total_ref)
+
+    since = (utcnow() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    buckets = await async_db.stream(total_ref.collection("days").where("date", ">=", since))
+    daily = {}
+    for doc in buckets:
+        counts = doc.to_dict()
+        daily[counts.pop("date", doc.id)] = counts
+    return data.get("all", {}), daily
+
+
+async def get_case(guild_id, case):
+    """
+    Fetch a case's log document with one keyed read.
+
+    Cases written before logs were keyed by case number have random IDs;
+    those fall back to an indexed `in` query matching the number stored as
+    an int or a string (older entries used a `case_number` field instead
+    of `case`).
+    """
+    logs_ref = logs_collection(guild_id)
+    doc = await async_db.get(logs_ref.document(str(case)))
+    if doc.exists:
+        return doc
+    for field in ("case", "case_number"):
+        matches = await async_db.stream(logs_ref.where(field, "in", [case, str(case)]).limit(1))
+        if matches:
+            return matches[0]
+    return None
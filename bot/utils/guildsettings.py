@@ -0,0 +1,130 @@
+# bot/utils/guildsettings.py
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+DEFAULT_PREFIX = "?"
+DEFAULT_PURGE_LIMIT = 100
+DEFAULT_STAFF_ROLES = ["admin", "moderator", "senior mod"]
+
+
+class GuildSettings:
+    """Read-only view of one guild's `settings` + `server_config` documents."""
+
+    __slots__ = (
+        "prefix", "disabled_commands", "purge_limit", "purge_log_channel",
+        "mute_role_id", "mute_roles", "ban_roles",
+    )
+
+    def __init__(self, settings: Optional[dict] = None, server_config: Optional[dict] = None):
+        settings = settings or {}
+        server_config = server_config or {}
+        self.prefix: str = settings.get("prefix") or DEFAULT_PREFIX
+        self.disabled_commands: List[str] = [c.lower() for c in settings.get("disabled_commands", [])]
+        self.purge_limit: int = settings.get("purge_limit", DEFAULT_PURGE_LIMIT)
+        self.purge_log_channel: Optional[int] = settings.get("purge_log_channel")
+        self.mute_role_id = settings.get("mute_role_id")
+        self.mute_roles: List[str] = [r.lower() for r in server_config.get("mute_roles", DEFAULT_STAFF_ROLES)]
+        self.ban_roles: List[str] = [r.lower() for r in server_config.get("ban_roles", DEFAULT_STAFF_ROLES)]
+
+
+DEFAULT_SETTINGS = GuildSettings()
+
+
+class GuildSettingsCache:
+    """
+    In-memory per-guild settings, kept fresh by Firestore snapshot listeners.
+
+    One collection-wide `on_snapshot` per collection replaces the per-message
+    `settings/<guild_id>` read. Listener callbacks fire on a Firestore thread,
+    so changes are handed back to the event loop before touching the cache.
+    Cogs that write settings call `update()` so their change is visible
+    immediately, without waiting for the listener round-trip.
+    """
+
+    COLLECTIONS = ("settings", "server_config")
+
+    def __init__(self):
+        self._docs: Dict[str, Dict[str, dict]] = {name: {} for name in self.COLLECTIONS}
+        self._settings: Dict[str, GuildSettings] = {}
+        # {guild_id: [command names]} — shared with bot.disabled_commands
+        self.disabled_commands: Dict[str, List[str]] = {}
+        self._watches = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self, db, timeout: float = 15.0):
+        """Attach snapshot listeners and wait for the initial snapshots."""
+        self._loop = asyncio.get_running_loop()
+        pending = {name: asyncio.Event() for name in self.COLLECTIONS}
+
+        for name in self.COLLECTIONS:
+            def on_snapshot(docs, changes, read_time, name=name):
+                payload = [(change.type.name, change.document.id, change.document.to_dict()) for change in changes]
+                self._loop.call_soon_threadsafe(self._apply_changes, name, payload, pending[name])
+
+            self._watches.append(db.collection(name).on_snapshot(on_snapshot))
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(event.wait() for event in pending.values())), timeout
+            )
+        except asyncio.TimeoutError:
+            print("⚠️ Guild settings snapshot timed out; serving defaults until it arrives.")
+
+        print(f"✅ Guild settings cached for {len(self._settings)} guild(s)")
+
+    def stop(self):
+        for watch in self._watches:
+            try:
+                watch.unsubscribe()
+            except Exception:
+                pass
+        self._watches.clear()
+
+    def _apply_changes(self, collection: str, changes, ready: Optional[asyncio.Event] = None):
+        touched = set()
+        for kind, guild_id, data in changes:
+            if kind == "REMOVED":
+                self._docs[collection].pop(guild_id, None)
+            else:
+                self._docs[collection][guild_id] = data or {}
+            touched.add(guild_id)
+
+        for guild_id in touched:
+            self._rebuild(guild_id)
+
+        if ready is not None:
+            ready.set()
+
+    def _rebuild(self, guild_id: str):
+        settings = GuildSettings(
+            self._docs["settings"].get(guild_id),
+            self._docs["server_config"].get(guild_id),
+        )
+        self._settings[guild_id] = settings
+        self.disabled_commands[guild_id] = settings.disabled_commands
+
+    # ---------------- Public API ----------------
+    def get(self, guild_id) -> GuildSettings:
+        """Return cached settings for a guild. Never touches the network."""
+        return self._settings.get(str(guild_id), DEFAULT_SETTINGS)
+
+    def update(self, guild_id, collection: str = "settings", **fields: Any):
+        """Write-through hook for cogs that just persisted `fields` to Firestore."""
+        guild_id = str(guild_id)
+        doc = dict(self._docs[collection].get(guild_id) or {})
+        doc.update(fields)
+        self._docs[collection][guild_id] = doc
+        self._rebuild(guild_id)
+
+    def invalidate(self, guild_id):
+        """Drop a guild's cached view; the next snapshot repopulates it."""
+        guild_id = str(guild_id)
+        for docs in self._docs.values():
+            docs.pop(guild_id, None)
+        self._settings.pop(guild_id, None)
+        self.disabled_commands.pop(guild_id, None)
+
+
+# ✅ Singleton instance
+settings_cache = GuildSettingsCache()
@@ -0,0 +1,190 @@
+# bot/utils/gwyfinalizer.py
+
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+import discord
+
+BACKLOG_LOG_THRESHOLD = 10  # announce drains of at least this many giveaways
+
+
+async def with_backoff(fn: Callable[..., Awaitable], *args, retries: int = 4, base_delay: float = 2.0, **kwargs):
+    """
+    Await `fn(*args, **kwargs)`, retrying 429s and Discord 5xx errors.
+
+    discord.py already honours rate-limit headers; this covers the 429s it
+    gives up on. The wait is the longer of `retry_after` and an exponential
+    backoff capped at 60s.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return await fn(*args, **kwargs)
+        except discord.HTTPException as e:
+            if attempt == retries or not (e.status == 429 or e.status >= 500):
+                raise
+            delay = max(getattr(e, "retry_after", 0) or 0, min(base_delay * 2 ** attempt, 60))
+            await asyncio.sleep(delay)
+
+
+class FinalizeJob:
+    __slots__ = ("message_id", "due", "attempts")
+
+    def __init__(self, message_id: int, due: float):
+        self.message_id = message_id
+        self.due = due
+        self.attempts = 0
+
+
+class GiveawayFinalizer:
+    """
+    Queue that ends due giveaways under global and per-channel limits.
+
+    `global_limit` workers pull jobs; a job whose channel already has
+    `per_channel_limit` giveaways ending is parked behind that channel and
+    re-queued when a slot frees up, so one busy channel never idles the
+    other workers. Failed ends are retried with exponential backoff up to
+    `max_attempts`. `stats()` reports queue depth and end latency (seconds
+    from the scheduled end to the announcement).
+    """
+
+    def __init__(
+        self,
+        load: Callable[[int], Awaitable[Optional[dict]]],
+        finalize: Callable[[dict], Awaitable[None]],
+        global_limit: int = 4,
+        per_channel_limit: int = 1,
+        max_attempts: int = 5,
+    ):
+        self.load = load
+        self.finalize = finalize
+        self.global_limit = global_limit
+        self.per_channel_limit = per_channel_limit
+        self.max_attempts = max_attempts
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._queued: set = set()
+        self._busy: Dict[int, int] = {}
+        self._parked: Dict[int, Deque[FinalizeJob]] = {}
+        self._workers = []
+        self._retries = set()
+        self.metrics = {
+            "ended": 0, "failed": 0, "retried": 0,
+            "latency_total": 0.0, "latency_max": 0.0, "backlog_peak": 0,
+        }
+
+    def start(self):
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.global_limit)]
+
+    async def close(self):
+        tasks = [*self._workers, *self._retries]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._retries.clear()
+
+    def submit(self, message_id: int, due: float):
+        if message_id in self._queued:
+            return
+        self._queued.add(message_id)
+        self.queue.put_nowait(FinalizeJob(message_id, due))
+        depth = self.depth
+        if depth > self.metrics["backlog_peak"]:
+            self.metrics["backlog_peak"] = depth
+            if depth == BACKLOG_LOG_THRESHOLD:
+                print(f"⏰ Giveaway finalizer backlog at {depth}; draining {self.global_limit} at a time")
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize() + sum(len(q) for q in self._parked.values())
+
+    def stats(self) -> dict:
+        m = self.metrics
+        return {
+            "queued": self.depth,
+            "in_flight": sum(self._busy.values()),
+            "ended": m["ended"],
+            "failed": m["failed"],
+            "retried": m["retried"],
+            "backlog_peak": m["backlog_peak"],
+            "avg_latency_s": round(m["latency_total"] / m["ended"], 2) if m["ended"] else 0.0,
+            "max_latency_s": round(m["latency_max"], 2),
+        }
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._process(job)
+            except Exception as e:
+                self._queued.discard(job.message_id)
+                print(f"⚠️ Giveaway finalizer error for {job.message_id}: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _process(self, job: FinalizeJob):
+        try:
+            giveaway = await self.load(job.message_id)
+        except Exception as e:
+            self._retry(job, e)
+            return
+        if not giveaway:
+            self._queued.discard(job.message_id)
+            return
+
+        channel_id = int(giveaway["channel_id"])
+        if self._busy.get(channel_id, 0) >= self.per_channel_limit:
+            self._parked.setdefault(channel_id, deque()).append(job)
+            return
+
+        self._busy[channel_id] = self._busy.get(channel_id, 0) + 1
+        ended = False
+        try:
+            await self.finalize(giveaway)
+            ended = True
+        except Exception as e:
+            self._retry(job, e)
+        finally:
+            self._busy[channel_id] -= 1
+            if not self._busy[channel_id]:
+                del self._busy[channel_id]
+            parked = self._parked.get(channel_id)
+            if parked:
+                self.queue.put_nowait(parked.popleft())
+                if not parked:
+                    del self._parked[channel_id]
+
+        if ended:
+            self._queued.discard(job.message_id)
+            self._record(job)
+
+    def _retry(self, job: FinalizeJob, error: Exception):
+        job.attempts += 1
+        if job.attempts >= self.max_attempts:
+            self._queued.discard(job.message_id)
+            self.metrics["failed"] += 1
+            print(f"⚠️ Gave up ending giveaway {job.message_id} after {job.attempts} attempts: {error}")
+            return
+
+        self.metrics["retried"] += 1
+        delay = min(5 * 2 ** job.attempts, 300)
+
+        async def requeue():
+            await asyncio.sleep(delay)
+            self.queue.put_nowait(job)
+
+        task = asyncio.create_task(requeue())
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    def _record(self, job: FinalizeJob):
+        m = self.metrics
+        latency = max(time.time() - job.due, 0.0)
+        m["ended"] += 1
+        m["latency_total"] += latency
+        m["latency_max"] = max(m["latency_max"], latency)
+        if self.depth == 0 and not self._busy and m["backlog_peak"] >= BACKLOG_LOG_THRESHOLD:
+            print(f"✅ Giveaway finalizer drained its backlog ({self.stats()})")
+            m["backlog_peak"] = 0
@@ -1,61 +1,123 @@
 import asyncio
-import random
+import heapq
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Union
+from typing import Optional, Dict, List, Tuple, Union
 
 import discord
 from discord.ext import commands
-from bot.database.gwydb import GwyDB  # adjust path as needed
+from bot.database.gwydb import GwyDB, gwy_db
+from bot.utils.gwywinners import pick_winners
+from bot.utils.gwyfinalizer import GiveawayFinalizer, with_backoff
 
 # Constants
 JOIN_EMOJI = "🎉"
 UTC = timezone.utc
+REROLL_WINDOW = 7 * 86400  # ended giveaways keep their entries this long for rerolls
+PRUNE_INTERVAL = 3600  # seconds between prunes of giveaways past the reroll window
 
 
 class GiveawayManager:
     """
     Handles creation, tracking, rerolling, and ending giveaways.
     Fully async, persistent via GwyDB.
+
+    End times live in one min-heap of (end_time, message_id) served by a
+    single scheduler task that sleeps until the earliest deadline, so there
+    is no task per giveaway and no periodic table scan. The heap is seeded
+    from the `end_time` index at startup; anything already overdue is
+    ended on the first pass. Due giveaways are handed to a
+    GiveawayFinalizer, which bounds concurrent ends globally and per
+    channel so a post-downtime backlog drains at a steady pace.
+
+    Ending goes running -> drawn (winners stored) -> ended (announced), so
+    a retried end re-announces the stored winners instead of drawing again.
+    Ended giveaways past the reroll window are pruned hourly by the same task.
     """
 
-    def __init__(self, bot: commands.Bot, db: Optional[GwyDB] = None):
+    def __init__(
+        self, bot: commands.Bot, db: Optional[GwyDB] = None,
+        max_concurrent_ends: int = 4, max_ends_per_channel: int = 1
+    ):
         self.bot = bot
-        self.db = db or GwyDB()
-        self._tasks: Dict[int, asyncio.Task] = {}
-        self._failsafe_task: Optional[asyncio.Task] = None
+        self.db = db or gwy_db
+        self._heap: List[Tuple[int, int]] = []  # (end_time, message_id)
+        self._scheduled: Dict[int, int] = {}  # message_id -> end_time (lazy heap deletion)
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        self._next_prune = 0.0
+        self.finalizer = GiveawayFinalizer(
+            self._load_unfinished, self.end_giveaway,
+            global_limit=max_concurrent_ends, per_channel_limit=max_ends_per_channel,
+        )
 
     async def load_giveaways(self):
-        """Load ongoing giveaways from DB and start timers."""
-        giveaways = await self.db.get_all_giveaways()
-        now_ts = datetime.now(UTC).timestamp()
-        for g in giveaways:
-            # Only schedule for still-running ones (row exists == running)
-            end_time = datetime.fromtimestamp(int(g["end_time"]), UTC)
-            remaining = (end_time - datetime.now(UTC)).total_seconds()
-            if remaining > 0:
-                # schedule to end at the right time
-                self._tasks[int(g["message_id"])] = asyncio.create_task(
-                    self._end_giveaway(int(g["message_id"]), remaining)
-                )
-            else:
-                # already expired -> end ASAP
-                asyncio.create_task(self._end_giveaway(int(g["message_id"]), 0))
-
-        # Start failsafe loop once
-        if not self._failsafe_task:
-            self._failsafe_task = asyncio.create_task(self._failsafe_loop())
-
-    async def _failsafe_loop(self):
-        """Checks every 60s for expired giveaways that didn't end."""
+        """Seed the scheduler from the DB and start it."""
+        await self._prune()
+        self._heap.clear()
+        self._scheduled.clear()
+        for end_time, message_id in await self.db.get_schedule():
+            self.schedule(message_id, end_time)
+
+        self.finalizer.start()
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+
+    def schedule(self, message_id: int, end_time: int):
+        self._scheduled[message_id] = end_time
+        heapq.heappush(self._heap, (end_time, message_id))
+        self._wakeup.set()
+
+    def unschedule(self, message_id: int):
+        self._scheduled.pop(message_id, None)  # heap entry goes stale
+
+    async def close(self):
+        if self._runner:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+        await self.finalizer.close()
+
+    async def _prune(self):
+        now = datetime.now(UTC).timestamp()
+        self._next_prune = now + PRUNE_INTERVAL
+        pruned = await self.db.prune_ended(int(now) - REROLL_WINDOW)
+        if pruned:
+            print(f"🧹 Pruned {pruned} ended giveaway(s) past the reroll window")
+
+    async def _run(self):
         await self.bot.wait_until_ready()
-        while not self.bot.is_closed():
-            now = datetime.now(UTC).timestamp()
-            giveaways = await self.db.get_all_giveaways()
-            for g in giveaways:
-                mid = int(g["message_id"])
-                if int(g["end_time"]) <= now and mid not in self._tasks:
-                    asyncio.create_task(self._end_giveaway(mid, 0))
-            await asyncio.sleep(60)
+        while True:
+            self._wakeup.clear()
+            now = int(datetime.now(UTC).timestamp())
+            if now >= self._next_prune:
+                try:
+                    await self._prune()
+                except Exception as e:
+                    print(f"⚠️ Giveaway prune failed: {e}")
+            while self._heap and self._heap[0][0] <= now:
+                end_time, message_id = heapq.heappop(self._heap)
+                if self._scheduled.get(message_id) != end_time:
+                    continue  # rescheduled or removed
+                del self._scheduled[message_id]
+                self.finalizer.submit(message_id, end_time)
+
+            # Drop stale entries so the next deadline is a live one
+            while self._heap and self._scheduled.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+
+            next_wake = min(self._heap[0][0], self._next_prune) if self._heap else self._next_prune
+            timeout = max(next_wake - datetime.now(UTC).timestamp(), 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _load_unfinished(self, message_id: int) -> Optional[dict]:
+        giveaway = await self.db.get_giveaway(message_id)
+        if not giveaway or giveaway.get("status") not in ("running", "drawn"):
+            # already ended/removed
+            return None
+        return giveaway
 
     async def start_giveaway(
         self,
@@ -117,57 +179,49 @@ class GiveawayManager:
         )
 
         # Schedule end
-        self._tasks[message.id] = asyncio.create_task(
-            self._end_giveaway(message.id, duration)
-        )
+        self.schedule(message.id, int(end_time.timestamp()))
 
         return message
 
-    async def _end_giveaway(self, message_id: int, delay: float):
-        """Ends a giveaway after a delay."""
-        if delay > 0:
-            try:
-                await asyncio.sleep(delay)
-            except asyncio.CancelledError:
-                return
-
-        giveaway = await self.db.get_giveaway(message_id)
-        if not giveaway:
-            # already ended/removed
-            return
-
-        await self.end_giveaway(giveaway)
-
     async def end_giveaway(self, giveaway: dict):
         """Immediately ends a giveaway (public method)."""
         message_id = int(giveaway["message_id"])
+        self.unschedule(message_id)
         channel = self.bot.get_channel(int(giveaway["channel_id"]))
         if not isinstance(channel, (discord.TextChannel, discord.Thread, discord.VoiceChannel)):
             await self.db.delete_giveaway(message_id)
             return
 
         try:
-            message = await channel.fetch_message(message_id)
+            message = await with_backoff(channel.fetch_message, message_id)
         except discord.NotFound:
             await self.db.delete_giveaway(message_id)
             return
 
-        entries = await self.db.get_entries(message_id)
-        if not entries:
+        if giveaway.get("status") == "drawn":
+            # A previous attempt drew winners but didn't finish announcing
+            winners = await self.db.get_winners(message_id)
+        else:
+            # Winners are stored with the running -> drawn claim, so a
+            # concurrent /gend finds it claimed and stops here: one draw
+            winners = await pick_winners(self.db, giveaway)
+            if not await self.db.mark_drawn(message_id, winners):
+                return
+
+        # Transient errors propagate so the finalizer retries the announcement
+        if not winners:
             embed = discord.Embed(
                 title="🎉 Giveaway Ended 🎉",
                 description=f"**Prize:** {giveaway['prize']}\nNo valid entries 😢",
                 color=discord.Color.red()
             )
             try:
-                await message.edit(embed=embed)
-            except discord.HTTPException:
+                await with_backoff(message.edit, embed=embed)
+            except (discord.Forbidden, discord.NotFound):
                 pass
-            await self.db.delete_giveaway(message_id)
-            self._tasks.pop(message_id, None)
+            await self.db.mark_ended(message_id)
             return
 
-        winners = random.sample(entries, min(len(entries), int(giveaway["winners"])))
         mentions = ", ".join(f"<@{uid}>" for uid in winners)
 
         embed = discord.Embed(
@@ -176,33 +230,35 @@ class GiveawayManager:
             color=discord.Color.green()
         )
         try:
-            await message.edit(embed=embed)
-        except discord.HTTPException:
+            await with_backoff(message.edit, embed=embed)
+        except (discord.Forbidden, discord.NotFound):
             pass
         try:
-            await channel.send(f"🎉 Congratulations {mentions}! You won **{giveaway['prize']}**!")
-        except discord.HTTPException:
+            await with_backoff(channel.send, f"🎉 Congratulations {mentions}! You won **{giveaway['prize']}**!")
+        except discord.Forbidden:
             pass
-
-        await self.db.delete_giveaway(message_id)
-        task = self._tasks.pop(message_id, None)
-        if task:
-            task.cancel()
+        await self.db.mark_ended(message_id)
 
     async def reroll(self, ctx, message_id: int):
-        """Reroll winners for a finished giveaway or running one (uses current entries)."""
+        """Reroll winners for a finished giveaway or running one, skipping previous winners."""
         giveaway = await self.db.get_giveaway(message_id)
         if not giveaway:
             return await ctx.send("❌ No giveaway found with that message ID.")
 
-        entries = await self.db.get_entries(message_id)
-        if not entries:
+        winners = await self.reroll_winners(giveaway)
+        if not winners:
             return await ctx.send("❌ No valid entries to reroll.")
 
-        winners = random.sample(entries, min(len(entries), int(giveaway["winners"])))
         mentions = ", ".join(f"<@{uid}>" for uid in winners)
         await ctx.send(f"🎉 Reroll Results! 🎉\nNew winner(s): {mentions}\nPrize: **{giveaway['prize']}**")
 
+    async def reroll_winners(self, giveaway: dict) -> List[int]:
+        """Draw fresh winners who haven't won this giveaway yet and record them."""
+        winners = await pick_winners(self.db, giveaway, exclude_previous=True)
+        if winners:
+            await self.db.record_winners(int(giveaway["message_id"]), winners)
+        return winners
+
     async def delete_giveaway(self, ctx, message_id: int):
         """Delete a giveaway immediately (message + DB row)."""
         giveaway = await self.db.get_giveaway(message_id)
@@ -220,7 +276,5 @@ class GiveawayManager:
                 pass
 
         await self.db.delete_giveaway(message_id)
-        task = self._tasks.pop(message_id, None)
-        if task:
-            task.cancel()
+        self.unschedule(message_id)
         await ctx.send("✅ Giveaway deleted successfully.")
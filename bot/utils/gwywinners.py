@@ -0,0 +1,51 @@
+# bot/utils/gwywinners.py
+
+import heapq
+import math
+import random
+from typing import AsyncIterator, List, Optional, Tuple
+
+from bot.database.gwydb import GwyDB
+
+
+async def weighted_reservoir(
+    rows: AsyncIterator[Tuple[int, int]], k: int, rng: Optional[random.Random] = None
+) -> List[int]:
+    """
+    Weighted sample of `k` user IDs without replacement, in one pass.
+
+    Efraimidis–Spirakis A-Res: each row gets the key log(u) / weight and the
+    k largest keys win, so only a k-sized heap is ever held in memory.
+    Weights below 1 count as 1, so entrants with no tracked messages can
+    still win.
+    """
+    rng = rng or random
+    heap: List[Tuple[float, int]] = []
+    async for user_id, weight in rows:
+        key = math.log(1.0 - rng.random()) / max(weight, 1)
+        if len(heap) < k:
+            heapq.heappush(heap, (key, user_id))
+        elif key > heap[0][0]:
+            heapq.heapreplace(heap, (key, user_id))
+    return [user_id for _, user_id in sorted(heap, reverse=True)]
+
+
+async def pick_winners(
+    db: GwyDB, giveaway: dict, count: Optional[int] = None, exclude_previous: bool = False
+) -> List[int]:
+    """
+    Draw winners for a giveaway without loading its entries.
+
+    Uniform draws run entirely in SQLite; message-weighted giveaways stream
+    entrants through `weighted_reservoir`. With `exclude_previous`, anyone
+    already recorded as a winner (see `GwyDB.record_winners`) is skipped.
+    """
+    message_id = int(giveaway["message_id"])
+    k = int(count or giveaway["winners"])
+    if k <= 0:
+        return []
+
+    if giveaway.get("weight_by_messages"):
+        rows = db.iter_weighted_entries(message_id, int(giveaway["guild_id"]), exclude_winners=exclude_previous)
+        return await weighted_reservoir(rows, k)
+    return await db.sample_entries(message_id, k, exclude_winners=exclude_previous)
@@ -0,0 +1,53 @@
+# bot/utils/levels.py
+
+from bisect import bisect_right
+from typing import Iterable, List
+
+MAX_LEVEL = 600
+
+
+def get_xp_for_level(level: int) -> int:
+    """Total XP needed to reach `level`."""
+    return int(5 / 6 * level * (2 * level ** 2 + 27 * level + 91))
+
+
+# Cumulative XP thresholds: XP_TABLE[n] == get_xp_for_level(n)
+XP_TABLE: List[int] = [get_xp_for_level(level) for level in range(MAX_LEVEL + 1)]
+_MAX_LEVEL_XP = XP_TABLE[MAX_LEVEL]
+
+
+def _walk_past_cap(xp: int) -> int:
+    # Imported/admin XP can exceed the table; keep the old unbounded behaviour
+    level = MAX_LEVEL
+    while get_xp_for_level(level + 1) <= xp:
+        level += 1
+    return level
+
+
+def calculate_level(xp: int) -> int:
+    """Level for a total XP amount, via binary search over XP_TABLE."""
+    if xp >= _MAX_LEVEL_XP:
+        return _walk_past_cap(xp)
+    level = bisect_right(XP_TABLE, xp) - 1
+    return level if level > 0 else 0
+
+
+def levels_for(xps: Iterable[int]) -> List[int]:
+    """Batched calculate_level for a page/column of XP values."""
+    table, cap, search = XP_TABLE, _MAX_LEVEL_XP, bisect_right
+    levels = []
+    append = levels.append
+    for xp in xps:
+        if xp >= cap:
+            append(_walk_past_cap(xp))
+        else:
+            level = search(table, xp) - 1
+            append(level if level > 0 else 0)
+    return levels
+
+
+def level_progress(xp: int):
+    """Return (level, xp_into_level, xp_needed_for_next_level)."""
+    level = calculate_level(xp)
+    floor = get_xp_for_level(level)
+    return level, xp - floor, get_xp_for_level(level + 1) - floor
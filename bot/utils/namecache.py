@@ -0,0 +1,78 @@
+# bot/utils/namecache.py
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+import discord
+
+
+class UserNameCache:
+    """
+    TTL + LRU cache of user_id -> display name for leaderboard-style lists.
+
+    Misses are resolved in bulk: the guild member cache first, then one
+    gateway `query_members(user_ids=...)` for the whole batch, and only
+    users who have left the guild fall back to (concurrent) `fetch_user`.
+    """
+
+    def __init__(self, max_size: int = 50_000, ttl: float = 3600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._names: "OrderedDict[int, tuple]" = OrderedDict()  # user_id -> (name, expires_at)
+
+    def get(self, user_id: int) -> Optional[str]:
+        entry = self._names.get(user_id)
+        if entry is None:
+            return None
+        name, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._names[user_id]
+            return None
+        self._names.move_to_end(user_id)
+        return name
+
+    def put(self, user_id: int, name: str):
+        self._names[user_id] = (name, time.monotonic() + self.ttl)
+        self._names.move_to_end(user_id)
+        while len(self._names) > self.max_size:
+            self._names.popitem(last=False)
+
+    async def resolve(self, bot, guild: discord.Guild, user_ids: Iterable[int]) -> Dict[int, str]:
+        """Return {user_id: name} for every id, hitting Discord only for misses."""
+        names: Dict[int, str] = {}
+        missing = []
+        for uid in user_ids:
+            cached = self.get(uid)
+            if cached is not None:
+                names[uid] = cached
+                continue
+            member = guild.get_member(uid) or bot.get_user(uid)
+            if member:
+                names[uid] = member.name
+                self.put(uid, member.name)
+            else:
+                missing.append(uid)
+
+        if missing:
+            try:
+                for member in await guild.query_members(user_ids=missing[:100], cache=True):
+                    names[member.id] = member.name
+                    self.put(member.id, member.name)
+            except (discord.HTTPException, asyncio.TimeoutError, discord.ClientException):
+                pass
+
+        leftover = [uid for uid in missing if uid not in names]
+        if leftover:
+            results = await asyncio.gather(*(bot.fetch_user(uid) for uid in leftover), return_exceptions=True)
+            for uid, user in zip(leftover, results):
+                name = user.name if isinstance(user, discord.abc.User) else f"User {uid}"
+                names[uid] = name
+                self.put(uid, name)
+
+        return names
+
+
+# ✅ Singleton instance
+name_cache = UserNameCache()
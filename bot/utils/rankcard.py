@@ -0,0 +1,174 @@
+# bot/utils/rankcard.py
+
+import asyncio
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Optional, Tuple
+
+from bot.utils.avatarcache import avatar_cache
+
+ASSETS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "assets"))
+CARD_SIZE = (800, 250)
+AVATAR_SIZE = 160
+
+
+class RendererBusy(Exception):
+    """Raised when the render queue is full; callers should ask the user to retry."""
+
+
+# ---------------------------------------------------------------------------
+# Worker-process side. Everything below runs inside the ProcessPoolExecutor.
+# ---------------------------------------------------------------------------
+
+_assets = {}
+
+
+def _init_worker(assets_dir: str):
+    """Load the background, fonts and logo once per worker process."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    base = Image.open(os.path.join(assets_dir, "rankghost.png")).convert("RGBA").resize(CARD_SIZE)
+    # ✅ Boost background alpha ×2.0 (lookup table instead of a per-pixel lambda)
+    r, g, b, a = base.split()
+    a = a.point([min(255, p * 2) for p in range(256)])
+    _assets["background"] = Image.merge("RGBA", (r, g, b, a))
+
+    font_path = os.path.join(assets_dir, "fonts", "ARIAL.TTF")
+    _assets["font_bold"] = ImageFont.truetype(font_path, 32)
+    _assets["font_medium"] = ImageFont.truetype(font_path, 24)
+    _assets["font_small"] = ImageFont.truetype(font_path, 18)
+
+    logo_path = os.path.join(assets_dir, "ghost.png")
+    _assets["logo"] = Image.open(logo_path).convert("RGBA").resize((60, 60)) if os.path.exists(logo_path) else None
+
+    mask = Image.new("L", (AVATAR_SIZE, AVATAR_SIZE), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, AVATAR_SIZE, AVATAR_SIZE), fill=255)
+    _assets["mask"] = mask
+
+
+def _render_card(avatar_rgba: bytes, dominant, name: str, level: int, rank, xp_into_level: int, xp_needed: int) -> bytes:
+    """Compose one rank card and return it PNG-encoded."""
+    from PIL import Image, ImageDraw
+
+    avatar_img = Image.frombytes("RGBA", (AVATAR_SIZE, AVATAR_SIZE), avatar_rgba)
+    avatar_img.putalpha(_assets["mask"])
+
+    base = _assets["background"].copy()
+
+    # Tint background with avatar dominant color
+    if dominant:
+        overlay = Image.new("RGBA", base.size, tuple(dominant) + (60,))
+        base = Image.alpha_composite(base, overlay)
+
+    draw = ImageDraw.Draw(base)
+    font_bold, font_medium, font_small = _assets["font_bold"], _assets["font_medium"], _assets["font_small"]
+
+    base.paste(avatar_img, (30, 45), avatar_img)
+    draw.text((210, 40), name, font=font_bold, fill="white")
+    draw.text((210, 85), f"LEVEL {level}", font=font_medium, fill="white")
+    draw.text((360, 85), f"RANK #{rank}", font=font_medium, fill="white")
+
+    bar_x, bar_y, bar_w, bar_h = 210, 130, 500, 26
+    progress = int((xp_into_level / xp_needed) * bar_w) if xp_needed > 0 else 0
+    draw.rounded_rectangle([bar_x, bar_y, bar_x + bar_w, bar_y + bar_h], 13, fill=(80, 80, 80))
+    draw.rounded_rectangle([bar_x, bar_y, bar_x + progress, bar_y + bar_h], 13, fill=(255, 255, 255))
+
+    xp_text = f"{xp_into_level:,} / {xp_needed:,} XP"
+    text_w = font_small.getbbox(xp_text)[2]
+    draw.text((bar_x + bar_w - text_w - 10, bar_y + 3), xp_text, font=font_small, fill="black")
+
+    logo = _assets["logo"]
+    if logo is not None:
+        base.paste(logo, (base.width - 70, base.height - 70), logo)
+
+    buffer = BytesIO()
+    base.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Event-loop side.
+# ---------------------------------------------------------------------------
+
+class RankCardRenderer:
+    """
+    Renders rank cards in a small process pool, off the event loop.
+
+    At most `max_workers` cards render at once and at most `max_queue` more
+    may wait; beyond that `render()` raises RendererBusy instead of piling up
+    work. Finished PNGs are kept in an LRU keyed by everything drawn on the
+    card, so repeated `/rank` calls for an unchanged member are free.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 16, cache_size: int = 256):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.cache_size = cache_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._cards: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self.metrics = {"rendered": 0, "cache_hits": 0, "rejected": 0}
+
+    def _ensure_started(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(ASSETS_DIR,),
+            )
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+    async def render(self, member, level: int, rank, xp_into_level: int, xp_needed: int) -> bytes:
+        # The card prints the exact XP figures, so the "bucket" is the exact
+        # XP into the level; it still changes at most once per XP cooldown.
+        key = (member.display_avatar.key, member.name, level, rank, xp_into_level, xp_needed)
+        card = self._cards.get(key)
+        if card is not None:
+            self._cards.move_to_end(key)
+            self.metrics["cache_hits"] += 1
+            return card
+
+        if self._waiting >= self.max_workers + self.max_queue:
+            self.metrics["rejected"] += 1
+            raise RendererBusy()
+
+        self._ensure_started()
+        self._waiting += 1
+        try:
+            avatar, dominant = await avatar_cache.get(member, AVATAR_SIZE, with_color=True)
+            async with self._slots:
+                card = await self._submit(avatar.tobytes(), dominant, member.name, level, rank, xp_into_level, xp_needed)
+        finally:
+            self._waiting -= 1
+
+        self.metrics["rendered"] += 1
+        self._cards[key] = card
+        while len(self._cards) > self.cache_size:
+            self._cards.popitem(last=False)
+        return card
+
+    async def _submit(self, *args) -> bytes:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._pool, _render_card, *args)
+        except BrokenProcessPool:
+            # A worker died (OOM, killed); rebuild the pool and retry once
+            print("⚠️ Rank card pool broke, restarting workers")
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._ensure_started()
+            return await loop.run_in_executor(self._pool, _render_card, *args)
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# ✅ Singleton instance
+rank_cards = RankCardRenderer()
@@ -1,34 +1,208 @@
 import asyncio
+import heapq
+import itertools
+import json
+import time
+
+import discord
+
+from bot.database.database import database
+
+MAX_ATTEMPTS = 8  # ~2h of backoff before a job is given up on
+
 
 class TaskManager:
+    """
+    Persistent timers for temp-mutes, temp-bans, timed locks, etc.
+
+    Jobs live in the `scheduled_jobs` table (indexed on `due_at`) so they
+    survive restarts. In memory there is only a min-heap of
+    (due_at, seq, guild_id, key) and one loop task that sleeps until the
+    earliest deadline, so 100k pending timers cost one task, not 100k.
+
+    Jobs are keyed per guild by case number (or any other string key, e.g.
+    `lock:<channel_id>`); scheduling the same key again replaces the job.
+    When a job fires, the handler registered for its `kind` is called with
+    `(guild, payload)`. The row is only deleted once the handler succeeds;
+    a transient failure (429/5xx, network, or the guild not being available
+    yet) pushes the job back with exponential backoff, up to MAX_ATTEMPTS.
+    """
+
     def __init__(self):
-        self.tasks = {}  # Dictionary: case_number -> asyncio.Task
+        self.bot = None
+        self.handlers = {}  # kind -> async handler(guild, payload)
+        self._heap = []
+        self._due = {}  # (guild_id, key) -> due_at; heap entries not matching are stale
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._loop_task = None
+        self._running = set()  # handler tasks in flight
+
+    def register(self, kind, handler):
+        self.handlers[kind] = handler
+
+    async def start(self, bot):
+        """Rehydrate pending jobs from SQLite and start the timer loop."""
+        self.bot = bot
+        self._wakeup = asyncio.Event()
+        async with database.db.execute("SELECT guild_id, job_key, due_at FROM scheduled_jobs") as cursor:
+            rows = await cursor.fetchall()
+        self._heap, self._due = [], {}  # the table is the source of truth
+        for guild_id, key, due_at in rows:
+            self._due[(guild_id, key)] = due_at
+            self._heap.append((due_at, next(self._seq), guild_id, key))
+        heapq.heapify(self._heap)
+        self._loop_task = asyncio.create_task(self._run())
+        print(f"⏰ Rehydrated {len(rows)} scheduled job(s)")
+
+    async def schedule(self, guild_id, key, kind, delay=None, due_at=None, payload=None):
+        """Run `kind`'s handler after `delay` seconds (or at unix time `due_at`)."""
+        guild_id, key = str(guild_id), str(key)
+        if due_at is None:
+            due_at = time.time() + (delay or 0)
+
+        await database.db.execute("""
+            INSERT INTO scheduled_jobs (guild_id, job_key, kind, due_at, payload)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(guild_id, job_key) DO UPDATE SET
+                kind = excluded.kind, due_at = excluded.due_at, payload = excluded.payload
+        """, (guild_id, key, kind, due_at, json.dumps(payload or {})))
+        await database.db.commit()
+
+        self._due[(guild_id, key)] = due_at
+        heapq.heappush(self._heap, (due_at, next(self._seq), guild_id, key))
+        if self._wakeup and self._heap[0][0] == due_at:
+            self._wakeup.set()  # new earliest deadline
+
+    async def cancel(self, guild_id, key):
+        guild_id, key = str(guild_id), str(key)
+        self._due.pop((guild_id, key), None)  # heap entry goes stale
+        await database.db.execute(
+            "DELETE FROM scheduled_jobs WHERE guild_id = ? AND job_key = ?", (guild_id, key)
+        )
+        await database.db.commit()
+
+    async def cancel_user(self, guild_id, kind, user_id):
+        """Cancel every pending `kind` job for a user (e.g. on a manual unban or a new ban)."""
+        guild_id = str(guild_id)
+        async with database.db.execute("""
+            SELECT job_key FROM scheduled_jobs
+            WHERE guild_id = ? AND kind = ? AND CAST(json_extract(payload, '$.user_id') AS TEXT) = ?
+        """, (guild_id, kind, str(user_id))) as cursor:
+            keys = [row[0] for row in await cursor.fetchall()]
+        for key in keys:
+            await self.cancel(guild_id, key)
+        return len(keys)
+
+    def get_due(self, guild_id, key):
+        return self._due.get((str(guild_id), str(key)))
+
+    def list_tasks(self, guild_id=None):
+        return [k for (g, k) in self._due if guild_id is None or g == str(guild_id)]
+
+    async def _run(self):
+        await self.bot.wait_until_ready()
+        while True:
+            # Drop entries superseded by a cancel or reschedule
+            while self._heap and self._due.get(self._heap[0][2:]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due_at, _, guild_id, key = heapq.heappop(self._heap)
+            del self._due[(guild_id, key)]
+            try:
+                await self._fire(guild_id, key, due_at)
+            except Exception as e:
+                print(f"[Scheduler] Job {guild_id}/{key} failed to dispatch → {e}")
+
+    async def _fire(self, guild_id, key, due_at):
+        async with database.db.execute(
+            "SELECT kind, payload FROM scheduled_jobs WHERE guild_id = ? AND job_key = ? AND due_at = ?",
+            (guild_id, key, due_at)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if not row:
+            return
+
+        kind, payload = row[0], json.loads(row[1] or "{}")
+        handler = self.handlers.get(kind)
+        guild = self.bot.get_guild(int(guild_id))
+        if handler is None or guild is None:
+            # Cog not loaded or guild unavailable (outage, not cached yet)
+            await self._retry(guild_id, key, due_at, payload, f"no {'handler' if handler is None else 'guild'}")
+            return
+
+        # Handlers do Discord I/O; don't hold up the next deadline
+        task = asyncio.create_task(self._call(handler, guild, key, due_at, payload))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
 
-    def schedule(self, case_number, coro):
-        # Cancel old task if already scheduled
-        if case_number in self.tasks:
-            self.tasks[case_number].cancel()
+    async def _call(self, handler, guild, key, due_at, payload):
+        guild_id = str(guild.id)
+        try:
+            await handler(guild, payload)
+        except Exception as e:
+            if self.is_transient(e):
+                await self._retry(guild_id, key, due_at, payload, e)
+                return
+            print(f"[Scheduler] Job {guild_id}/{key} failed → {e}")
+        await self._finish(guild_id, key, due_at)
 
-        # Create new asyncio task
-        task = asyncio.create_task(coro)
-        self.tasks[case_number] = task
+    @staticmethod
+    def is_transient(error):
+        if isinstance(error, discord.HTTPException):
+            return error.status == 429 or error.status >= 500
+        return isinstance(error, (OSError, asyncio.TimeoutError))
 
-        # Clean up finished tasks automatically
-        def cleanup(_):
-            self.tasks.pop(case_number, None)
+    async def _finish(self, guild_id, key, due_at):
+        # due_at guard: a reschedule while the handler ran keeps its new row
+        await database.db.execute(
+            "DELETE FROM scheduled_jobs WHERE guild_id = ? AND job_key = ? AND due_at = ?",
+            (guild_id, key, due_at)
+        )
+        await database.db.commit()
 
-        task.add_done_callback(cleanup)
+    async def _retry(self, guild_id, key, due_at, payload, error):
+        attempts = payload.get("_attempts", 0) + 1
+        if attempts >= MAX_ATTEMPTS:
+            print(f"[Scheduler] Giving up on job {guild_id}/{key} after {attempts} attempts → {error}")
+            await self._finish(guild_id, key, due_at)
+            return
 
-    def cancel(self, case_number):
-        if case_number in self.tasks:
-            self.tasks[case_number].cancel()
-            del self.tasks[case_number]
+        new_due = time.time() + min(30 * 2 ** attempts, 3600)
+        payload["_attempts"] = attempts
+        cursor = await database.db.execute(
+            "UPDATE scheduled_jobs SET due_at = ?, payload = ? WHERE guild_id = ? AND job_key = ? AND due_at = ?",
+            (new_due, json.dumps(payload), guild_id, key, due_at)
+        )
+        updated = cursor.rowcount == 1
+        await cursor.close()
+        await database.db.commit()
+        if not updated or (guild_id, key) in self._due:
+            return  # cancelled or rescheduled meanwhile
 
-    def get_task(self, case_number):
-        return self.tasks.get(case_number)
+        print(f"[Scheduler] Job {guild_id}/{key} retry {attempts} in {new_due - time.time():.0f}s → {error}")
+        self._due[(guild_id, key)] = new_due
+        heapq.heappush(self._heap, (new_due, next(self._seq), guild_id, key))
+        if self._wakeup and self._heap[0][0] == new_due:
+            self._wakeup.set()
 
-    def list_tasks(self):
-        return list(self.tasks.keys())
+    async def close(self):
+        if self._loop_task:
+            self._loop_task.cancel()
+            self._loop_task = None
 
 # ✅ Export singleton task manager
 task_manager = TaskManager()